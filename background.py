@@ -1,342 +1,641 @@
-import re
-import sap
-import os
-import logging
-import env
-import time
-import utils
-
-# ? Informações: módulo responsável pelo tratamento dos arquivos de background (conferência de jobs, exportar/excluir arquivos)
-
-
-def __get_spool_list():
-    """  
-    Este método realiza a consulta no SAP Gui das ordens spool do usuário [SP02] para obter número e título dos itens. É essencial para identificar os dados resultantes de cada transação executada em background (neste contexto, a partir do campo "Título" setado a cada parametrização da execução em background, contendo o código da transação)
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        object: contendo o número e nome (título) das ordens spool [Exemplo: {56699555: 09_2023_IW67}]
-    """
-
-    while True:
-        try:
-            session = sap.get_session_by_number('ERP', 1)
-            columnIndex = __get_sap_collection_column_index(['Nº spool', 'Título'])
-            session.StartTransaction("SP02")
-            session.findById("wnd[0]/tbar[1]/btn[45]").press()  # refresh
-            spoolList = {}
-
-            row = 3
-            while True:
-                number = session.FindById(f'wnd[0]/usr/lbl[{columnIndex["Nº spool"]},{row}]', False)
-                name = session.FindById(f'wnd[0]/usr/lbl[{columnIndex["Título"]},{row}]', False)
-                if number == None or name == None:
-                    break
-                spoolList[number.text.strip()] = name.text.strip()
-                row += 1
-
-            if len(spoolList) != 0:
-                return spoolList
-
-        except Exception:
-            continue
-
-
-def __get_quantity_sap_spool():
-
-    while True:
-        try:
-            partialText = ["Ordens spool exibidas", "Ordem spool exibida"]
-            session = sap.get_session_by_number('ERP', 1)
-            session.findById("wnd[0]/tbar[0]/btn[83]").press()  # last page
-            data = session.FindById("wnd[0]/usr").Children
-            for item in data:
-                itemName = str(item.text.strip())
-                if any(text.upper() in itemName.upper() for text in partialText):
-                    return int(itemNamePrev)
-
-                itemNamePrev = itemName
-
-            return 0
-
-        except Exception:
-            continue
-
-
-def __get_sap_collection_column_index(columnTitle: list):
-    """  
-    Este método realiza a consulta da lista de jobs do usuário [SMX] para identificar título e indíce da coluna de cada item a partir de uma verificação via regex. A exibição dos dados da transação SMX não implementa o objeto GuiGridView, o que impede a consulta direta e específica dos dados.
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Args:
-        columnTitle (list): lista de títulos para consulta
-
-    Returns:
-        object: contendo título e índice da coluna (index) dos jobs [Exemplo: {Status: 4}]
-    """
-
-    while True:
-        try:
-            columnIndexRegex = r'\[(\d+),\d+\]'
-            session = sap.get_session_by_number('ERP', 1)
-            data = session.FindById("wnd[0]/usr").Children
-            columnIndex = {}
-            for item in data:
-                for title in columnTitle:
-                    itemName = item.text.strip()
-                    if itemName.upper() == title.upper():
-                        columnIndex[title] = int(re.search(columnIndexRegex, item.id).group(1))
-                        columnTitle.remove(title)
-                        break
-                if not columnTitle:
-                    break
-
-            return columnIndex
-
-        except Exception:
-            continue
-
-
-def __export_all_spool_files():
-    """  
-    Este método realiza a exportação dos arquivos das ordens spool para arquivos .txt [SP02] para o diretório default do SAP Gui. Segue a ordens de passos: Ordem de spool > Transferir > Exportar como texto
-    ATENÇÃO: os arquivos exportados constam no diretório default do SAP para exportação (ver env.DIR_SPOOL_DATA)
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            start = time.time()
-            __remove_all_exported_files()
-            print('Starting exportation spool files')
-            session = sap.get_session_by_number('ERP', 1)
-            session.StartTransaction("SP02")
-            quantitySapSpool = __get_quantity_sap_spool()
-            session.findById("wnd[0]/tbar[1]/btn[45]").press()
-            session.findById("wnd[0]/tbar[1]/btn[48]").press()
-            session.findById("wnd[0]/mbar/menu[0]/menu[2]/menu[1]").select()
-
-            quantityExportedSpool = len(os.listdir(env.DIR_SPOOL_DATA))
-            if quantitySapSpool == quantityExportedSpool:
-                print(f'{utils.CustomMessage.prGreen("Successfully")} spool files exportation [{quantityExportedSpool}] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]')
-                return True
-            else:
-                print(utils.CustomMessage.prRed(f'Error to export spool files: {quantityExportedSpool}/{quantitySapSpool}'))
-                raise Exception
-
-        except Exception:
-            continue
-
-
-def __rename_exported_files():
-    """  
-    Este método realiza a renomeação dos arquivos .txt exportados [SP02] para o padrão `numeroOrdemSpool_tituloOrdemSpool.txt`. É essencial para identificar, dentro os arquivos exportados, qual transação originou os dados (para isso o campo "Título" deve ser setado durante a parametrização da execução em background contendo o nome da transação)
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            print('Starting renaming of exported spool files')
-            spoolList = __get_spool_list()
-            with os.scandir(env.DIR_SPOOL_DATA) as entries:
-                for entry in entries:
-                    for spool in spoolList:
-                        if spool in entry.name:
-                            newPathName = entry.path.replace(entry.name, f'{spool}_{spoolList[spool]}.txt')
-                            os.rename(entry.path, newPathName)
-            print(f"{utils.CustomMessage.prGreen('Successfully')} spool files rename")
-            return True
-
-        except Exception:
-            logging.exception('Exception ocurred')
-            continue
-
-
-def __remove_all_jobs():
-    """  
-    Este método realiza a remoção de todos os jobs do usuário [SMX]
-    ATENÇÃO: jobs com status "ativo" não podem ser excluídos, deve-se aguardar a conclusão ou realizar o cancelamento
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            print('Removing all SAP user jobs')
-            session = sap.get_session_by_number('ERP', 1)
-            session.StartTransaction("SMX")
-            session.findById("wnd[0]/tbar[1]/btn[8]").press()
-            session.findById("wnd[0]/mbar/menu[1]/menu[11]").select()
-            session.findById("wnd[0]/tbar[1]/btn[14]").press()
-            btnRemoveOne = session.findById("wnd[1]/usr/btnSPOP-OPTION1", False)
-            if btnRemoveOne != None:
-                btnRemoveOne.press()
-
-            info = session.findById("wnd[0]/usr/lbl[2,3]", False)
-            if info != None and info.text == 'Lista não contém dados':
-                return True
-
-        except Exception:
-            continue
-
-
-def __remove_all_spools():
-    """  
-    Este método realiza a remoção de todos as ordens spool do usuário [SP02]
-    ATENÇÃO: dados das ordens spool removidas não poderão ser recuperados, mesmo com jobs concluídos (necessário executar novamente em background)
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            print('Removing all SAP user spools')
-            session = sap.get_session_by_number('ERP', 1)
-            session.StartTransaction("SP02")
-            session.findById("wnd[0]/tbar[1]/btn[45]").press()
-            session.findById("wnd[0]/tbar[1]/btn[48]").press()
-            session.findById("wnd[0]/tbar[1]/btn[14]").press()
-            btnRemoveOne = session.findById("wnd[1]/usr/btnSPOP-OPTION1", False)
-            btnRemoveAll = session.findById("wnd[1]/usr/btnSPOP-OPTION3", False)
-            if btnRemoveAll != None:
-                btnRemoveAll.press()
-            elif btnRemoveOne != None:
-                btnRemoveOne.press()
-
-            info = session.findById("wnd[0]/usr/lbl[2,3]", False)
-            if info != None and info.text == 'Lista não contém dados':
-                return True
-
-        except Exception:
-            continue
-
-
-def __remove_all_exported_files():
-    """  
-    Este método realiza a remoção dos arquivos .txt exportados para o diretório default do SAP Gui
-    ATENÇÃO: os arquivos exportados constam no diretório default do SAP para exportação (ver env.DIR_SPOOL_DATA)
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            print('Removing all SAP exported files')
-            with os.scandir(env.DIR_SPOOL_DATA) as entries:
-                for entry in entries:
-                    os.remove(entry.path)
-            return True
-
-        except Exception:
-            continue
-
-
-def __await_all_job_conclusion():
-    """  
-    Este método realiza a conferência, a cada x segundos,  se todos os jobs do usuário [SMX] estão concluídos (status "Concl."). É necessário assegurar que todos os jobs estão concluídos antes de realizar a exportação dos dados pela transação SP02
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-    """
-
-    while True:
-        try:
-            start = time.time()
-            print('Starting unfinished jobs conference')
-            awaitSeconds = 3
-            while not __is_all_job_concluded():
-                for sec in reversed(range(awaitSeconds)):
-                    print(
-                        f'There are still {utils.CustomMessage.prYellow("unfinished")} jobs. Reassessing in {utils.CustomMessage.prYellow(sec)} seconds', end="\r")
-                    time.sleep(1)
-            print(
-                f'{utils.CustomMessage.prGreen("Successfully")} jobs finished [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]')
-            break
-
-        except Exception:
-            continue
-
-
-def __is_all_job_concluded():
-    """
-    Este método realiza a conferência se todos os jobs do usuário [SMX] estão concluídos (status "Concl.")
-    ATENÇÃO: a lista completa de jobs da transação SMX devem estar visíveis na tela do SAP (sem scroll)
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            session = sap.get_session_by_number('ERP', 1)
-            if session.Info.Transaction != 'SMX':
-                session.StartTransaction("SMX")
-
-            session.findById("wnd[0]/tbar[1]/btn[8]").press()
-            columnIndex = __get_sap_collection_column_index(['Status'])
-
-            row = 3
-            while True:
-                status = session.FindById(f'wnd[0]/usr/lbl[{columnIndex["Status"]},{row}]', False)
-                if status == None:
-                    break
-                if status.text.strip().upper() != "Concl.".upper():
-                    return False
-                row += 1
-
-            return True
-
-        except Exception:
-            continue
-
-# ? ==========================================================================================
-
-def export_files():
-    """  
-    Este método realiza a conferência e exportação dos dados das ordens spool do usuário [SP02]
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            __await_all_job_conclusion()
-            __export_all_spool_files()
-            __rename_exported_files()
-            return True
-
-        except Exception:
-            continue
-
-
-def remove_trash():
-    """  
-    Este método realiza a remoção de jobs, ordens spools e arquivos exportados em preparação para execução em background
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    while True:
-        try:
-            __remove_all_jobs()
-            __remove_all_spools()
-            __remove_all_exported_files()
-            return True
-
-        except Exception:
-            continue
+import re
+import statistics
+import sap
+import os
+import logging
+import env
+import time
+import utils
+import multitask
+import retry
+import tracing
+from retry import RetryPolicy
+from model import TaskConfig
+
+# ? Informações: módulo responsável pelo tratamento dos arquivos de background (conferência de jobs, exportar/excluir arquivos)
+
+# Intervalo (segundos) mínimo e máximo entre as conferências de conclusão dos jobs [SMX]
+JOB_POLL_MIN_SECONDS = 2
+JOB_POLL_MAX_SECONDS = 60
+
+# Prefixos (maiúsculos) do texto da coluna "Status" [SMX] para cada estado de job
+JOB_STATUS_PREFIXES = {
+    'scheduled': ['PLANEJ', 'LIBER', 'PRONTO'],
+    'active': ['ATIVO'],
+    'finished': ['CONCL'],
+    'cancelled': ['CANCEL'],
+}
+
+# Títulos das colunas da lista de jobs [SMX] utilizadas na conferência de conclusão (a coluna "ID do job" deve constar no layout da lista: identifica o job entre jobs de mesmo nome)
+SMX_COLUMN_TITLES = ['Nome do job', 'ID do job', 'Status']
+
+# Tempo máximo (segundos) de espera por jobs submetidos que não constam na lista [SMX], quando a política de novas tentativas não define prazo (deadlineSeconds)
+JOB_UNMATCHED_MAX_SECONDS = 600
+
+# Primeira linha de dados das telas de lista [SP02/SMX] (linhas anteriores correspondem ao cabeçalho)
+LIST_FIRST_DATA_ROW = 3
+
+# Sessões SAP (telas) utilizadas na limpeza em paralelo (remove_trash): jobs [SMX] e ordens spool [SP02]
+CLEANUP_JOBS_SESSION = 1
+CLEANUP_SPOOLS_SESSION = 2
+
+# Títulos das colunas da lista de ordens spool [SP02] e coluna do checkbox de seleção das linhas
+SP02_COLUMN_TITLES = ['Nº spool', 'Título']
+SP02_CHECKBOX_COLUMN = 1
+
+# Tempo máximo (segundos) de espera pelas ordens spool [SP02] dos jobs concluídos, quando a política de novas tentativas não define prazo (deadlineSeconds)
+SPOOL_MISSING_MAX_SECONDS = 300
+
+# Cache do layout (índice das colunas) das telas de lista, por transação e títulos [Exemplo: {('SMX', ('Status',)): {'Status': 4}}]
+COLUMN_INDEX_CACHE = {}
+
+# Durações (segundos) observadas dos jobs concluídos, utilizadas para ajustar o intervalo de conferência
+JOB_DURATION_HISTORY = []
+
+
+def __match_spool_titles(spoolRows: list, spoolTitles: list):
+    """
+    Este método realiza a associação das ordens spool listadas [SP02] aos títulos esperados da execução atual: o título listado deve ser igual ao esperado ou, se truncado na lista, início de um único título esperado. Títulos vazios ou ambíguos são desconsiderados e, havendo mais de uma ordem spool para o mesmo título, prevalece a mais recente (maior número)
+
+    Args:
+        spoolRows (list): número e título das ordens spool listadas [Exemplo: [('56699555', 'IW67_MEDL_S1_001')]]
+        spoolTitles (list): títulos esperados das ordens spool (títulos dos jobs submetidos)
+
+    Returns:
+        object: contendo o número e o título esperado das ordens spool associadas [Exemplo: {56699555: IW67_MEDL_S1_001}]
+    """
+
+    expectedTitles = {title.upper(): title for title in spoolTitles if title}
+    matchedNumbers = {}
+    for number, name in spoolRows:
+        name = name.strip().upper()
+        if name == '':
+            continue
+        if name in expectedTitles:
+            title = expectedTitles[name]
+        else:
+            candidates = [expectedTitles[upperTitle] for upperTitle in expectedTitles if upperTitle.startswith(name)]
+            if len(candidates) != 1:
+                continue
+            title = candidates[0]
+        if title not in matchedNumbers or int(number) > int(matchedNumbers[title]):
+            matchedNumbers[title] = number
+
+    return {number: title for title, number in matchedNumbers.items()}
+
+
+def __get_spool_list(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY, spoolTitles: list | None = None):
+    """
+    Este método realiza a consulta no SAP Gui das ordens spool do usuário [SP02] para obter número e título dos itens. É essencial para identificar os dados resultantes de cada transação executada em background (neste contexto, a partir do campo "Título" setado a cada parametrização da execução em background, contendo o título do job)
+    A lista é consultada novamente até que todos os títulos esperados constem ou até o prazo (deadlineSeconds da política ou SPOOL_MISSING_MAX_SECONDS), quando os jobs sem ordem spool são informados e o resultado parcial é retornado
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+        spoolTitles (list | None): lista de títulos dos jobs da execução atual (None = todas as ordens spool)
+
+    Returns:
+        object: contendo o número e nome (título) das ordens spool [Exemplo: {56699555: 09_2023_IW67}]
+    """
+
+    missingSince = time.time()
+    for attempt in retryPolicy.attempts('background.get_spool_list'):
+        try:
+            session = sap.get_session_by_number('ERP', 1, retryPolicy)
+            if session.Info.Transaction != 'SP02':
+                session.StartTransaction("SP02")
+
+            while True:
+                session.findById("wnd[0]/tbar[1]/btn[45]").press()  # refresh
+                grid = sap.get_list_screen_pages(session, LIST_FIRST_DATA_ROW)
+                columnIndex = __get_cached_column_index('SP02', grid, SP02_COLUMN_TITLES)
+
+                spoolRows = []
+                for row in sorted(grid):
+                    number = grid[row].get(columnIndex['Nº spool'])
+                    name = grid[row].get(columnIndex['Título'])
+                    if row < LIST_FIRST_DATA_ROW or number is None or name is None or not number.isdigit():
+                        continue
+                    spoolRows.append((number, name))
+
+                if spoolTitles is None:
+                    spoolList = dict(spoolRows)
+                    missingTitles = [] if len(spoolList) != 0 else [None]
+                else:
+                    spoolList = __match_spool_titles(spoolRows, spoolTitles)
+                    missingTitles = sorted(set(spoolTitles) - set(spoolList.values()))
+
+                missingMaxSeconds = retryPolicy.deadlineSeconds or SPOOL_MISSING_MAX_SECONDS
+                if len(missingTitles) == 0 or time.time() - missingSince > missingMaxSeconds:
+                    break
+                time.sleep(JOB_POLL_MIN_SECONDS)
+
+            if spoolTitles is not None and len(missingTitles) != 0:
+                logging.warning(f'Jobs without spool order [SP02]: {missingTitles}')
+                print(f'{utils.CustomMessage.prRed(f"{len(missingTitles)} jobs")} without spool order: {", ".join(missingTitles)}')
+
+            attempt.succeeded()
+            return spoolList
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            COLUMN_INDEX_CACHE.pop(('SP02', tuple(SP02_COLUMN_TITLES)), None)
+            continue
+
+
+def get_exported_spool_files(spoolList: dict):
+    """
+    Este método realiza a identificação dos arquivos exportados [SP02] de cada ordem spool, a partir dos números contidos no nome do arquivo (consulta direta no dicionário de ordens spool)
+
+    Args:
+        spoolList (dict): número e nome (título) das ordens spool
+
+    Returns:
+        object: contendo o número da ordem spool e a entrada do arquivo exportado [Exemplo: {56699555: DirEntry}]
+    """
+
+    exportedFiles = {}
+    with os.scandir(env.DIR_SPOOL_DATA) as entries:
+        for entry in entries:
+            for number in re.findall(r'\d+', entry.name):
+                if number in spoolList:
+                    exportedFiles[number] = entry
+                    break
+
+    return exportedFiles
+
+
+def __export_spool_files(spoolList: dict, retryPolicy: RetryPolicy = retry.DEFAULT_POLICY):
+    """
+    Este método realiza a exportação somente das ordens spool informadas para arquivos .txt [SP02] para o diretório default do SAP Gui, selecionando as linhas de cada ordem spool na lista. Segue a ordens de passos: Ordem de spool > Transferir > Exportar como texto. A cada nova tentativa somente as ordens spool sem arquivo exportado são selecionadas
+    ATENÇÃO: os arquivos exportados constam no diretório default do SAP para exportação (ver env.DIR_SPOOL_DATA)
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        spoolList (dict): número e nome (título) das ordens spool para exportação
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    start = time.time()
+    pendingSpools = dict(spoolList)
+    print(f'Starting exportation of {len(pendingSpools)} spool files')
+
+    for attempt in retryPolicy.attempts('background.export_spool_files'):
+        try:
+            session = sap.get_session_by_number('ERP', 1, retryPolicy)
+            if session.Info.Transaction != 'SP02':
+                session.StartTransaction("SP02")
+            session.findById("wnd[0]/tbar[1]/btn[45]").press()  # refresh
+
+            selected = 0
+            for _, pageGrid in sap.iterate_list_screen_pages(session):
+                columnIndex = __get_cached_column_index('SP02', pageGrid, SP02_COLUMN_TITLES)
+                for row, columns in pageGrid.items():
+                    if row >= LIST_FIRST_DATA_ROW and columns.get(columnIndex['Nº spool']) in pendingSpools:
+                        session.findById(f'wnd[0]/usr/chk[{SP02_CHECKBOX_COLUMN},{row}]').selected = True
+                        selected += 1
+
+            if selected == 0:
+                raise Exception('No spool selected for exportation')
+            session.findById("wnd[0]/mbar/menu[0]/menu[2]/menu[1]").select()  # export as text
+
+            for number in get_exported_spool_files(pendingSpools):
+                pendingSpools.pop(number)
+
+            quantityExportedSpool = len(spoolList) - len(pendingSpools)
+            if not pendingSpools:
+                print(f'{utils.CustomMessage.prGreen("Successfully")} spool files exportation [{quantityExportedSpool}] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]')
+                attempt.succeeded()
+                return True
+
+            print(utils.CustomMessage.prRed(f'Error to export spool files: {quantityExportedSpool}/{len(spoolList)}. Retrying {len(pendingSpools)} missing spools'))
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            COLUMN_INDEX_CACHE.pop(('SP02', tuple(SP02_COLUMN_TITLES)), None)
+            continue
+
+
+def __rename_exported_files(spoolList: dict, retryPolicy: RetryPolicy = retry.DEFAULT_POLICY):
+    """
+    Este método realiza a renomeação dos arquivos .txt exportados [SP02] para o padrão `numeroOrdemSpool_tituloOrdemSpool.txt`. É essencial para identificar, dentro os arquivos exportados, qual transação originou os dados (para isso o campo "Título" deve ser setado durante a parametrização da execução em background contendo o nome da transação)
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        spoolList (dict): número e nome (título) das ordens spool exportadas
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    for attempt in retryPolicy.attempts('background.rename_exported_files'):
+        try:
+            print('Starting renaming of exported spool files')
+            for number, entry in get_exported_spool_files(spoolList).items():
+                newName = f'{number}_{spoolList[number]}.txt'
+                if entry.name != newName:
+                    os.rename(entry.path, os.path.join(os.path.dirname(entry.path), newName))
+            print(f"{utils.CustomMessage.prGreen('Successfully')} spool files rename")
+            attempt.succeeded()
+            return True
+
+        except Exception:
+            logging.exception('Exception ocurred')
+            continue
+
+
+def __remove_all_jobs(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY, sessionNumber: int = 1):
+    """
+    Este método realiza a remoção de todos os jobs do usuário [SMX]
+    ATENÇÃO: jobs com status "ativo" não podem ser excluídos, deve-se aguardar a conclusão ou realizar o cancelamento
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+        sessionNumber (int): número da sessão SAP (tela) utilizada na remoção
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    for attempt in retryPolicy.attempts('background.remove_all_jobs'):
+        try:
+            print('Removing all SAP user jobs')
+            session = sap.get_session_by_number('ERP', sessionNumber, retryPolicy)
+            session.StartTransaction("SMX")
+            session.findById("wnd[0]/tbar[1]/btn[8]").press()
+            session.findById("wnd[0]/mbar/menu[1]/menu[11]").select()
+            session.findById("wnd[0]/tbar[1]/btn[14]").press()
+            btnRemoveOne = session.findById("wnd[1]/usr/btnSPOP-OPTION1", False)
+            if btnRemoveOne != None:
+                btnRemoveOne.press()
+
+            info = session.findById("wnd[0]/usr/lbl[2,3]", False)
+            if info != None and info.text == 'Lista não contém dados':
+                attempt.succeeded()
+                return True
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            continue
+
+
+def __remove_all_spools(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY, sessionNumber: int = 1):
+    """
+    Este método realiza a remoção de todos as ordens spool do usuário [SP02]
+    ATENÇÃO: dados das ordens spool removidas não poderão ser recuperados, mesmo com jobs concluídos (necessário executar novamente em background)
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+        sessionNumber (int): número da sessão SAP (tela) utilizada na remoção
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    for attempt in retryPolicy.attempts('background.remove_all_spools'):
+        try:
+            print('Removing all SAP user spools')
+            session = sap.get_session_by_number('ERP', sessionNumber, retryPolicy)
+            session.StartTransaction("SP02")
+            session.findById("wnd[0]/tbar[1]/btn[45]").press()
+            session.findById("wnd[0]/tbar[1]/btn[48]").press()
+            session.findById("wnd[0]/tbar[1]/btn[14]").press()
+            btnRemoveOne = session.findById("wnd[1]/usr/btnSPOP-OPTION1", False)
+            btnRemoveAll = session.findById("wnd[1]/usr/btnSPOP-OPTION3", False)
+            if btnRemoveAll != None:
+                btnRemoveAll.press()
+            elif btnRemoveOne != None:
+                btnRemoveOne.press()
+
+            info = session.findById("wnd[0]/usr/lbl[2,3]", False)
+            if info != None and info.text == 'Lista não contém dados':
+                attempt.succeeded()
+                return True
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            continue
+
+
+def __remove_all_exported_files(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY):
+    """
+    Este método realiza a remoção dos arquivos .txt exportados para o diretório default do SAP Gui
+    ATENÇÃO: os arquivos exportados constam no diretório default do SAP para exportação (ver env.DIR_SPOOL_DATA)
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    for attempt in retryPolicy.attempts('background.remove_all_exported_files'):
+        try:
+            print('Removing all SAP exported files')
+            with os.scandir(env.DIR_SPOOL_DATA) as entries:
+                for entry in entries:
+                    os.remove(entry.path)
+            attempt.succeeded()
+            return True
+
+        except Exception:
+            continue
+
+
+def __get_cached_column_index(transaction: str, grid: dict, columnTitle: list):
+    """
+    Este método retorna o índice das colunas de uma tela de lista a partir do cache de layout (COLUMN_INDEX_CACHE), identificando as colunas na grade informada somente na primeira chamada para a transação
+
+    Args:
+        transaction (str): código da transação da tela de lista [Exemplo: SMX]
+        grid (dict): grade linha/coluna da tela de lista (ver sap.get_list_screen_grid)
+        columnTitle (list): lista de títulos para consulta
+
+    Returns:
+        object: contendo título e índice da coluna (index) [Exemplo: {Status: 4}]
+    """
+
+    cacheKey = (transaction, tuple(columnTitle))
+    if cacheKey not in COLUMN_INDEX_CACHE:
+        columnIndex = sap.get_list_column_index(grid, columnTitle)
+        if len(columnIndex) != len(columnTitle):
+            return columnIndex
+        COLUMN_INDEX_CACHE[cacheKey] = columnIndex
+
+    return COLUMN_INDEX_CACHE[cacheKey]
+
+
+def __get_job_state(statusText: str):
+
+    text = statusText.strip().upper()
+    for state, prefixes in JOB_STATUS_PREFIXES.items():
+        if any(text.startswith(prefix) for prefix in prefixes):
+            return state
+
+    return 'scheduled'
+
+
+def __get_job_status_list(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY):
+    """
+    Este método realiza a consulta do status dos jobs do usuário [SMX] com uma única enumeração dos itens por página da lista (sap.get_list_screen_pages), utilizando o layout de colunas em cache
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+
+    Returns:
+        object: contendo o nome e identificador (contador) de cada job e os dados do job [Exemplo: {('RIQMEL20', '12345678'): {'name': 'RIQMEL20', 'count': '12345678', 'status': 'Concl.', 'state': 'finished'}}]
+    """
+
+    for attempt in retryPolicy.attempts('background.get_job_status_list'):
+        try:
+            session = sap.get_session_by_number('ERP', 1, retryPolicy)
+            if session.Info.Transaction != 'SMX':
+                session.StartTransaction("SMX")
+
+            session.findById("wnd[0]/tbar[1]/btn[8]").press()  # refresh
+            grid = sap.get_list_screen_pages(session, LIST_FIRST_DATA_ROW)
+            columnIndex = __get_cached_column_index('SMX', grid, SMX_COLUMN_TITLES)
+            statusColumn = columnIndex.get('Status')
+            nameColumn = columnIndex.get('Nome do job')
+            countColumn = columnIndex.get('ID do job')
+            if statusColumn is None:
+                if any(text == 'Lista não contém dados' for columns in grid.values() for text in columns.values()):
+                    attempt.succeeded()
+                    return {}
+                raise Exception('SMX status column not found')
+
+            jobs = {}
+            for row in sorted(grid):
+                statusText = grid[row].get(statusColumn)
+                if row < LIST_FIRST_DATA_ROW or statusText is None:
+                    continue
+                # a linha de cada job muda entre as consultas (lista reordenada/paginada): o job é identificado pelo nome e contador
+                job = {'name': grid[row].get(nameColumn, ''), 'count': grid[row].get(countColumn, ''), 'status': statusText, 'state': __get_job_state(statusText)}
+                jobs[(job['name'], job['count'])] = job
+
+            attempt.succeeded()
+            return jobs
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            COLUMN_INDEX_CACHE.pop(('SMX', tuple(SMX_COLUMN_TITLES)), None)
+            continue
+
+
+def __get_job_poll_seconds(activeSeconds: list):
+    """
+    Este método calcula o intervalo até a próxima conferência dos jobs [SMX] a partir da duração esperada (mediana de JOB_DURATION_HISTORY) e do tempo decorrido dos jobs ativos. Sem histórico de duração, utiliza o intervalo mínimo
+
+    Args:
+        activeSeconds (list): tempo decorrido (segundos) de cada job ativo
+
+    Returns:
+        float: intervalo em segundos (entre JOB_POLL_MIN_SECONDS e JOB_POLL_MAX_SECONDS)
+    """
+
+    if not JOB_DURATION_HISTORY:
+        return JOB_POLL_MIN_SECONDS
+
+    expectedSeconds = statistics.median(JOB_DURATION_HISTORY[-50:])
+    if activeSeconds:
+        remainingSeconds = expectedSeconds - max(activeSeconds)
+    else:
+        remainingSeconds = expectedSeconds
+
+    if remainingSeconds > 0:
+        # aguarda metade do tempo restante esperado para o job mais antigo
+        pollSeconds = remainingSeconds / 2
+    else:
+        # job em atraso: espera crescente conforme o atraso
+        pollSeconds = JOB_POLL_MIN_SECONDS + abs(remainingSeconds) / 4
+
+    return max(JOB_POLL_MIN_SECONDS, min(JOB_POLL_MAX_SECONDS, pollSeconds))
+
+
+def __await_all_job_conclusion(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY, receipts: list | None = None):
+    """
+    Este método realiza a conferência, com intervalo adaptado à duração esperada dos jobs, se todos os jobs do usuário [SMX] estão finalizados (concluídos ou cancelados). Cada transição de estado dos jobs é informada no terminal. É necessário assegurar que todos os jobs estão concluídos antes de realizar a exportação dos dados pela transação SP02
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+        receipts (list | None): comprovantes (JobReceipt) dos jobs da execução atual. Somente os jobs com o contador (ID do job) lido na submissão são conferidos e jobs ainda não listados são considerados planejados até o prazo (deadlineSeconds da política ou JOB_UNMATCHED_MAX_SECONDS). Sem o contador em algum comprovante, todos os jobs do usuário são conferidos (None = todos os jobs do usuário)
+
+    Returns:
+        object: contendo a quantidade de jobs por estado [Exemplo: {'scheduled': 0, 'active': 0, 'finished': 12, 'cancelled': 0}]
+    """
+
+    for attempt in retryPolicy.attempts('background.await_all_job_conclusion'):
+        try:
+            start = time.time()
+            print('Starting unfinished jobs conference')
+            jobStates = {}
+            activeSince = {}
+            unmatchedSince = None
+            receiptCounts = {receipt.jobCount for receipt in receipts if receipt.jobCount} if receipts else set()
+            if receipts and len(receiptCounts) < len(receipts):
+                # jobs sem contador lido na submissão não podem ser identificados na lista: todos os jobs do usuário são conferidos
+                logging.warning(f'{len(receipts) - len(receiptCounts)} job receipts without job count, awaiting all user jobs')
+                receiptCounts = set()
+
+            while True:
+                jobs = __get_job_status_list(retryPolicy)
+                unmatchedCounts = set()
+                if receiptCounts:
+                    jobs = {jobKey: job for jobKey, job in jobs.items() if job['count'] in receiptCounts}
+                    unmatchedCounts = receiptCounts - {job['count'] for job in jobs.values()}
+                now = time.time()
+                for jobKey, job in jobs.items():
+                    state = job['state']
+                    previousState = jobStates.get(jobKey)
+                    if previousState == state:
+                        continue
+
+                    if previousState is not None:
+                        print(f'Job {job["name"]} [{job["count"]}]: {previousState} -> {utils.CustomMessage.prYellow(state)}'.ljust(80))
+                    if state == 'active':
+                        activeSince[jobKey] = now
+                    elif state in ('finished', 'cancelled') and jobKey in activeSince:
+                        JOB_DURATION_HISTORY.append(now - activeSince.pop(jobKey))
+                    jobStates[jobKey] = state
+
+                counts = {state: 0 for state in JOB_STATUS_PREFIXES}
+                for job in jobs.values():
+                    counts[job['state']] += 1
+                counts['scheduled'] += len(unmatchedCounts)
+
+                # jobs submetidos ausentes da lista (ex.: excluídos ou coluna "ID do job" fora do layout) não são aguardados indefinidamente
+                unmatchedSince = (unmatchedSince or now) if unmatchedCounts else None
+                unmatchedMaxSeconds = retryPolicy.deadlineSeconds or JOB_UNMATCHED_MAX_SECONDS
+                if unmatchedSince is not None and now - unmatchedSince > unmatchedMaxSeconds:
+                    logging.error(f'Submitted jobs not found in SMX after {unmatchedMaxSeconds} seconds [{sorted(unmatchedCounts)}]')
+                    raise retry.RetryError(f'{len(unmatchedCounts)} submitted jobs not found in SMX after {unmatchedMaxSeconds} seconds')
+
+                countText = ' | '.join(f'{count} {state}' for state, count in counts.items())
+                if counts['scheduled'] == 0 and counts['active'] == 0:
+                    break
+
+                pollSeconds = __get_job_poll_seconds([now - since for since in activeSince.values()])
+                print(f'There are still {utils.CustomMessage.prYellow("unfinished")} jobs [{countText}]. Reassessing in {utils.CustomMessage.prYellow(f"{pollSeconds:.1f}")} seconds', end="\r")
+                time.sleep(pollSeconds)
+
+            if counts['cancelled'] > 0:
+                print(utils.CustomMessage.prRed(f'There are {counts["cancelled"]} cancelled jobs'))
+                logging.warning(f'Cancelled background jobs [{countText}]')
+
+            print(
+                f'{utils.CustomMessage.prGreen("Successfully")} jobs finished [{countText}] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]')
+            attempt.succeeded()
+            return counts
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            continue
+
+# ? ==========================================================================================
+
+def export_files(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY, receipts: list | None = None, removeExported: bool = True):
+    """
+    Este método realiza a conferência e exportação dos dados das ordens spool da execução atual [SP02]. Somente os jobs e ordens spool dos comprovantes de submissão informados são conferidos e exportados
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+        receipts (list | None): comprovantes (JobReceipt) dos jobs submetidos na execução atual (None = todos os jobs e ordens spool do usuário)
+        removeExported (bool): se True, remove os arquivos exportados anteriormente antes da exportação (False = reenvio de consultas, mantém os arquivos já exportados)
+
+    Returns:
+        object: contendo o número da ordem spool exportada e o título do job do comprovante correspondente (ver __match_spool_titles) [Exemplo: {56699555: IW67_MEDL_S1_001}]. Os arquivos exportados são identificados pelo número (ver get_exported_spool_files)
+    """
+
+    if receipts is not None and len(receipts) == 0:
+        print(f'{utils.CustomMessage.prYellow("No jobs")} submitted to export')
+        return {}
+
+    spoolTitles = None if receipts is None else [receipt.jobTitle for receipt in receipts]
+    for attempt in retryPolicy.attempts('background.export_files'):
+        try:
+            with tracing.span('await_jobs', jobs=len(receipts) if receipts is not None else None) as span:
+                counts = __await_all_job_conclusion(retryPolicy, receipts)
+                span.set('cancelled', counts['cancelled'])
+            with tracing.span('get_spool_list') as span:
+                spoolList = __get_spool_list(retryPolicy, spoolTitles)
+                span.set('spools', len(spoolList))
+            with tracing.span('export', spools=len(spoolList)):
+                if removeExported:
+                    __remove_all_exported_files(retryPolicy)
+                __export_spool_files(spoolList, retryPolicy)
+            with tracing.span('rename', spools=len(spoolList)):
+                __rename_exported_files(spoolList, retryPolicy)
+            attempt.succeeded()
+            return spoolList
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            continue
+
+
+def remove_trash(retryPolicy: RetryPolicy = retry.DEFAULT_POLICY, parallel: bool = False):
+    """
+    Este método realiza a remoção de jobs, ordens spools e arquivos exportados em preparação para execução em background
+    ATENÇÃO: em modo paralelo as remoções de jobs [SMX] e ordens spool [SP02] ocorrem simultaneamente em sessões distintas (CLEANUP_JOBS_SESSION e CLEANUP_SPOOLS_SESSION), junto da remoção dos arquivos exportados, cada uma em uma thread
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+        parallel (bool): se True, executa as remoções em paralelo
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    for attempt in retryPolicy.attempts('background.remove_trash'):
+        try:
+            with tracing.span('remove_trash', parallel=parallel):
+                if not parallel:
+                    __remove_all_jobs(retryPolicy)
+                    __remove_all_spools(retryPolicy)
+                    __remove_all_exported_files(retryPolicy)
+                    attempt.succeeded()
+                    return True
+
+                start = time.time()
+                results = multitask.run_multithread([
+                    TaskConfig(__remove_all_jobs, [retryPolicy, CLEANUP_JOBS_SESSION]),
+                    TaskConfig(__remove_all_spools, [retryPolicy, CLEANUP_SPOOLS_SESSION]),
+                    TaskConfig(__remove_all_exported_files, [retryPolicy]),
+                ])
+                if not all(results):
+                    raise Exception('Failed to remove trash in parallel')
+
+                print(f'{utils.CustomMessage.prGreen("Successfully")} removed jobs, spools and exported files [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]')
+                attempt.succeeded()
+                return True
+
+        except retry.RetryError:
+            raise
+
+        except Exception:
+            continue
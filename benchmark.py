@@ -0,0 +1,171 @@
+import os
+import time
+import argparse
+import tempfile
+import datetime
+import env
+import sap
+import utils
+import main
+import background
+import simulator
+import logQueue
+import tracing
+from model import UpdateData
+
+# ? Informações: módulo responsável pelo benchmark offline da atualização completa (main.run_update_IW67_MEDL) com o SAP GUI simulado (ver simulator.py)
+
+# Etapas medidas no benchmark: nome da etapa, objeto (módulo/classe) e nome do método/função executado na etapa
+BENCHMARK_PHASES = [
+    ('remove_trash', background, 'remove_trash'),
+    ('submit_jobs', main, '__run_update_into_file'),
+    ('await_jobs', background, '__await_all_job_conclusion'),
+    ('get_spool_list', background, '__get_spool_list'),
+    ('export_spools', background, '__export_spool_files'),
+    ('rename_spools', background, '__rename_exported_files'),
+    ('import_file_data', UpdateData, 'import_file_data'),
+    ('export_file_data', UpdateData, 'export_file_data'),
+    ('merge_tables', main, '__merge_table_data'),
+]
+
+
+def __get_timed_callback(phaseTimings: dict, phaseName: str, callback: any):
+    """
+    Este método retorna a função informada com a medição do tempo de execução (acumulado em phaseTimings a cada chamada)
+
+    Args:
+        phaseTimings (dict): quantidade e tempo total (segundos) de cada etapa [Exemplo: {'await_jobs': [1, 12.4]}]
+        phaseName (str): nome da etapa
+        callback (any): função executada na etapa
+
+    Returns:
+        any: função com medição do tempo de execução
+    """
+
+    def timedCallback(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return callback(*args, **kwargs)
+        finally:
+            timing = phaseTimings.setdefault(phaseName, [0, 0.0])
+            timing[0] += 1
+            timing[1] += time.perf_counter() - start
+
+    return timedCallback
+
+
+def run_benchmark(qtdSessions: int = 6, maxConcurrentSpools: int = 120, measurementCount: int | None = None, workDirectory: str | None = None, instrumentComCalls: bool = False, traceMemory: bool = False, **simulatorConfig):
+    """
+    Este método executa a atualização completa IW67 MEDL (main.run_update_IW67_MEDL) com o SAP GUI simulado, medindo o tempo total, as chamadas COM e o tempo de cada etapa (BENCHMARK_PHASES)
+    ATENÇÃO: as sessões são executadas em threads (main.PARALLEL_MODE) e os diretórios de ambiente (env) são direcionados para o diretório de trabalho durante a execução
+
+    Args:
+        qtdSessions (int): quantidade de sessões SAP (telas) utilizadas
+        maxConcurrentSpools (int): quantidade máxima de ordens spool por ciclo
+        measurementCount (int | None): quantidade de códigos de medida consultados (None = main.MEASUREMENT_MEDL)
+        workDirectory (str | None): diretório dos arquivos gerados (None = diretório temporário)
+        instrumentComCalls (bool): se True, ativa a instrumentação das chamadas COM por local de chamada (ver sap.INSTRUMENT_COM_CALLS)
+        traceMemory (bool): se True, registra a memória de cada etapa nos spans do rastreamento (ver tracing.TRACE_MEMORY)
+        **simulatorConfig: parâmetros do simulador (ver simulator.SapGuiSimulator)
+
+    Returns:
+        object: contendo tempo total, chamadas COM, tempo de cada etapa e totais da simulação
+    """
+
+    workDirectory = workDirectory or tempfile.mkdtemp(prefix='sap_benchmark_')
+    directories = {name: os.path.join(workDirectory, folder) for name, folder in [('DIR_SPOOL_DATA', 'spool'), ('DIR_EXPORTED_DATA', 'data'), ('DIR_TABLE_DATA', 'table')]}
+    for directory in directories.values():
+        os.makedirs(directory, exist_ok=True)
+
+    sapSimulator = simulator.SapGuiSimulator(sessionCount=max(qtdSessions, background.CLEANUP_SPOOLS_SESSION), **simulatorConfig)
+    phaseTimings = {}
+
+    originalValues = [(env, name, getattr(env, name)) for name in directories]
+    originalValues += [(sap, 'SCRIPTING_ENGINE', sap.SCRIPTING_ENGINE), (main, 'PARALLEL_MODE', main.PARALLEL_MODE), (main, 'MEASUREMENT_MEDL', main.MEASUREMENT_MEDL), (sap, 'INSTRUMENT_COM_CALLS', sap.INSTRUMENT_COM_CALLS),
+                       (tracing, 'TRACE_MEMORY', tracing.TRACE_MEMORY)]
+    originalValues += [(owner, attributeName, owner.__dict__[attributeName]) for _, owner, attributeName in BENCHMARK_PHASES]
+
+    try:
+        for name, directory in directories.items():
+            setattr(env, name, directory)
+        sap.SCRIPTING_ENGINE = sapSimulator.get_scripting_engine()
+        main.PARALLEL_MODE = 'thread'
+        sap.INSTRUMENT_COM_CALLS = instrumentComCalls
+        tracing.TRACE_MEMORY = traceMemory
+        if measurementCount is not None:
+            main.MEASUREMENT_MEDL = [(index * 10) + 10 for index in range(measurementCount)]
+        for phaseName, owner, attributeName in BENCHMARK_PHASES:
+            setattr(owner, attributeName, __get_timed_callback(phaseTimings, phaseName, owner.__dict__[attributeName]))
+
+        start = time.perf_counter()
+        referenceDate = datetime.date.today()
+        referenceInfo = getattr(main, '__get_reference_info')(referenceDate.strftime("%Y_%m"))
+        main.run_update_IW67_MEDL(referenceInfo, qtdSessions, maxConcurrentSpools)
+        wallSeconds = time.perf_counter() - start
+
+    finally:
+        for owner, attributeName, value in originalValues:
+            setattr(owner, attributeName, value)
+
+    return {
+        'wallSeconds': round(wallSeconds, 3),
+        'statistics': sapSimulator.get_statistics(),
+        'comCalls': sapSimulator.get_call_counts(),
+        'phases': {phaseName: {'count': count, 'total': round(total, 3)} for phaseName, (count, total) in phaseTimings.items()},
+        'workDirectory': workDirectory,
+    }
+
+
+def print_benchmark_report(report: dict, maxComMembers: int = 10):
+    """
+    Este método realiza a escrita no terminal do resultado do benchmark (ver run_benchmark)
+
+    Args:
+        report (dict): resultado do benchmark
+        maxComMembers (int): quantidade de membros COM mais chamados exibidos
+    """
+
+    statistics = report['statistics']
+    wallSeconds = report['wallSeconds']
+    utils.print_start_block(f'Benchmark report [{utils.CustomMessage.prYellow(f"{wallSeconds:.3f}")} seconds]')
+    print(f'COM calls: {statistics["comCalls"]} [simulated latency {statistics["latencySeconds"]:.3f} seconds]')
+    print(f'Jobs: {statistics["jobs"]} | Spools: {statistics["spools"]} | Exported rows: {statistics["exportedRows"]}')
+
+    print('Time per phase:')
+    for phaseName, timing in report['phases'].items():
+        share = timing['total'] / wallSeconds if wallSeconds else 0
+        print(f'  {phaseName.ljust(20)} {timing["total"]:>10.3f} s {share:>7.1%} [{timing["count"]}x]')
+
+    print('Top COM members:')
+    for name, count in list(report['comCalls'].items())[:maxComMembers]:
+        print(f'  {name.ljust(20)} {count:>10}')
+
+    utils.print_end_block(f'Files generated in {report["workDirectory"]}')
+
+
+# ! ----------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Offline benchmark of run_update_IW67_MEDL with a simulated SAP GUI')
+    parser.add_argument('--sessions', type=int, default=6, help='SAP sessions (max 6)')
+    parser.add_argument('--max-spools', type=int, default=120, help='max spools per cycle')
+    parser.add_argument('--measurements', type=int, default=None, help='measurement codes queried (default: main.MEASUREMENT_MEDL)')
+    parser.add_argument('--call-latency', type=float, default=0.001, help='seconds per COM call')
+    parser.add_argument('--round-trip', type=float, default=0.02, help='seconds per server round trip (buttons, menus, lists)')
+    parser.add_argument('--job-seconds', type=float, default=5, help='base job duration in seconds')
+    parser.add_argument('--rows', type=int, default=500, help='spool rows per measurement code')
+    parser.add_argument('--visible-rows', type=int, default=30, help='visible rows per list page [SP02/SMX]')
+    parser.add_argument('--instrument-com', action='store_true', help='summarize COM calls per call site (sap.INSTRUMENT_COM_CALLS)')
+    parser.add_argument('--trace-memory', action='store_true', help='record per-stage memory in the trace (see: python tracing.py memory)')
+    parser.add_argument('--work-dir', default=None, help='directory for generated files (default: temporary directory)')
+    args = parser.parse_args()
+
+    logQueue.start_logging()
+    try:
+        report = run_benchmark(args.sessions, args.max_spools, args.measurements, args.work_dir, args.instrument_com, args.trace_memory, callLatencySeconds=args.call_latency, roundTripSeconds=args.round_trip,
+                               jobSeconds=args.job_seconds, rowsPerParam=args.rows, visibleRows=args.visible_rows)
+        print_benchmark_report(report)
+
+    finally:
+        logQueue.stop_logging()
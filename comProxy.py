@@ -0,0 +1,207 @@
+import sys
+import time
+import logging
+import threading
+import utils
+
+# ? Informações: módulo responsável pela instrumentação das chamadas COM ao SAP GUI Script (proxy transparente da sessão e dos objetos obtidos a partir dela)
+
+# Tipos retornados sem proxy (valores primitivos, não são objetos COM)
+PRIMITIVE_TYPES = (str, int, float, bool, bytes, type(None))
+
+# Quantidade e tempo total (segundos) das chamadas COM por local de chamada e membro [Exemplo: {('background.__get_spool_list', 'findById()'): [12, 0.35]}]
+COM_CALL_STATS = {}
+
+COM_CALL_STATS_LOCK = threading.Lock()
+
+
+def get_call_site():
+    """
+    Este método identifica o local (módulo e função) que originou a chamada COM, ignorando os quadros deste módulo. Funções internas (lambda, compreensões) são atribuídas à função que as contém [Exemplo: sap.create_background_job]
+
+    Returns:
+        str: módulo e função de origem da chamada [Exemplo: background.__get_spool_list]
+    """
+
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__') == __name__:
+        frame = frame.f_back
+
+    if frame is None:
+        return 'unknown'
+
+    code = frame.f_code
+    qualifiedName = getattr(code, 'co_qualname', code.co_name).split('.<locals>')[0]
+    return f'{frame.f_globals.get("__name__", "unknown")}.{qualifiedName}'
+
+
+def record_call(callSite: str, member: str, seconds: float):
+
+    with COM_CALL_STATS_LOCK:
+        stats = COM_CALL_STATS.setdefault((callSite, member), [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+
+
+def wrap(value: any):
+    """
+    Este método retorna o valor obtido do SAP GUI Script com proxy (ComCallProxy) quando se tratar de um objeto COM. Valores primitivos são retornados sem alteração
+
+    Args:
+        value (any): valor retornado por uma propriedade ou método COM
+
+    Returns:
+        any: valor original ou objeto COM com proxy
+    """
+
+    if isinstance(value, PRIMITIVE_TYPES) or isinstance(value, ComCallProxy):
+        return value
+    return ComCallProxy(value)
+
+
+class ComCallProxy:
+
+    """
+    Esta classe representa o proxy transparente de um objeto COM do SAP GUI Script (sessão, janela, campo, coleção...). Cada leitura de propriedade, escrita e chamada de método é repassada ao objeto original e contabilizada por local de chamada (COM_CALL_STATS); os objetos COM retornados também recebem proxy
+    ATENÇÃO: uso opcional (ver sap.INSTRUMENT_COM_CALLS), a medição acrescenta o custo da identificação do local de chamada a cada acesso
+
+    A classe ComCallProxy faz o seguinte:
+        - Mede quantidade e tempo de cada propriedade (leitura "Text", escrita "Text=") e método ("findById()")
+        - Propaga o proxy aos objetos COM derivados (findById, Children, Info...)
+    """
+
+    __slots__ = ('_target',)
+
+    def __init__(self, target: object):
+        object.__setattr__(self, '_target', target)
+
+    def __getattr__(self, name: str):
+        callSite = get_call_site()
+        start = time.perf_counter()
+        value = getattr(self._target, name)
+        seconds = time.perf_counter() - start
+
+        if callable(value) and not isinstance(value, PRIMITIVE_TYPES) and not hasattr(value, '_oleobj_'):
+            # método COM: o tempo da leitura do membro é somado ao tempo da chamada
+            def method(*args, **kwargs):
+                methodStart = time.perf_counter()
+                try:
+                    return wrap(value(*args, **kwargs))
+                finally:
+                    record_call(get_call_site(), f'{name}()', seconds + time.perf_counter() - methodStart)
+            return method
+
+        record_call(callSite, name, seconds)
+        return wrap(value)
+
+    def __setattr__(self, name: str, value: any):
+        callSite = get_call_site()
+        start = time.perf_counter()
+        try:
+            setattr(self._target, name, value)
+        finally:
+            record_call(callSite, f'{name}=', time.perf_counter() - start)
+
+    def __iter__(self):
+        callSite = get_call_site()
+        iterator = iter(self._target)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                record_call(callSite, 'Item', time.perf_counter() - start)
+            yield wrap(item)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __repr__(self):
+        return f'ComCallProxy({self._target!r})'
+
+
+# ? ==========================================================================================
+
+def reset_com_call_stats():
+
+    with COM_CALL_STATS_LOCK:
+        COM_CALL_STATS.clear()
+
+
+def get_com_call_stats():
+    """
+    Este método retorna uma cópia das chamadas COM contabilizadas no processo atual. Utilizado pelos processos filhos para enviar a contagem da tarefa ao processo principal (ver merge_com_call_stats)
+
+    Returns:
+        object: quantidade e tempo total por local de chamada e membro [Exemplo: {('sap.create_background_job', 'findById()'): [12, 0.35]}]
+    """
+
+    with COM_CALL_STATS_LOCK:
+        return {key: list(stats) for key, stats in COM_CALL_STATS.items()}
+
+
+def merge_com_call_stats(stats: dict):
+    """
+    Este método soma ao processo atual as chamadas COM contabilizadas em outro processo (ver get_com_call_stats)
+
+    Args:
+        stats (dict): quantidade e tempo total por local de chamada e membro
+    """
+
+    with COM_CALL_STATS_LOCK:
+        for key, (count, total) in stats.items():
+            currentStats = COM_CALL_STATS.setdefault(key, [0, 0.0])
+            currentStats[0] += count
+            currentStats[1] += total
+
+
+def get_com_call_summary(limit: int = 20):
+    """
+    Este método retorna o resumo das chamadas COM contabilizadas pelo proxy, agrupadas por local de chamada e ordenadas pelo tempo total (maior latência primeiro)
+
+    Args:
+        limit (int): quantidade máxima de locais de chamada retornados
+
+    Returns:
+        list: locais de chamada com quantidade, tempo total (segundos) e membros mais custosos [Exemplo: [{'callSite': 'background.__get_spool_list', 'count': 420, 'total': 1.2, 'members': {'Text': {'count': 300, 'total': 0.9}}}]]
+    """
+
+    with COM_CALL_STATS_LOCK:
+        items = list(COM_CALL_STATS.items())
+
+    callSites = {}
+    for (callSite, member), (count, total) in items:
+        summary = callSites.setdefault(callSite, {'callSite': callSite, 'count': 0, 'total': 0.0, 'members': {}})
+        summary['count'] += count
+        summary['total'] += total
+        summary['members'][member] = {'count': count, 'total': round(total, 4)}
+
+    summaries = sorted(callSites.values(), key=lambda summary: summary['total'], reverse=True)[:limit]
+    for summary in summaries:
+        summary['total'] = round(summary['total'], 4)
+        summary['members'] = dict(sorted(summary['members'].items(), key=lambda item: item[1]['total'], reverse=True))
+
+    return summaries
+
+
+def dump_com_call_summary(title: str, limit: int = 20, maxMembers: int = 3):
+    """
+    Este método realiza a escrita no terminal e no log do resumo das chamadas COM (ver get_com_call_summary): locais de chamada com maior tempo total e seus membros mais custosos
+
+    Args:
+        title (str): identificação da execução [Exemplo: IW67_MEDL]
+        limit (int): quantidade máxima de locais de chamada
+        maxMembers (int): quantidade máxima de membros exibidos por local de chamada
+    """
+
+    summaries = get_com_call_summary(limit)
+    totalCount = sum(summary['count'] for summary in summaries)
+    totalSeconds = sum(summary['total'] for summary in summaries)
+    logging.info(f'COM call summary [{title}]: {summaries}')
+
+    print(f'COM call summary [{title}]: {totalCount} calls in {utils.CustomMessage.prYellow(f"{totalSeconds:.3f}")} seconds')
+    for summary in summaries:
+        members = ', '.join(f'{member} {stats["count"]}x {stats["total"]:.3f}s' for member, stats in list(summary['members'].items())[:maxMembers])
+        print(f'  {summary["callSite"].ljust(60)} {summary["count"]:>7}x {summary["total"]:>9.3f}s [{members}]')
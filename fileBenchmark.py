@@ -0,0 +1,296 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import env
+import utils
+import fileCrud
+import simulator
+from parameters import IW67Config
+
+# ? Informações: módulo responsável pelo benchmark da leitura/gravação dos arquivos .txt (fileCrud) com ordens spool IW67 sintéticas, comparando o resultado com a referência (baseline) gravada
+
+# Arquivo .json da referência (baseline) do benchmark
+BASELINE_FILE_PATH = 'file_benchmark_baseline.json'
+
+# Variação máxima (proporção) aceita em relação à referência: redução de linhas/segundo ou aumento do pico de memória
+REGRESSION_THRESHOLD = 0.2
+
+# Nome das ordens spool e arquivos gerados no benchmark (mesmo padrão de UpdateData.name)
+FILE_BENCHMARK_NAME = 'IW67_MEDL'
+
+
+def __get_column_aliases(fileIndex: int):
+    """
+    Este método retorna os títulos alternativos das colunas do cabeçalho de uma ordem spool sintética, alternando entre os títulos aceitos em IW67Config (FieldConfig.fileColumnNames) a cada arquivo
+
+    Args:
+        fileIndex (int): posição do arquivo gerado
+
+    Returns:
+        object: contendo título original e título alternativo [Exemplo: {'Texto das medidas': 'TextoMedid'}]
+    """
+
+    aliases = {}
+    for columnName, _ in simulator.IW67_SPOOL_COLUMNS:
+        for field in IW67Config.fields:
+            if columnName in field.fileColumnNames and len(field.fileColumnNames) > 1:
+                aliases[columnName] = field.fileColumnNames[fileIndex % len(field.fileColumnNames)]
+
+    return aliases
+
+
+def generate_spool_files(directory: str, fileCount: int, rowsPerFile: int, seed: int = 0, markerRate: float = 0.02, emptyRowRate: float = 0.02):
+    """
+    Este método gera os arquivos .txt de ordens spool sintéticas do relatório IW67 (ver simulator.generate_iw67_spool_lines): cabeçalho repetido a cada página, títulos alternativos de colunas, marcadores "X" avulsos e linhas vazias
+
+    Args:
+        directory (str): diretório dos arquivos gerados
+        fileCount (int): quantidade de arquivos
+        rowsPerFile (int): quantidade de linhas de dados por arquivo
+        seed (int): semente dos valores aleatórios (mesma semente = mesmo conteúdo)
+        markerRate (float): proporção de marcadores "X" avulsos entre as linhas de dados
+        emptyRowRate (float): proporção de linhas vazias entre as linhas de dados
+
+    Returns:
+        list: caminhos dos arquivos gerados
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    filePaths = []
+    for index in range(fileCount):
+        lines = simulator.generate_iw67_spool_lines([f'{(index % 50) * 10 + 10:04d}'], rowsPerFile, seed=seed + index, columnAliases=__get_column_aliases(index),
+                                                    markerRate=markerRate, emptyRowRate=emptyRowRate)
+        filePath = os.path.join(directory, f'{FILE_BENCHMARK_NAME}_{index + 1}.txt')
+        with open(filePath, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        filePaths.append(filePath)
+
+    return filePaths
+
+
+def __measure_stage(callback: any, repeat: int):
+    """
+    Este método executa uma etapa do benchmark, medindo o menor tempo entre as repetições (sem rastreamento de memória) e o pico de memória alocada em uma execução adicional (tracemalloc)
+
+    Args:
+        callback (any): função executada na etapa (sem argumentos)
+        repeat (int): quantidade de repetições medidas
+
+    Returns:
+        tuple: retorno da função, menor tempo (segundos) e pico de memória (bytes)
+    """
+
+    seconds = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            result = callback()
+            elapsed = time.perf_counter() - start
+            seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+        tracemalloc.start()
+        try:
+            callback()
+            _, peakMemory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return result, seconds, peakMemory
+
+
+def __get_stage_result(rows: int, totalBytes: int, seconds: float, peakMemory: int):
+
+    return {
+        'rows': rows,
+        'bytes': totalBytes,
+        'seconds': round(seconds, 4),
+        'rowsPerSecond': round(rows / seconds, 1) if seconds else 0.0,
+        'bytesPerSecond': round(totalBytes / seconds, 1) if seconds else 0.0,
+        'peakMemoryBytes': peakMemory,
+    }
+
+
+def run_file_benchmark(fileCount: int = 10, rowsPerFile: int = 5000, repeat: int = 3, workDirectory: str | None = None, seed: int = 0):
+    """
+    Este método executa o benchmark das etapas de arquivos do fileCrud com ordens spool sintéticas: importação das ordens spool (import_spool_file_data), gravação dos dados tratados (export_text_file_data), leitura dos dados tratados (import_text_file_data) e consolidação (merge_text_file_data)
+    ATENÇÃO: o diretório de tabelas (env.DIR_TABLE_DATA) é direcionado para o diretório de trabalho durante a execução
+
+    Args:
+        fileCount (int): quantidade de arquivos spool gerados
+        rowsPerFile (int): quantidade de linhas de dados por arquivo
+        repeat (int): quantidade de repetições de cada etapa (é considerado o menor tempo)
+        workDirectory (str | None): diretório dos arquivos gerados (None = diretório temporário)
+        seed (int): semente dos valores aleatórios
+
+    Returns:
+        object: contendo a configuração do benchmark e, para cada etapa, linhas, bytes, tempo, linhas/segundo, bytes/segundo e pico de memória
+    """
+
+    workDirectory = workDirectory or tempfile.mkdtemp(prefix='sap_file_benchmark_')
+    spoolDirectory, dataDirectory, tableDirectory = [os.path.join(workDirectory, folder) for folder in ('spool', 'data', 'table')]
+    for directory in (dataDirectory, tableDirectory):
+        os.makedirs(directory, exist_ok=True)
+
+    generate_spool_files(spoolDirectory, fileCount, rowsPerFile, seed)
+    spoolEntries = utils.get_file_entries(spoolDirectory, 'txt', [FILE_BENCHMARK_NAME])
+    spoolBytes = sum(entry.stat().st_size for entry in spoolEntries)
+    stages = {}
+
+    data, seconds, peakMemory = __measure_stage(lambda: fileCrud.import_spool_file_data(spoolEntries, IW67Config.fields), repeat)
+    if data is None:
+        raise RuntimeError('import_spool_file_data failed')
+    stages['import_spool_file_data'] = __get_stage_result(len(data), spoolBytes, seconds, peakMemory)
+
+    # os dados são gravados em um arquivo por ordem spool (mesma divisão dos arquivos de cada atualização antes da consolidação)
+    chunks = [data[index:index + rowsPerFile] for index in range(0, len(data), rowsPerFile)]
+    exportFileNames = [f'{FILE_BENCHMARK_NAME}_{index + 1}' for index in range(len(chunks))]
+    _, seconds, peakMemory = __measure_stage(lambda: all(fileCrud.export_text_file_data(dataDirectory, name, chunk) for name, chunk in zip(exportFileNames, chunks)), repeat)
+    dataEntries = utils.get_file_entries(dataDirectory, 'txt', [FILE_BENCHMARK_NAME])
+    dataBytes = sum(entry.stat().st_size for entry in dataEntries)
+    stages['export_text_file_data'] = __get_stage_result(len(data), dataBytes, seconds, peakMemory)
+
+    textData, seconds, peakMemory = __measure_stage(lambda: fileCrud.import_text_file_data(dataEntries), repeat)
+    if textData is None:
+        raise RuntimeError('import_text_file_data failed')
+    stages['import_text_file_data'] = __get_stage_result(len(textData), dataBytes, seconds, peakMemory)
+
+    originalTableDirectory = env.DIR_TABLE_DATA
+    try:
+        env.DIR_TABLE_DATA = tableDirectory
+        merged, seconds, peakMemory = __measure_stage(lambda: fileCrud.merge_text_file_data(dataEntries, FILE_BENCHMARK_NAME), repeat)
+    finally:
+        env.DIR_TABLE_DATA = originalTableDirectory
+    if not merged:
+        raise RuntimeError('merge_text_file_data failed')
+    stages['merge_text_file_data'] = __get_stage_result(len(textData), dataBytes, seconds, peakMemory)
+
+    return {
+        'config': {'fileCount': fileCount, 'rowsPerFile': rowsPerFile, 'seed': seed},
+        'stages': stages,
+        'workDirectory': workDirectory,
+    }
+
+
+# ? ==========================================================================================
+
+def save_baseline(report: dict, filePath: str = BASELINE_FILE_PATH):
+    """
+    Este método grava o resultado do benchmark como referência (baseline) para as próximas execuções
+
+    Args:
+        report (dict): resultado do benchmark (ver run_file_benchmark)
+        filePath (str): arquivo .json da referência
+    """
+
+    baseline = {'created': time.strftime('%d-%m-%Y %H:%M:%S'), 'config': report['config'], 'stages': report['stages']}
+    with open(filePath, 'w', encoding='utf-8') as file:
+        json.dump(baseline, file, indent=2)
+
+
+def load_baseline(filePath: str = BASELINE_FILE_PATH):
+    """
+    Este método realiza a leitura da referência (baseline) gravada
+
+    Args:
+        filePath (str): arquivo .json da referência
+
+    Returns:
+        object: referência gravada (None se o arquivo não existir)
+    """
+
+    if not os.path.isfile(filePath):
+        return None
+
+    with open(filePath, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def get_regressions(report: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD):
+    """
+    Este método compara o resultado do benchmark com a referência (baseline), identificando as etapas com redução de linhas/segundo ou aumento do pico de memória acima do limite
+    ATENÇÃO: a comparação só é válida para a mesma configuração (quantidade de arquivos, linhas e semente)
+
+    Args:
+        report (dict): resultado do benchmark (ver run_file_benchmark)
+        baseline (dict): referência gravada (ver load_baseline)
+        threshold (float): variação máxima aceita (proporção) [Exemplo: 0.2 = 20%]
+
+    Returns:
+        list: descrição das regressões encontradas (vazia se não houver regressão)
+    """
+
+    regressions = []
+    for stageName, stage in report['stages'].items():
+        baseStage = baseline['stages'].get(stageName)
+        if baseStage is None:
+            continue
+
+        if baseStage['rowsPerSecond'] and stage['rowsPerSecond'] < baseStage['rowsPerSecond'] * (1 - threshold):
+            regressions.append(f'{stageName}: {stage["rowsPerSecond"]:.0f} rows/s vs baseline {baseStage["rowsPerSecond"]:.0f} rows/s')
+
+        if baseStage['peakMemoryBytes'] and stage['peakMemoryBytes'] > baseStage['peakMemoryBytes'] * (1 + threshold):
+            regressions.append(f'{stageName}: peak memory {stage["peakMemoryBytes"] / 2**20:.1f} MB vs baseline {baseStage["peakMemoryBytes"] / 2**20:.1f} MB')
+
+    return regressions
+
+
+def print_file_benchmark_report(report: dict, baseline: dict | None = None):
+    """
+    Este método realiza a escrita no terminal do resultado do benchmark (ver run_file_benchmark), com a variação de linhas/segundo em relação à referência (baseline)
+
+    Args:
+        report (dict): resultado do benchmark
+        baseline (dict | None): referência gravada (None = sem comparação)
+    """
+
+    config = report['config']
+    utils.print_start_block(f'File benchmark report [{config["fileCount"]} files - {config["rowsPerFile"]} rows per file]')
+    print(f'  {"stage".ljust(24)} {"rows":>9} {"seconds":>9} {"rows/s":>11} {"MB/s":>8} {"peak MB":>8} {"vs base":>8}')
+    for stageName, stage in report['stages'].items():
+        baseStage = (baseline or {}).get('stages', {}).get(stageName)
+        delta = f'{stage["rowsPerSecond"] / baseStage["rowsPerSecond"] - 1:+.1%}' if baseStage and baseStage['rowsPerSecond'] else '-'
+        print(f'  {stageName.ljust(24)} {stage["rows"]:>9} {stage["seconds"]:>9.3f} {stage["rowsPerSecond"]:>11.0f} {stage["bytesPerSecond"] / 2**20:>8.2f} {stage["peakMemoryBytes"] / 2**20:>8.1f} {delta:>8}')
+
+    utils.print_end_block(f'Files generated in {report["workDirectory"]}')
+
+
+# ! ----------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark of fileCrud spool/text parsing with synthetic IW67 spool files')
+    parser.add_argument('--files', type=int, default=10, help='synthetic spool files')
+    parser.add_argument('--rows', type=int, default=5000, help='data rows per file')
+    parser.add_argument('--repeat', type=int, default=3, help='timed repetitions per stage (best time is kept)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of the generated files')
+    parser.add_argument('--work-dir', default=None, help='directory for generated files (default: temporary directory)')
+    parser.add_argument('--baseline', default=BASELINE_FILE_PATH, help='baseline file (.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='max accepted regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    report = run_file_benchmark(args.files, args.rows, args.repeat, args.work_dir, args.seed)
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline is not None and baseline['config'] != report['config']:
+        print(utils.CustomMessage.prYellow(f'Baseline config {baseline["config"]} differs from this run, comparison skipped'))
+        baseline = None
+
+    print_file_benchmark_report(report, baseline)
+
+    if args.save_baseline:
+        save_baseline(report, args.baseline)
+        print(f'{utils.CustomMessage.prGreen("Successfully")} saved baseline to {args.baseline}')
+
+    elif baseline is not None:
+        regressions = get_regressions(report, baseline, args.threshold)
+        for regression in regressions:
+            print(utils.CustomMessage.prRed(f'Regression: {regression}'))
+        if regressions:
+            sys.exit(1)
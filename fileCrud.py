@@ -1,338 +1,545 @@
-import logging
-import env
-import json
-import utils
-import pandas as pd
-
-# ? Informações: módulo responsável pelo tratamento dos arquivos .txt (leitura, inserção e remoção)
-
-
-def __is_spool_header_line(line: str, fields: list):
-    """  
-    Este método realiza a conferência se os dados de uma linha corresponde ao cabeçalho da transação, conferindo se todos os itens fileColumnName de fields possui ao menos uma correspondência na linha.    
-
-    Args:
-        line (str): dados da linha do arquivo
-        fields (list): array de fields do objeto SapImportConfig
-
-    Returns:
-        bool: True se corresponde ao cabeçalho
-    """
-
-    try:
-        uppercaseLine = line.upper()
-        return all(any(name.upper() in uppercaseLine for name in field.fileColumnNames) for field in fields)
-
-    except Exception:
-        return False
-
-
-def __is_spool_data_line(inputString: str, positions: list):
-    try:
-        return bool(positions) and all(inputString[pos] == '|' for pos in positions)
-    except:
-        return False
-
-
-def __get_header_column_index(header: list, fields: list):
-    """  
-    Este método realiza a identificação do indíce da coluna de cada item field a partir da ordem dos dados no cabeçalho
-
-    Args:
-        header (list): array com os dados do cabeçalho
-        fields (list): array de fields do objeto SapImportConfig
-
-    Returns:
-        object: contendo nome e índice da coluna (index) [Exemplo: {Nota: 1}]
-    """
-
-    try:
-        columnIndex = {}
-        for field in fields:
-            for index, name in enumerate(header):
-                if name is not None and name.upper() in map(str.upper, field.fileColumnNames):
-                    columnIndex[field.name] = index
-                    break
-
-        return columnIndex
-
-    except Exception:
-        return None
-
-
-def __get_fixed_string(inputString: str):
-    """
-    Este método realiza o ajuste da string linha do arquivo
-
-    Args:
-        inputString (str): valor original
-
-    Returns:
-        str: valor ajustado
-    """
-
-    if not inputString.endswith('|'):
-        inputString += '|'
-
-    return inputString
-
-
-def __get_char_positions(inputString: str, targetChar: str):
-    positions = [index for index, char in enumerate(inputString) if char == targetChar]
-    return positions
-
-
-def __get_split_string_by_positions(inputString: str, positions: list):
-    splits = [inputString[start:end] for start, end in zip([0] + positions, positions + [None])]
-    fixed = [substring.replace('|', '').strip() for substring in splits]
-    return fixed
-
-
-# ? ==========================================================================================
-
-def import_spool_file_data(entries: list, fields: list):
-    """
-    Este método realiza a importação de dados de arquivos .txt de arquivos spool. É necessário que os nomes das colunas do arquivo estejam definidas para cada transação: SapImportConfig -> Fields -> fileColumnName
-    ATENÇÃO: dependendo da quantidade de dados exportados o título das colunas do arquivo exportado pode variar [Exemplo: transação IW67 coluna "Texto das Medidas" pode conter os títulos a seguir no arquivo: ['Texto das medidas', 'TextoMedid', 'Texto medidas']
-
-    Args:
-        entries (list): lista de entradas de arquivos
-        fields (list): array de fields do objeto SapImportConfig
-
-    Returns:
-        list: array contendo dictionary com os dados
-    """
-
-    try:
-
-        data = []
-        for index, entry in enumerate(entries):
-            utils.print_progress_bar(f'Importing data from {len(entries)} files', 20, index + 1, len(entries))
-
-            header = None
-            headerSplitPositions = []
-            with open(entry.path) as file:
-                rows = file.readlines()
-
-            for row in rows:
-                row = __get_fixed_string(row)
-
-                if __is_spool_header_line(row, fields):
-                    headerSplitPositions = __get_char_positions(row, '|')
-                    splitData = [item.strip() or '' for item in row.split('|')]
-                    header = __get_header_column_index(splitData, fields)
-
-                elif __is_spool_data_line(row, headerSplitPositions):
-                    splitData = __get_split_string_by_positions(row, headerSplitPositions)
-                    tempRow = {}
-                    for field in fields:
-                        tempRow[field.name] = field.getValue(splitData[header[field.name]])
-                    if any(tempRow.values()): 
-                        data.append(tempRow.copy())
-
-        return data
-
-    except Exception:
-        return None
-
-
-def import_text_file_data(entries: list):
-    """  
-    Este método realiza a importação de dados de arquivos .txt já tratados. Utiliza a primeira linha como cabeçalho dos objetos    
-
-    Args:
-        entries (list): lista de entradas de arquivos
-
-    Returns:
-        list: array contendo dictionary com os dados
-    """
-
-    try:
-
-        data = []
-        for index, entry in enumerate(entries):
-            utils.print_progress_bar(f'Importing data from {len(entries)} files', 20, index + 1, len(entries))
-
-            header = None
-            with open(entry.path, encoding='utf-8') as file:
-                rows = file.readlines()
-
-            for row in rows:
-                splitedData = [item.strip() or '' for item in row.split('|')]
-
-                if header is None:  # first row = header
-                    header = splitedData
-                else:
-                    tempRow = {}
-                    for index, value in enumerate(splitedData):
-                        tempRow[header[index]] = value
-                    if any(tempRow.values()):
-                        data.append(tempRow.copy())
-
-        return data
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return None
-
-
-def import_json_file_data(entries: list):
-
-    try:
-        data = []
-        for index, entry in enumerate(entries):
-            utils.print_progress_bar(f'Importing data from {len(entries)} files', 20, index + 1, len(entries))
-
-            with open(entry.path, 'r') as file:
-                data = json.load(file)
-
-        return data
-
-    except Exception:
-        return None
-
-
-# ? ==========================================================================================
-
-def export_json_file_data(dirPath: str, outputFileName: str, data: list):
-
-    try:
-        print(f'Exporting data to file {outputFileName}.json [{len(data)} rows]')
-        filePathName = f'{dirPath}/{outputFileName}.json'
-        with open(filePathName, 'w') as file:
-            json.dump(data, file, indent=None)
-
-        return True
-
-    except Exception:
-        return False
-
-
-def export_text_file_data(dirPath: str, outputFileName: str, data: list):
-
-    try:
-        print(f'Exporting data to file {outputFileName}.txt [{len(data)} rows]')
-        separator = '|'
-        filePathName = f'{dirPath}/{outputFileName}.txt'
-        with open(filePathName, 'w+', encoding='utf-8') as file:
-            header = separator.join(data[0].keys())
-            file.write(f'{header}\n')
-
-            for row in data:
-                values = separator.join(map(str, row.values()))
-                file.write(f'{values}\n')
-
-        return True
-
-    except Exception:
-        return False
-
-
-# ? ==========================================================================================
-
-def convert_json_to_text(entries: list, outputFileName: str):
-
-    try:
-        data = import_json_file_data(entries)
-        export_text_file_data(env.DIR_EXPORTED_DATA, outputFileName, data)
-
-        return True
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return False
-
-
-def convert_text_to_json(entries: list, outputFileName: str):
-
-    try:
-        data = import_text_file_data(entries)
-        export_json_file_data(outputFileName, data)
-
-        return True
-
-    except Exception:
-        logging.exception('Exception occurred')
-
-# ? ==========================================================================================
-
-
-def merge_text_file_data(entries: list, outputFileName: str):
-
-    try:
-        data = import_text_file_data(entries)
-        export_text_file_data(env.DIR_TABLE_DATA, outputFileName, data)
-
-        return True
-
-    except Exception:
-        logging.exception('Exception occurred')
-
-
-# ? ==========================================================================================
-
-def query_data(dataColumnName: str, entriesData: list, filters: list | None):
-
-    try:
-        data = set()
-        for row in entriesData:
-            if filters is None or all(filter.isValid(row[filter.columnName]) for filter in filters):
-                data.add(row[dataColumnName])
-
-        return list(data)
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return None
-
-# ? ==========================================================================================
-
-
-def query_plans_note():
-
-    try:
-        dataSet = set()
-        filePath = fr'{env.DIR_TABLE_DATA}\NOTAS_PLANOS.xlsm'
-
-        print(f'Querying plans notes from {filePath}')
-        excelData = pd.read_excel(filePath, sheet_name='NOTA_PLANO')
-        dataColumnIndex = 3
-
-        for row in excelData.values:
-            value = str(row[dataColumnIndex])
-            if value.isdigit():
-                dataSet.add(value)
-
-        data = list(dataSet)
-        print(f'{utils.CustomMessage.prGreen("Successfully")} queried {len(data)} notes')
-
-        return data
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return None
-
-
-def query_emergency_events():
-
-    try:
-        dataSet = set()
-        filePath = fr'{env.DIR_TABLE_DATA}\SPIR.xlsm'
-
-        print(f'Querying emergency events from {filePath}')
-        excelData = pd.read_excel(filePath, sheet_name='AM')
-        dataColumnIndex = 3
-
-        for row in excelData.values:
-            value = str(row[dataColumnIndex]).replace('OS', '').strip()
-            if value.isdigit():
-                dataSet.add(value)
-
-        data = list(dataSet)
-        print(f'{utils.CustomMessage.prGreen("Successfully")} queried {len(data)} emergency events')
-
-        return data
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return None
+import os
+import logging
+import datetime
+import env
+import json
+import utils
+import spoolArchive
+import pandas as pd
+
+# ? Informações: módulo responsável pelo tratamento dos arquivos .txt (leitura, inserção e remoção)
+
+# Formato da data/hora da consulta (coluna DATA_HORA_CONSULTA, ver UpdateData.import_file_data), utilizada no desempate da mesclagem por chave
+MERGE_ORDER_DATETIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+
+def __is_spool_header_line(line: str, fields: list):
+    """  
+    Este método realiza a conferência se os dados de uma linha corresponde ao cabeçalho da transação, conferindo se todos os itens fileColumnName de fields possui ao menos uma correspondência na linha.    
+
+    Args:
+        line (str): dados da linha do arquivo
+        fields (list): array de fields do objeto SapImportConfig
+
+    Returns:
+        bool: True se corresponde ao cabeçalho
+    """
+
+    try:
+        uppercaseLine = line.upper()
+        return all(any(name.upper() in uppercaseLine for name in field.fileColumnNames) for field in fields)
+
+    except Exception:
+        return False
+
+
+def __is_spool_data_line(inputString: str, positions: list):
+    try:
+        return bool(positions) and all(inputString[pos] == '|' for pos in positions)
+    except:
+        return False
+
+
+def __get_header_column_index(header: list, fields: list):
+    """  
+    Este método realiza a identificação do indíce da coluna de cada item field a partir da ordem dos dados no cabeçalho
+
+    Args:
+        header (list): array com os dados do cabeçalho
+        fields (list): array de fields do objeto SapImportConfig
+
+    Returns:
+        object: contendo nome e índice da coluna (index) [Exemplo: {Nota: 1}]
+    """
+
+    try:
+        columnIndex = {}
+        for field in fields:
+            for index, name in enumerate(header):
+                if name is not None and name.upper() in map(str.upper, field.fileColumnNames):
+                    columnIndex[field.name] = index
+                    break
+
+        return columnIndex
+
+    except Exception:
+        return None
+
+
+def __get_fixed_string(inputString: str):
+    """
+    Este método realiza o ajuste da string linha do arquivo
+
+    Args:
+        inputString (str): valor original
+
+    Returns:
+        str: valor ajustado
+    """
+
+    if not inputString.endswith('|'):
+        inputString += '|'
+
+    return inputString
+
+
+def __get_char_positions(inputString: str, targetChar: str):
+    positions = [index for index, char in enumerate(inputString) if char == targetChar]
+    return positions
+
+
+def __get_split_string_by_positions(inputString: str, positions: list):
+    splits = [inputString[start:end] for start, end in zip([0] + positions, positions + [None])]
+    fixed = [substring.replace('|', '').strip() for substring in splits]
+    return fixed
+
+
+# ? ==========================================================================================
+
+def __parse_spool_lines(lines: object, fields: list, data: list):
+
+    header = None
+    headerSplitPositions = []
+    for row in lines:
+        row = __get_fixed_string(row)
+
+        if __is_spool_header_line(row, fields):
+            headerSplitPositions = __get_char_positions(row, '|')
+            splitData = [item.strip() or '' for item in row.split('|')]
+            header = __get_header_column_index(splitData, fields)
+
+        elif __is_spool_data_line(row, headerSplitPositions):
+            splitData = __get_split_string_by_positions(row, headerSplitPositions)
+            tempRow = {}
+            for field in fields:
+                tempRow[field.name] = field.decode(splitData[header[field.name]])
+            if any(value is not None for value in tempRow.values()):
+                data.append(tempRow)
+
+
+def import_spool_file_data(entries: list, fields: list):
+    """
+    Este método realiza a importação de dados de arquivos .txt de arquivos spool. É necessário que os nomes das colunas do arquivo estejam definidas para cada transação: SapImportConfig -> Fields -> fileColumnName
+    ATENÇÃO: dependendo da quantidade de dados exportados o título das colunas do arquivo exportado pode variar [Exemplo: transação IW67 coluna "Texto das Medidas" pode conter os títulos a seguir no arquivo: ['Texto das medidas', 'TextoMedid', 'Texto medidas']
+
+    Args:
+        entries (list): lista de entradas de arquivos
+        fields (list): array de fields do objeto SapImportConfig
+
+    Returns:
+        list: array contendo dictionary com os dados
+    """
+
+    try:
+
+        data = []
+        for index, entry in enumerate(entries):
+            utils.print_progress_bar(f'Importing data from {len(entries)} files', 20, index + 1, len(entries))
+
+            with open(entry.path) as file:
+                __parse_spool_lines(file, fields, data)
+
+        return data
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def import_spool_archive_data(archivePath: str, fields: list, partialTexts: list | None = None):
+    """
+    Este método realiza a importação de dados dos arquivos spool de um arquivo compactado (ver spoolArchive.archive_spool_files), com descompactação em fluxo, sem extração em disco
+
+    Args:
+        archivePath (str): caminho do arquivo compactado
+        fields (list): array de fields do objeto SapImportConfig
+        partialTexts (list | None): textos contidos no nome dos arquivos (None = todos os arquivos)
+
+    Returns:
+        list: array contendo dictionary com os dados
+    """
+
+    try:
+
+        data = []
+        for index, (fileName, lines) in enumerate(spoolArchive.iter_archive_files(archivePath, partialTexts)):
+            print(f'Importing data from {os.path.basename(archivePath)} [{index + 1}: {fileName}]', end='\r')
+            __parse_spool_lines(lines, fields, data)
+
+        print()
+        return data
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def is_spool_file_overflow(entry: object, fields: list, maxLines: int):
+    """
+    Este método realiza a conferência se uma ordem spool exportada excedeu o limite de linhas (PRI_PARAMS-LINCT): o arquivo atingiu a quantidade máxima de linhas (truncado) ou possui mais de um cabeçalho (paginado, com LINCT igual ao limite a ordem spool possui uma única página)
+
+    Args:
+        entry (object): entrada do arquivo .txt da ordem spool
+        fields (list): array de fields do objeto SapImportConfig
+        maxLines (int): limite de linhas por ordem spool (ver sap.SPOOL_MAX_LINES)
+
+    Returns:
+        bool: True se a ordem spool excedeu o limite
+    """
+
+    lineCount = 0
+    headerCount = 0
+    with open(entry.path) as file:
+        for row in file:
+            lineCount += 1
+            if __is_spool_header_line(row, fields):
+                headerCount += 1
+
+    return lineCount >= maxLines or headerCount > 1
+
+
+def import_text_file_data(entries: list):
+    """  
+    Este método realiza a importação de dados de arquivos .txt já tratados. Utiliza a primeira linha como cabeçalho dos objetos    
+
+    Args:
+        entries (list): lista de entradas de arquivos
+
+    Returns:
+        list: array contendo dictionary com os dados
+    """
+
+    try:
+
+        data = []
+        for index, entry in enumerate(entries):
+            utils.print_progress_bar(f'Importing data from {len(entries)} files', 20, index + 1, len(entries))
+
+            header = None
+            with open(entry.path, encoding='utf-8') as file:
+                rows = file.readlines()
+
+            for row in rows:
+                splitedData = [item.strip() or '' for item in row.split('|')]
+
+                if header is None:  # first row = header
+                    header = splitedData
+                else:
+                    tempRow = {}
+                    for index, value in enumerate(splitedData):
+                        tempRow[header[index]] = value
+                    if any(tempRow.values()):
+                        data.append(tempRow.copy())
+
+        return data
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def import_json_file_data(entries: list):
+
+    try:
+        data = []
+        for index, entry in enumerate(entries):
+            utils.print_progress_bar(f'Importing data from {len(entries)} files', 20, index + 1, len(entries))
+
+            with open(entry.path, 'r') as file:
+                data = json.load(file)
+
+        return data
+
+    except Exception:
+        return None
+
+
+# ? ==========================================================================================
+
+def export_json_file_data(dirPath: str, outputFileName: str, data: list):
+
+    try:
+        print(f'Exporting data to file {outputFileName}.json [{len(data)} rows]')
+        filePathName = f'{dirPath}/{outputFileName}.json'
+        with open(filePathName, 'w') as file:
+            json.dump(data, file, indent=None, default=utils.encode_json_value)
+
+        return True
+
+    except Exception:
+        return False
+
+
+def export_text_file_data(dirPath: str, outputFileName: str, data: list):
+
+    try:
+        print(f'Exporting data to file {outputFileName}.txt [{len(data)} rows]')
+        separator = '|'
+        filePathName = f'{dirPath}/{outputFileName}.txt'
+        with open(filePathName, 'w+', encoding='utf-8') as file:
+            header = separator.join(data[0].keys())
+            file.write(f'{header}\n')
+
+            for row in data:
+                values = separator.join(map(utils.encode_text_value, row.values()))
+                file.write(f'{values}\n')
+
+        return True
+
+    except Exception:
+        return False
+
+
+def upsert_text_file_data(dirPath: str, outputFileName: str, data: list, keyFields: list, removeKeys: bool = False):
+    """
+    Este método realiza a mesclagem por chave dos dados no arquivo .txt já exportado: as linhas com a mesma chave são substituídas e as novas são incluídas (ou, com removeKeys, as linhas com a mesma chave são removidas). Sem arquivo existente, os dados são exportados integralmente
+    O arquivo existente é lido sequencialmente (somente os dados novos são mantidos em memória) e substituído atomicamente. O cabeçalho é sempre gravado, inclusive quando todas as linhas são removidas
+
+    Args:
+        dirPath (str): diretório do arquivo
+        outputFileName (str): nome do arquivo (sem extensão)
+        data (list): array contendo dictionary com os dados
+        keyFields (list): nomes das colunas que compõem a chave [Exemplo: ['NOTA', 'INDICE']]
+        removeKeys (bool): se True, remove do arquivo as linhas com chave presente nos dados (sem incluir os dados)
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    try:
+        filePathName = f'{dirPath}/{outputFileName}.txt'
+
+        # dados novos (tipos nativos, vazio = None) comparados com as linhas do arquivo existente (texto, vazio = '') no formato gravado no arquivo
+        getKey = lambda row: tuple(utils.encode_text_value(row.get(field)) for field in keyFields)
+        newRows = {getKey(row): row for row in data}
+        existingEntry = next((entry for entry in os.scandir(dirPath) if entry.name == f'{outputFileName}.txt'), None)
+
+        # cabeçalho do arquivo existente, acrescido das colunas novas dos dados incluídos
+        header = []
+        if existingEntry is not None:
+            with open(existingEntry.path, encoding='utf-8') as file:
+                header = [item.strip() for item in file.readline().rstrip('\n').split('|') if item.strip()]
+        if not removeKeys and data:
+            header += [column for column in data[0].keys() if column not in header]
+        if not header:
+            return True
+
+        # leitura sequencial do arquivo existente (somente os dados novos ficam em memória) e gravação em arquivo temporário
+        existingCount = 0
+        keptCount = 0
+        with open(f'{filePathName}.tmp', 'w', encoding='utf-8') as file:
+            file.write(f'{"|".join(header)}\n')
+            if existingEntry is not None:
+                for _, row in __read_text_file_rows(existingEntry):
+                    existingCount += 1
+                    if tuple(row.get(field, '') for field in keyFields) in newRows:
+                        continue
+                    keptCount += 1
+                    file.write(f'{"|".join(row.get(column, "") for column in header)}\n')
+
+            if not removeKeys:
+                for row in newRows.values():
+                    file.write(f'{"|".join(utils.encode_text_value(row.get(column)) for column in header)}\n')
+
+        mergedCount = keptCount if removeKeys else keptCount + len(newRows)
+        print(f'Merging {len(data)} rows into file {outputFileName}.txt by {keyFields} [{existingCount} -> {mergedCount} rows]')
+        os.replace(f'{filePathName}.tmp', filePathName)  # substituição atômica: o arquivo existente é mantido íntegro em caso de falha
+        return True
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return False
+
+
+# ? ==========================================================================================
+
+def convert_json_to_text(entries: list, outputFileName: str):
+
+    try:
+        data = import_json_file_data(entries)
+        export_text_file_data(env.DIR_EXPORTED_DATA, outputFileName, data)
+
+        return True
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return False
+
+
+def convert_text_to_json(entries: list, outputFileName: str):
+
+    try:
+        data = import_text_file_data(entries)
+        export_json_file_data(outputFileName, data)
+
+        return True
+
+    except Exception:
+        logging.exception('Exception occurred')
+
+# ? ==========================================================================================
+
+
+def __get_merge_order_value(value: str):
+
+    try:
+        return datetime.datetime.strptime(value, MERGE_ORDER_DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return datetime.datetime.min
+
+
+def __read_text_file_rows(entry: object):
+
+    with open(entry.path, encoding='utf-8') as file:
+        header = None
+        for lineNumber, line in enumerate(file):
+            splitedData = [item.strip() for item in line.rstrip('\n').split('|')]
+            if header is None:  # first row = header
+                header = splitedData
+                continue
+            if any(splitedData):
+                yield lineNumber, dict(zip(header, splitedData))
+
+
+def __merge_text_file_data_by_key(entries: list, outputFileName: str, keyFields: list, orderField: str | None):
+    """
+    Este método realiza a mesclagem dos arquivos .txt removendo as linhas duplicadas por chave, em duas leituras sequenciais: a primeira mantém em memória somente a chave e a posição da linha vencedora de cada chave (maior orderField; no empate, a última linha na ordem dos arquivos), a segunda grava as linhas vencedoras. A memória utilizada é proporcional à quantidade de chaves, não ao tamanho dos arquivos
+
+    Args:
+        entries (list): lista de entradas de arquivos
+        outputFileName (str): nome do arquivo de saída (sem extensão)
+        keyFields (list): nomes das colunas que compõem a chave [Exemplo: ['NOTA', 'INDICE']]
+        orderField (str | None): coluna de desempate entre linhas com a mesma chave (data/hora no formato MERGE_ORDER_DATETIME_FORMAT)
+
+    Returns:
+        int: quantidade de linhas gravadas
+    """
+
+    entries = sorted(entries, key=lambda entry: entry.name)
+    winners = {}
+    rowCount = 0
+    for fileIndex, entry in enumerate(entries):
+        utils.print_progress_bar(f'Indexing keys from {len(entries)} files', 20, fileIndex + 1, len(entries))
+        for lineNumber, row in __read_text_file_rows(entry):
+            rowCount += 1
+            key = tuple(row.get(field, '') for field in keyFields)
+            rank = (__get_merge_order_value(row.get(orderField)) if orderField else datetime.datetime.min, fileIndex, lineNumber)
+            if key not in winners or rank > winners[key]:
+                winners[key] = rank
+
+    winnerPositions = {(fileIndex, lineNumber) for _, fileIndex, lineNumber in winners.values()}
+    del winners
+
+    print(f'Exporting data to file {outputFileName}.txt [{rowCount} -> {len(winnerPositions)} rows by {keyFields}]')
+    header = None
+    filePathName = f'{env.DIR_TABLE_DATA}/{outputFileName}.txt'
+    with open(f'{filePathName}.tmp', 'w', encoding='utf-8') as file:
+        for fileIndex, entry in enumerate(entries):
+            for lineNumber, row in __read_text_file_rows(entry):
+                if (fileIndex, lineNumber) not in winnerPositions:
+                    continue
+                if header is None:
+                    header = list(row.keys())
+                    file.write(f'{"|".join(header)}\n')
+                file.write(f'{"|".join(row.get(column, "") for column in header)}\n')
+
+    os.replace(f'{filePathName}.tmp', filePathName)  # substituição atômica: leitores da tabela (ver queryService) nunca leem o arquivo parcial
+    return len(winnerPositions)
+
+
+def merge_text_file_data(entries: list, outputFileName: str, keyFields: list | None = None, orderField: str | None = None):
+    """
+    Este método realiza a mesclagem dos arquivos .txt exportados em um arquivo de tabela [env.DIR_TABLE_DATA]
+    ATENÇÃO: com keyFields informado, as linhas com a mesma chave são gravadas uma única vez (a mais recente por orderField, ver __merge_text_file_data_by_key)
+
+    Args:
+        entries (list): lista de entradas de arquivos
+        outputFileName (str): nome do arquivo de saída (sem extensão)
+        keyFields (list | None): nomes das colunas que compõem a chave (None = sem remoção de duplicados)
+        orderField (str | None): coluna de desempate entre linhas com a mesma chave [Exemplo: DATA_HORA_CONSULTA]
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    try:
+        if keyFields:
+            __merge_text_file_data_by_key(entries, outputFileName, keyFields, orderField)
+            return True
+
+        data = import_text_file_data(entries)
+        export_text_file_data(env.DIR_TABLE_DATA, outputFileName, data)
+
+        return True
+
+    except Exception:
+        logging.exception('Exception occurred')
+
+
+# ? ==========================================================================================
+
+def query_data(dataColumnName: str, entriesData: list, filters: list | None):
+
+    try:
+        data = set()
+        for row in entriesData:
+            if filters is None or all(filter.isValid(row[filter.columnName]) for filter in filters):
+                data.add(row[dataColumnName])
+
+        return list(data)
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+# ? ==========================================================================================
+
+
+def query_plans_note():
+
+    try:
+        dataSet = set()
+        filePath = fr'{env.DIR_TABLE_DATA}\NOTAS_PLANOS.xlsm'
+
+        print(f'Querying plans notes from {filePath}')
+        excelData = pd.read_excel(filePath, sheet_name='NOTA_PLANO')
+        dataColumnIndex = 3
+
+        for row in excelData.values:
+            value = str(row[dataColumnIndex])
+            if value.isdigit():
+                dataSet.add(value)
+
+        data = list(dataSet)
+        print(f'{utils.CustomMessage.prGreen("Successfully")} queried {len(data)} notes')
+
+        return data
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def query_emergency_events():
+
+    try:
+        dataSet = set()
+        filePath = fr'{env.DIR_TABLE_DATA}\SPIR.xlsm'
+
+        print(f'Querying emergency events from {filePath}')
+        excelData = pd.read_excel(filePath, sheet_name='AM')
+        dataColumnIndex = 3
+
+        for row in excelData.values:
+            value = str(row[dataColumnIndex]).replace('OS', '').strip()
+            if value.isdigit():
+                dataSet.add(value)
+
+        data = list(dataSet)
+        print(f'{utils.CustomMessage.prGreen("Successfully")} queried {len(data)} emergency events')
+
+        return data
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
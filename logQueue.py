@@ -0,0 +1,176 @@
+import time
+import logging
+import threading
+import multiprocessing
+import logging.handlers
+
+# ? Informações: módulo responsável pela configuração do log (fila única entre processos, gravação com buffer e rotação por tamanho, supressão de registros repetidos)
+
+LOG_FILE_PATH = 'log.txt'
+LOG_LEVEL = logging.INFO
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(processName)s - %(message)s'
+LOG_DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
+
+# Rotação do arquivo de log: tamanho máximo (bytes) e quantidade de arquivos anteriores mantidos (log.txt.1, log.txt.2...)
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Quantidade de registros mantidos em buffer antes da gravação (registros ERROR ou superiores são gravados imediatamente)
+LOG_BUFFER_CAPACITY = 200
+
+# Intervalo (segundos) de gravação periódica dos registros em buffer (processo residente, ver service.py: sem o intervalo os registros INFO/WARNING aguardam o buffer completo)
+LOG_FLUSH_SECONDS = 30
+
+# Intervalo (segundos) em que registros idênticos (mesma origem, mensagem e exceção) são suprimidos após o primeiro registro
+LOG_REPEAT_WINDOW_SECONDS = 60
+
+# Fila de registros compartilhada com os processos filhos e listener de gravação (somente no processo principal, ver start_logging)
+LOG_QUEUE = None
+LOG_LISTENER = None
+LOG_FLUSH_STOP_EVENT = None
+
+
+class RepeatedRecordFilter(logging.Filter):
+
+    """
+    Esta classe representa o filtro de registros de log repetidos, comuns nos laços de novas tentativas (mesma exceção a cada tentativa). O primeiro registro é mantido e os idênticos são suprimidos durante a janela de tempo; o registro seguinte à janela informa a quantidade suprimida
+
+    A classe RepeatedRecordFilter faz o seguinte:
+        - Identifica registros idênticos (origem, nível, mensagem e exceção)
+        - Suprime repetições dentro de LOG_REPEAT_WINDOW_SECONDS
+    """
+
+    def __init__(self, windowSeconds: float = LOG_REPEAT_WINDOW_SECONDS):
+        """
+        Este é o método construtor da classe RepeatedRecordFilter.
+
+        Args:
+            windowSeconds (float): intervalo (segundos) de supressão dos registros idênticos
+        """
+
+        super().__init__()
+        self.windowSeconds = windowSeconds
+        self.records = {}
+        self.lock = threading.Lock()
+
+    def __get_record_key(self, record: logging.LogRecord):
+
+        exception = record.exc_info[1] if record.exc_info else None
+        exceptionKey = (type(exception).__name__, str(exception)) if exception is not None else None
+        return (record.name, record.levelno, record.pathname, record.lineno, record.getMessage(), exceptionKey)
+
+    def filter(self, record: logging.LogRecord):
+
+        key = self.__get_record_key(record)
+        now = time.time()
+        with self.lock:
+            state = self.records.get(key)
+            if state is not None and now - state[0] < self.windowSeconds:
+                state[1] += 1
+                return False
+
+            suppressed = state[1] if state is not None else 0
+            self.records[key] = [now, 0]
+            if len(self.records) > 1000:
+                self.records = {recordKey: value for recordKey, value in self.records.items() if now - value[0] < self.windowSeconds}
+
+        if suppressed > 0:
+            record.msg = f'{record.msg} [repeated {suppressed} times in the previous {self.windowSeconds} seconds]'
+
+        return True
+
+
+def __flush_periodically(stopEvent: threading.Event):
+
+    while not stopEvent.wait(LOG_FLUSH_SECONDS):
+        flush_logging()
+
+
+def configure_process_logging(logQueue: object, level: int = LOG_LEVEL):
+    """
+    Este método direciona o log do processo atual para a fila de registros (QueueHandler), com supressão de registros repetidos. Deve ser chamado em cada processo filho com a fila criada no processo principal (ver multitask.run_multiprocess)
+
+    Args:
+        logQueue (object): fila de registros compartilhada (multiprocessing.Queue)
+        level (int): nível mínimo dos registros
+    """
+
+    queueHandler = logging.handlers.QueueHandler(logQueue)
+    queueHandler.addFilter(RepeatedRecordFilter())
+
+    rootLogger = logging.getLogger()
+    for handler in list(rootLogger.handlers):
+        rootLogger.removeHandler(handler)
+    rootLogger.addHandler(queueHandler)
+    rootLogger.setLevel(level)
+
+
+def start_logging(filePath: str = LOG_FILE_PATH, level: int = LOG_LEVEL):
+    """
+    Este método inicia o log no processo principal: cria a fila de registros compartilhada e o listener que grava, em uma única thread, os registros de todos os processos no arquivo de log (com buffer e rotação por tamanho). Os registros em buffer também são gravados a cada LOG_FLUSH_SECONDS
+    ATENÇÃO: deve ser chamado uma única vez no processo principal, antes da criação dos processos filhos. Ao final da execução chamar stop_logging (grava os registros em buffer)
+
+    Args:
+        filePath (str): caminho do arquivo de log
+        level (int): nível mínimo dos registros
+
+    Returns:
+        object: fila de registros compartilhada (multiprocessing.Queue)
+    """
+
+    global LOG_QUEUE, LOG_LISTENER, LOG_FLUSH_STOP_EVENT
+
+    if LOG_LISTENER is not None:
+        return LOG_QUEUE
+
+    fileHandler = logging.handlers.RotatingFileHandler(filePath, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True)
+    fileHandler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+    bufferHandler = logging.handlers.MemoryHandler(LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=fileHandler, flushOnClose=True)
+
+    LOG_QUEUE = multiprocessing.Queue(-1)
+    LOG_LISTENER = logging.handlers.QueueListener(LOG_QUEUE, bufferHandler)
+    LOG_LISTENER.start()
+    LOG_FLUSH_STOP_EVENT = threading.Event()
+    threading.Thread(target=__flush_periodically, args=(LOG_FLUSH_STOP_EVENT,), daemon=True).start()
+
+    configure_process_logging(LOG_QUEUE, level)
+    return LOG_QUEUE
+
+
+def flush_logging():
+    """
+    Este método grava no arquivo de log os registros em buffer do listener (sem aguardar o buffer completo ou um registro ERROR)
+    """
+
+    listener = LOG_LISTENER
+    if listener is None:
+        return
+
+    for handler in listener.handlers:
+        handler.flush()
+
+
+def stop_logging():
+    """
+    Este método encerra o listener do log no processo principal, gravando os registros pendentes na fila e em buffer
+    """
+
+    global LOG_QUEUE, LOG_LISTENER, LOG_FLUSH_STOP_EVENT
+
+    if LOG_LISTENER is None:
+        return
+
+    LOG_FLUSH_STOP_EVENT.set()
+    rootLogger = logging.getLogger()
+    for handler in list(rootLogger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            rootLogger.removeHandler(handler)
+
+    LOG_LISTENER.stop()
+    for handler in LOG_LISTENER.handlers:
+        target = handler.target
+        handler.close()
+        target.close()
+    LOG_LISTENER = None
+    LOG_QUEUE = None
+    LOG_FLUSH_STOP_EVENT = None
@@ -1,173 +1,509 @@
-import datetime
-import fileCrud
-import logging
-import time
-import numpy
-import math
-import background
-import env
-import utils
-import multitask
-import calendar
-from model import TaskConfig, ReferenceInfo
-from parameters import  IW67ByMeasurementMEDL, IW67ByMeasurementMEDE
-
-# ? Informações: módulo principal responsável por executar os scripts
-
-logging.basicConfig(filename="log.txt", level=logging.DEBUG, encoding='utf-8', datefmt='%d-%m-%Y %H:%M:%S', format="%(asctime)s - %(levelname)s - %(message)s")
-
-# ? ==========================================================================================
-
-MERGE_TABLES = True
-MEASUREMENT_MEDL = list(set([380, 30, 150, 20, 590, 113]))
-MEASUREMENT_MEDE = list(set([10, 640, 130, 310, 81, 380]))
-
-# ? ==========================================================================================
-
-def __run_update_background(updateObject: object, referenceInfo: object, arrParam: list, qtdSessions: int, maxConcurrentSpools: int):
-
-    try:
-        start = time.time()
-        utils.print_start_block(f'Starting background query {utils.CustomMessage.prYellow(updateObject(referenceInfo).name)} [{len(arrParam)}] [{referenceInfo.name}]')
-
-        background.remove_trash()
-        __run_update_into_file(updateObject, referenceInfo, arrParam, qtdSessions, maxConcurrentSpools)
-
-        background.export_files()
-        __run_update_from_file(updateObject, referenceInfo)
-
-        utils.print_end_block(f'Executed data update in {time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}')
-
-    except Exception:
-        raise Exception('Exception occurred')
-
-
-def __run_update_into_file(updateObject: object, referenceInfo: object, arrParam: list, qtdSessions: int, maxConcurrentSpools: int):
-
-    try:
-        maxSesSpool = math.floor(maxConcurrentSpools / qtdSessions)
-        splitedArrParam = numpy.array_split(arrParam, qtdSessions)
-        if len(splitedArrParam) > 6:
-            raise Exception('Array parameters with length greater than 6 [sessions].')
-
-    # ---------------------------
-
-        arrTaskConfig = []
-        for index, arr in enumerate(splitedArrParam):
-            u = updateObject(referenceInfo)
-            m = math.ceil(len(arr) / maxSesSpool)
-            t = TaskConfig(u.execute, [arr, index + 1, m])
-            arrTaskConfig.append(t)
-
-        multitask.run_multiprocess(arrTaskConfig)
-
-    except Exception:
-        raise Exception('Exception occurred')
-
-
-def __run_update_from_file(updateObject: object, referenceInfo: object):
-
-    try:
-        u = updateObject(referenceInfo)
-        u.import_file_data()
-        u.export_file_data()
-
-    except Exception:
-        raise Exception('Exception occurred')
-
-
-def __get_reference_info(referenceName: str):
-    """
-    Este método realiza a conversão de um período referência para um objeto ReferenceInfo, contendo informações do período. Os dados de referência são essenciais para a consulta correta no SAP e atualização de dados na banco Access.
-
-    Args:
-        referenceName (str): nome do período de referência, no formato MM_AAAA [Exemplo: 09_2023]
-
-    Returns:
-        ReferenceInfo: objeto com dados do período
-    """
-
-    try:
-        year, month = list(map(lambda x: int(x), referenceName.split("_")))
-        dateIni = datetime.date(year, month, 1)
-        dateEnd = datetime.date(year, month, calendar.monthrange(year, month)[1])
-
-        return ReferenceInfo(dateIni.strftime("%Y_%m"), month, year, dateIni, dateEnd)
-
-    except Exception:
-        return None
-
-
-def __merge_table_data(transactionName: str | None):
-
-    if not MERGE_TABLES:
-        return
-
-    start = time.time()
-    utils.print_start_block(f'Starting table data merge for {transactionName}')
-
-    names = {
-        'IW67': 'TB_ECC_MEDIDA',
-        'IW39': 'TB_ECC_ORDEM',
-    }
-
-    if transactionName is not None:
-        transactionName = transactionName.upper()
-
-    for partialFileName, outputFileName in names.items():
-        if transactionName == partialFileName or transactionName is None:
-            print(utils.CustomMessage.prYellow(f'Exporting data from *{partialFileName}* to file {outputFileName}'))
-            entries = utils.get_file_entries(env.DIR_EXPORTED_DATA, 'txt', [partialFileName])
-            fileCrud.merge_text_file_data(entries, outputFileName)
-
-    utils.print_end_block(f'Finished table data merge in {time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}')
-
-
-# ? ===================
-
-def __get_measurement_medl():
-
-    arrMeasurementMEDL = list(map(lambda x: f'{x:04d}', MEASUREMENT_MEDL))
-
-    return list(set(arrMeasurementMEDL))
-
-
-def __get_measurement_mede():
-
-    arrMeasurementMEDE = list(map(lambda x: f'{x:04d}', MEASUREMENT_MEDE))
-
-    return list(set(arrMeasurementMEDE))
-
-
-# ? ==========================================================================================
-
-def run_update_IW67_MEDL(referenceInfo: object, qtdSessions: int, maxConcurrentSpools: int):
-
-    arrMeasurementMEDL = __get_measurement_medl()
-
-    __run_update_background(IW67ByMeasurementMEDL, referenceInfo, arrMeasurementMEDL, qtdSessions, maxConcurrentSpools)
-    __merge_table_data('IW67')
-
-
-def run_update_IW67_MEDE(referenceInfo: object, qtdSessions: int, maxConcurrentSpools: int):
-
-    arrMeasurementMEDE = __get_measurement_mede()
-
-    __run_update_background(IW67ByMeasurementMEDE, referenceInfo, arrMeasurementMEDE, qtdSessions, maxConcurrentSpools)
-    __merge_table_data('IW67')
-
-
-# ! ----------------------------------------------------------------------------------------------------
-
-if __name__ == '__main__':
-
-    start = time.time()
-    referenceName = datetime.date.today().strftime("%Y_%m")
-    referenceInfo = __get_reference_info(referenceName)
-    qtdSessions = 6  # Max qtd sessions = 6
-    maxConcurrentSpools = 48  # Max visible spool rows [Monitor = 48 | Notebook = 27]
-
-    utils.print_start_block(f'Starting global update for {referenceName} [{qtdSessions} sessions - max {maxConcurrentSpools} spools]')
-    run_update_IW67_MEDL(referenceInfo, qtdSessions, maxConcurrentSpools)
-    run_update_IW67_MEDE(referenceInfo, qtdSessions, maxConcurrentSpools)    
-    utils.print_end_block(f'Finished global update in {time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}')
+import os
+import datetime
+import functools
+import fileCrud
+import logging
+import time
+import numpy
+import math
+import background
+import env
+import utils
+import multitask
+import calendar
+import sap
+import comProxy
+import tracing
+import logQueue
+import watermark
+import manifest
+import shutil
+import resultCache
+import spoolArchive
+from model import TaskConfig, ReferenceInfo
+from retry import RetryPolicy, CircuitBreaker
+from parameters import  IW67ByMeasurementMEDL, IW67ByMeasurementMEDLClosed, IW67ByMeasurementMEDE, IW67_KEY_FIELDS
+
+# ? Informações: módulo principal responsável por executar os scripts
+
+# ? ==========================================================================================
+
+MERGE_TABLES = True
+
+# Chave natural de cada tabela na mesclagem (linhas com a mesma chave em arquivos distintos, ex.: IW67_MEDL e IW67_MEDE_*, são gravadas uma única vez) e coluna de desempate (a mais recente é mantida)
+MERGE_KEY_FIELDS = {
+    'TB_ECC_MEDIDA': IW67_KEY_FIELDS,
+}
+MERGE_ORDER_FIELD = 'DATA_HORA_CONSULTA'
+MEASUREMENT_MEDL = list(set([380, 30, 150, 20, 590, 113]))
+MEASUREMENT_MEDE = list(set([10, 640, 130, 310, 81, 380]))
+
+# Remoção de jobs, ordens spool e arquivos exportados em paralelo (sessões distintas) no início de cada execução
+PARALLEL_CLEANUP = True
+
+# Execução das sessões SAP na submissão dos jobs: 'process' (multiprocessing) ou 'thread' (multithreading - necessário com engine de scripting em processo, ver simulator.py)
+PARALLEL_MODE = 'process'
+
+# Atualização incremental do IW67 MEDL: consulta somente as medidas criadas e concluídas desde a última execução com sucesso (watermark), mescladas por chave no arquivo existente
+MEDL_INCREMENTAL = True
+
+# Intervalo máximo (dias) entre atualizações completas do IW67 MEDL no modo incremental (captura alterações de medidas antigas não cobertas pela janela incremental)
+MEDL_FULL_REFRESH_DAYS = 7
+
+# Jobs por sessão buscados na divisão da consulta por período de seleção (jobs código x período, limitado por UpdateData.maxDateShards e pela quantidade máxima de ordens spool)
+DATE_SHARD_JOBS_PER_SESSION = 4
+
+# Quantidade máxima de rodadas de divisão e reenvio das consultas cujas ordens spool excederam o limite de linhas (sap.SPOOL_MAX_LINES)
+SPOOL_SPLIT_MAX_ROUNDS = 4
+
+# Quantidade de sessões SAP (máximo 6) e de ordens spool por ciclo (listas SP02/SMX são lidas página a página, sem limite de linhas visíveis)
+QTD_SESSIONS = 6
+MAX_CONCURRENT_SPOOLS = 120
+
+# Política de novas tentativas compartilhada entre sap, background e UpdateData (backoff exponencial com jitter + circuit breaker)
+RETRY_POLICY = RetryPolicy(baseSeconds=0.5, maxSeconds=30, circuitBreaker=CircuitBreaker(failureThreshold=20, resetSeconds=120))
+
+# ? ==========================================================================================
+
+def __run_update_background(updateObject: object, referenceInfo: object, arrParam: list, qtdSessions: int, maxConcurrentSpools: int):
+    """
+    Este método executa a atualização de dados em background (submissão dos jobs, exportação das ordens spool e gravação do arquivo), registrando cada etapa concluída no manifesto de execução. Em um ciclo retomado (ver manifest.start_cycle), a atualização concluída é ignorada e a interrompida continua da última etapa registrada, submetendo somente os jobs pendentes
+    ATENÇÃO: com resultado válido no cache (períodos fechados, ver resultCache) o arquivo é restaurado do disco, sem consulta ao SAP. O resultado só é gravado no cache quando todos os jobs submetidos possuem ordem spool exportada e sem excesso de linhas (execução não retomada após a exportação)
+
+    Args:
+        updateObject (object): classe da atualização de dados
+        referenceInfo (object): objeto com dados do período
+        arrParam (list): lista com os parâmetros da consulta
+        qtdSessions (int): quantidade de sessões SAP
+        maxConcurrentSpools (int): quantidade máxima de ordens spool por ciclo
+    """
+
+    try:
+        start = time.time()
+        updateData = updateObject(referenceInfo)
+        updateName = updateData.name
+        outputFilePath = os.path.join(env.DIR_EXPORTED_DATA, f'{updateData.exportFileName}.txt')
+        runManifest = manifest.RunManifest(updateName, {'reference': referenceInfo.name, 'params': sorted(map(str, arrParam)), 'sessions': qtdSessions, 'maxConcurrentSpools': maxConcurrentSpools})
+        if runManifest.load() and runManifest.has_reached('written'):
+            print(utils.CustomMessage.prGreen(f'Skipping {updateName} [{referenceInfo.name}]: already completed in the resumed cycle'))
+            return
+
+        cachedFilePath = resultCache.get_cached_result(updateData, arrParam)
+        if cachedFilePath is not None:
+            with tracing.span('cache', update=updateName, reference=referenceInfo.name):
+                shutil.copyfile(cachedFilePath, outputFilePath)
+            runManifest.set_stage('written', outputs=[outputFilePath])
+            print(utils.CustomMessage.prGreen(f'Served {updateName} [{referenceInfo.name}] from result cache'))
+            logging.info(f'Served {updateName} [{referenceInfo.name}] from result cache [{cachedFilePath}]')
+            return
+
+        utils.print_start_block(f'Starting background query {utils.CustomMessage.prYellow(updateName)} [{len(arrParam)}] [{referenceInfo.name}]')
+        comProxy.reset_com_call_stats()
+
+        if runManifest.resumed:
+            print(utils.CustomMessage.prYellow(f'Resuming {updateName} after stage {runManifest.stage}'))
+            logging.info(f'Resuming {updateName} [{referenceInfo.name}] after stage {runManifest.stage}')
+        else:
+            background.remove_trash(RETRY_POLICY, PARALLEL_CLEANUP)
+            runManifest.start()
+
+        if not runManifest.has_reached('submitted'):
+            receipts = __run_update_into_file(updateObject, referenceInfo, arrParam, qtdSessions, maxConcurrentSpools, runManifest)
+            runManifest.set_stage('submitted', receipts=receipts)
+
+        # retomada após a exportação: a conferência das ordens spool não é repetida e o resultado não é gravado no cache
+        spoolsComplete = False
+        if not runManifest.has_reached('exported'):
+            spoolList = background.export_files(RETRY_POLICY, runManifest.receipts) or {}
+            spoolsComplete = __resubmit_overflowed_spools(updateObject, referenceInfo, runManifest.receipts, spoolList, runManifest)
+            spoolArchive.archive_spool_files(updateName, utils.get_file_entries(env.DIR_SPOOL_DATA, 'txt', [updateName]))
+            runManifest.set_stage('exported', spoolList=spoolList)
+
+        __run_update_from_file(updateObject, referenceInfo)
+        runManifest.set_stage('written', outputs=[outputFilePath])
+        if updateData.exportKeyFields is None and spoolsComplete:
+            resultCache.store_result(updateData, arrParam, outputFilePath)
+        elif updateData.exportKeyFields is None:
+            logging.warning(f'{updateName} [{referenceInfo.name}] not stored in result cache: exported spools not verified complete')
+
+        if sap.INSTRUMENT_COM_CALLS:
+            comProxy.dump_com_call_summary(updateName)
+        utils.print_end_block(f'Executed data update in {time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}')
+
+    except Exception:
+        raise Exception('Exception occurred')
+
+
+def __get_date_shard_count(updateData: object, paramCount: int, qtdSessions: int, maxConcurrentSpools: int):
+    """
+    Este método calcula em quantas partes o período de seleção de cada parâmetro é dividido, para que todas as sessões recebam DATE_SHARD_JOBS_PER_SESSION jobs independente da quantidade de parâmetros (códigos)
+
+    Args:
+        updateData (object): objeto da atualização de dados (ver UpdateData.maxDateShards)
+        paramCount (int): quantidade de parâmetros consultados
+        qtdSessions (int): quantidade de sessões SAP
+        maxConcurrentSpools (int): quantidade máxima de ordens spool por ciclo
+
+    Returns:
+        int: quantidade de partes do período (1 = sem divisão)
+    """
+
+    if updateData.maxDateShards <= 1 or paramCount == 0:
+        return 1
+
+    targetCount = math.ceil(qtdSessions * DATE_SHARD_JOBS_PER_SESSION / paramCount)
+    return max(1, min(updateData.maxDateShards, targetCount, maxConcurrentSpools // paramCount))
+
+
+def __get_session_slices(updateData: object, arrParam: list, qtdSessions: int, maxConcurrentSpools: int):
+    """
+    Este método realiza a divisão da consulta em partes (parâmetros e período de seleção) por sessão. Cada parte é submetida como um job, com título conforme a posição da parte na sessão (ver UpdateData.execute)
+
+    Args:
+        updateData (object): objeto da atualização de dados
+        arrParam (list): lista com os parâmetros da consulta
+        qtdSessions (int): quantidade de sessões SAP
+        maxConcurrentSpools (int): quantidade máxima de ordens spool por ciclo
+
+    Returns:
+        list: partes da consulta (parâmetros e período de seleção) de cada sessão [Exemplo: [[(['30'], None), (['150'], None)], ...]]
+    """
+
+    # divisão por período: jobs código x período distribuídos entre as sessões (cada sessão ordenada por período, mantendo a tela de seleção aquecida)
+    dateSlices = updateData.get_date_slices(__get_date_shard_count(updateData, len(arrParam), qtdSessions, maxConcurrentSpools))
+    if len(dateSlices) > 1:
+        querySlices = [([str(param)], dateWindow) for dateWindow in dateSlices for param in arrParam]
+        return [sorted(querySlices[index::qtdSessions], key=lambda querySlice: querySlice[1]) for index in range(qtdSessions)]
+
+    maxSesSpool = math.floor(maxConcurrentSpools / qtdSessions)
+    sessionSlices = []
+    for arr in numpy.array_split(arrParam, qtdSessions):
+        m = math.ceil(len(arr) / maxSesSpool)
+        sessionSlices.append([(list(map(str, chunk)), None) for chunk in utils.split_array(list(arr), m)] if m else [])
+
+    return sessionSlices
+
+
+def __run_update_into_file(updateObject: object, referenceInfo: object, arrParam: list, qtdSessions: int, maxConcurrentSpools: int, runManifest: object):
+
+    try:
+        if qtdSessions > 6:
+            raise Exception('Array parameters with length greater than 6 [sessions].')
+
+        # partes da consulta registradas no manifesto: ao retomar, cada título de job corresponde à mesma parte, independente da ordem dos parâmetros e da data atual (períodos abertos são divididos até a data atual)
+        sessionSlices = runManifest.sessionSlices
+        if sessionSlices is None:
+            sessionSlices = __get_session_slices(updateObject(referenceInfo), arrParam, qtdSessions, maxConcurrentSpools)
+            runManifest.set_stage('started', sessionSlices=sessionSlices)
+        dateSliceCount = len({dateWindow for slices in sessionSlices for _, dateWindow in slices})
+
+        # jobs já submetidos em execução interrompida (registrados no manifesto) não são submetidos novamente
+        submittedReceipts = runManifest.get_recorded_receipts()
+        submittedJobTitles = {receipt.jobTitle.upper() for receipt in submittedReceipts}
+
+    # ---------------------------
+
+        with tracing.span('submit', sessions=len(sessionSlices), mode=PARALLEL_MODE, dateSlices=dateSliceCount) as span:
+            arrTaskConfig = []
+            for index, slices in enumerate(sessionSlices):
+                u = updateObject(referenceInfo, RETRY_POLICY)
+                u.traceContext = tracing.get_context()  # spans das sessões (threads/processos filhos) vinculados ao span da submissão
+                u.runManifest = runManifest
+                u.submittedJobTitles = submittedJobTitles
+                arr = [param for params, _ in slices for param in params]
+                t = TaskConfig(u.execute, [arr, index + 1, len(arr), slices])
+                arrTaskConfig.append(t)
+            expectedJobCount = sum(len(slices) for slices in sessionSlices)
+
+            if PARALLEL_MODE == 'thread':
+                results = multitask.run_multithread(arrTaskConfig)
+            else:
+                results = multitask.run_multiprocess(arrTaskConfig, True)
+
+            receipts = submittedReceipts + [receipt for result in results if result for receipt in result]
+            span.set('jobs', len(receipts))
+            span.set('resumedJobs', len(submittedReceipts))
+
+            # sessão com falha na submissão: a atualização é interrompida (os jobs submetidos ficam no manifesto e somente os pendentes são submetidos ao retomar o ciclo)
+            failedSessions = [index + 1 for index, result in enumerate(results) if result is None]
+            if failedSessions or len(receipts) < expectedJobCount:
+                logging.error(f'Incomplete job submission [{runManifest.name}] [{len(receipts)}/{expectedJobCount} jobs] [failed sessions: {failedSessions}]')
+                raise Exception(f'Incomplete job submission: {len(receipts)}/{expectedJobCount} jobs')
+            return receipts
+
+    except Exception:
+        raise Exception('Exception occurred')
+
+
+def __resubmit_overflowed_spools(updateObject: object, referenceInfo: object, receipts: list, spoolList: dict, runManifest: object):
+    """
+    Este método confere as ordens spool exportadas e, para as que excederam o limite de linhas (sap.SPOOL_MAX_LINES), divide a consulta do job (pela lista de parâmetros ou pelo período de seleção, ver UpdateData.split_query_slice) e reenvia somente as partes, substituindo o arquivo exportado. Repete até não haver excesso ou até SPOOL_SPLIT_MAX_ROUNDS rodadas
+    ATENÇÃO: o arquivo de cada job é identificado pelo número da ordem spool (spoolList), não pelo título. Os jobs reenviados têm o título do job dividido como prefixo [Exemplo: IW67_MEDL_S1_001_002] e são registrados no manifesto de execução: ao retomar a atualização, as partes já submetidas não são submetidas novamente
+
+    Args:
+        updateObject (object): classe da atualização de dados
+        referenceInfo (object): objeto com dados do período
+        receipts (list): comprovantes (JobReceipt) dos jobs exportados
+        spoolList (dict): número da ordem spool e título do job exportado (ver background.export_files), atualizado com as ordens spool dos jobs reenviados
+        runManifest (object): manifesto de execução da atualização (RunManifest)
+
+    Returns:
+        bool: True se todos os jobs possuem ordem spool exportada e nenhuma permanece com excesso de linhas (resultado completo)
+    """
+
+    u = updateObject(referenceInfo, RETRY_POLICY)
+    u.runManifest = runManifest
+    recordedReceipts = {receipt.jobTitle.upper(): receipt for receipt in runManifest.get_recorded_receipts()}
+    u.submittedJobTitles = set(recordedReceipts)
+    complete = True
+    for splitRound in range(1, SPOOL_SPLIT_MAX_ROUNDS + 2):
+        exportedFiles = background.get_exported_spool_files(spoolList)
+        spoolNumbers = {title.upper(): number for number, title in spoolList.items()}
+        overflowedReceipts = []
+        for receipt in receipts:
+            entry = exportedFiles.get(spoolNumbers.get(receipt.jobTitle.upper()))
+            if entry is None:
+                complete = False
+                logging.warning(f'No exported spool for job {receipt.jobTitle} [{u.name}]')
+            elif fileCrud.is_spool_file_overflow(entry, u.fields, sap.SPOOL_MAX_LINES):
+                overflowedReceipts.append((receipt, entry))
+
+        if not overflowedReceipts:
+            return complete
+
+        if splitRound > SPOOL_SPLIT_MAX_ROUNDS:
+            logging.warning(f'Spool overflow split stopped after {SPOOL_SPLIT_MAX_ROUNDS} rounds [{u.name}] [{len(overflowedReceipts)} spools]')
+            return False
+
+        with tracing.span('split_overflow', round=splitRound, spools=len(overflowedReceipts)) as span:
+            newReceipts = []
+            for receipt, entry in overflowedReceipts:
+                querySlices = u.split_query_slice(receipt.arrParam, receipt.dateWindow)
+                if not querySlices:
+                    print(utils.CustomMessage.prRed(f'Spool {receipt.jobTitle} exceeds {sap.SPOOL_MAX_LINES} lines and cannot be split further [{receipt.arrParam}] [{receipt.dateWindow}]'))
+                    logging.warning(f'Spool {receipt.jobTitle} exceeds {sap.SPOOL_MAX_LINES} lines and cannot be split further [{receipt.arrParam}] [{receipt.dateWindow}]')
+                    complete = False
+                    continue
+
+                print(utils.CustomMessage.prYellow(f'Spool {receipt.jobTitle} exceeds {sap.SPOOL_MAX_LINES} lines, resubmitting in {len(querySlices)} parts'))
+                os.remove(entry.path)
+                # partes já submetidas antes da interrupção da atualização (registradas no manifesto) são reaproveitadas
+                partTitles = [f'{receipt.jobTitle}_{index + 1:03d}'.upper() for index in range(len(querySlices))]
+                newReceipts.extend(recordedReceipts[title] for title in partTitles if title in recordedReceipts)
+                newReceipts.extend(u.submit_query_slices(querySlices, receipt.sessionNumber, receipt.jobTitle))
+
+            span.set('jobs', len(newReceipts))
+            if not newReceipts:
+                return complete
+
+            spoolList.update(background.export_files(RETRY_POLICY, newReceipts, removeExported=False) or {})
+            receipts = newReceipts
+
+
+def __run_update_from_file(updateObject: object, referenceInfo: object, archivePath: str | None = None):
+
+    try:
+        u = updateObject(referenceInfo, RETRY_POLICY)
+        u.import_file_data(archivePath)
+        u.export_file_data()
+
+    except Exception:
+        raise Exception('Exception occurred')
+
+
+def __get_reference_info(referenceName: str):
+    """
+    Este método realiza a conversão de um período referência para um objeto ReferenceInfo, contendo informações do período. Os dados de referência são essenciais para a consulta correta no SAP e atualização de dados na banco Access.
+
+    Args:
+        referenceName (str): nome do período de referência, no formato MM_AAAA [Exemplo: 09_2023]
+
+    Returns:
+        ReferenceInfo: objeto com dados do período
+    """
+
+    try:
+        year, month = list(map(lambda x: int(x), referenceName.split("_")))
+        dateIni = datetime.date(year, month, 1)
+        dateEnd = datetime.date(year, month, calendar.monthrange(year, month)[1])
+
+        return ReferenceInfo(dateIni.strftime("%Y_%m"), month, year, dateIni, dateEnd)
+
+    except Exception:
+        return None
+
+
+def __merge_table_data(transactionName: str | None):
+
+    if not MERGE_TABLES:
+        return
+
+    start = time.time()
+    utils.print_start_block(f'Starting table data merge for {transactionName}')
+
+    names = {
+        'IW67': 'TB_ECC_MEDIDA',
+        'IW39': 'TB_ECC_ORDEM',
+    }
+
+    if transactionName is not None:
+        transactionName = transactionName.upper()
+
+    with tracing.span('merge', transaction=transactionName) as span:
+        for partialFileName, outputFileName in names.items():
+            if transactionName == partialFileName or transactionName is None:
+                print(utils.CustomMessage.prYellow(f'Exporting data from *{partialFileName}* to file {outputFileName}'))
+                entries = utils.get_file_entries(env.DIR_EXPORTED_DATA, 'txt', [partialFileName])
+                fileCrud.merge_text_file_data(entries, outputFileName, MERGE_KEY_FIELDS.get(outputFileName), MERGE_ORDER_FIELD)
+                span.add('files', len(entries))
+
+    utils.print_end_block(f'Finished table data merge in {time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}')
+
+
+# ? ===================
+
+def __get_measurement_medl():
+
+    arrMeasurementMEDL = list(map(lambda x: f'{x:04d}', MEASUREMENT_MEDL))
+
+    return list(set(arrMeasurementMEDL))
+
+
+def __get_measurement_mede():
+
+    arrMeasurementMEDE = list(map(lambda x: f'{x:04d}', MEASUREMENT_MEDE))
+
+    return list(set(arrMeasurementMEDE))
+
+
+def __get_medl_watermark(fullRefresh: bool):
+    """
+    Este método retorna a data da marca d'água (watermark) para atualização incremental do IW67 MEDL. A atualização completa é utilizada quando solicitada, sem execução anterior registrada, sem arquivo exportado ou quando a última atualização completa ultrapassa MEDL_FULL_REFRESH_DAYS
+
+    Args:
+        fullRefresh (bool): se True, força a atualização completa
+
+    Returns:
+        datetime.date: data da última execução com sucesso (None = atualização completa)
+    """
+
+    if fullRefresh or not MEDL_INCREMENTAL:
+        return None
+
+    state = watermark.get_watermark('IW67_MEDL')
+    if state is None or state['lastFullRefresh'] is None or not os.path.isfile(os.path.join(env.DIR_EXPORTED_DATA, 'IW67_MEDL.txt')):
+        return None
+
+    if datetime.datetime.now() - state['lastFullRefresh'] > datetime.timedelta(days=MEDL_FULL_REFRESH_DAYS):
+        return None
+
+    return state['lastRun'].date()
+
+
+# ? ==========================================================================================
+
+def run_update_IW67_MEDL(referenceInfo: object, qtdSessions: int, maxConcurrentSpools: int, fullRefresh: bool = False):
+
+    arrMeasurementMEDL = __get_measurement_medl()
+    runStart = manifest.get_cycle_start() or datetime.datetime.now()  # ciclo retomado: início do ciclo interrompido (registros gravados desde então são consultados na próxima execução)
+    medlWatermark = __get_medl_watermark(fullRefresh)
+
+    with tracing.span('IW67_MEDL', reference=referenceInfo.name, params=len(arrMeasurementMEDL), mode='full' if medlWatermark is None else 'incremental'):
+        if medlWatermark is None:
+            __run_update_background(IW67ByMeasurementMEDL, referenceInfo, arrMeasurementMEDL, qtdSessions, maxConcurrentSpools)
+        else:
+            print(utils.CustomMessage.prYellow(f'Incremental IW67_MEDL update since {medlWatermark.strftime("%d.%m.%Y")}'))
+            __run_update_background(functools.partial(IW67ByMeasurementMEDLClosed, watermark=medlWatermark), referenceInfo, arrMeasurementMEDL, qtdSessions, maxConcurrentSpools)
+            __run_update_background(functools.partial(IW67ByMeasurementMEDL, watermark=medlWatermark), referenceInfo, arrMeasurementMEDL, qtdSessions, maxConcurrentSpools)
+        __merge_table_data('IW67')
+
+    watermark.set_watermark('IW67_MEDL', runStart, medlWatermark is None)
+
+
+def run_update_IW67_MEDE(referenceInfo: object, qtdSessions: int, maxConcurrentSpools: int):
+
+    arrMeasurementMEDE = __get_measurement_mede()
+
+    with tracing.span('IW67_MEDE', reference=referenceInfo.name, params=len(arrMeasurementMEDE)):
+        __run_update_background(IW67ByMeasurementMEDE, referenceInfo, arrMeasurementMEDE, qtdSessions, maxConcurrentSpools)
+        __merge_table_data('IW67')
+
+
+def reprocess_spool_archive(updateObject: object, referenceInfo: object, archivePath: str | None = None):
+    """
+    Este método reprocessa as ordens spool arquivadas de uma execução anterior (ver spoolArchive), sem consulta ao SAP: importa os dados do arquivo compactado e grava o arquivo exportado (ex.: após correção da leitura ou dos campos FieldConfig)
+
+    Args:
+        updateObject (object): classe da atualização de dados
+        referenceInfo (object): objeto com dados do período
+        archivePath (str | None): arquivo compactado (None = execução mais recente da atualização)
+    """
+
+    updateName = updateObject(referenceInfo).name
+    if archivePath is None:
+        archivePaths = spoolArchive.get_archive_paths(updateName)
+        if not archivePaths:
+            print(utils.CustomMessage.prRed(f'No spool archive found for {updateName}'))
+            return
+        archivePath = archivePaths[-1]
+
+    with tracing.span('reprocess', update=updateName, archive=os.path.basename(archivePath)):
+        __run_update_from_file(updateObject, referenceInfo, archivePath)
+
+
+def run_update_IW67_MEDE_year(referenceInfo: object, qtdSessions: int, maxConcurrentSpools: int):
+    """
+    Este método executa a atualização IW67 MEDE de todos os meses do ano do período de referência (reprocessamento), até o mês atual. Os meses fechados já consultados são servidos do cache de resultados (ver resultCache)
+
+    Args:
+        referenceInfo (object): objeto com dados do período (somente o ano é utilizado)
+        qtdSessions (int): quantidade de sessões SAP
+        maxConcurrentSpools (int): quantidade máxima de ordens spool por ciclo
+    """
+
+    arrMeasurementMEDE = __get_measurement_mede()
+
+    with tracing.span('IW67_MEDE_year', year=referenceInfo.year, params=len(arrMeasurementMEDE)):
+        for referenceName in utils.get_referenceName_year(referenceInfo):
+            monthReferenceInfo = __get_reference_info(referenceName)
+            if monthReferenceInfo.dateIni > datetime.date.today():
+                continue
+            __run_update_background(IW67ByMeasurementMEDE, monthReferenceInfo, arrMeasurementMEDE, qtdSessions, maxConcurrentSpools)
+        __merge_table_data('IW67')
+
+
+def run_update_cycle(updateFunctions: list, qtdSessions: int = QTD_SESSIONS, maxConcurrentSpools: int = MAX_CONCURRENT_SPOOLS):
+    """
+    Este método executa um ciclo de atualização no período de referência atual (mês corrente), retomando o ciclo anterior interrompido das mesmas atualizações (ver manifest.start_cycle)
+
+    Args:
+        updateFunctions (list): métodos de atualização executados no ciclo, em ordem [Exemplo: [run_update_IW67_MEDL, run_update_IW67_MEDE]]
+        qtdSessions (int): quantidade de sessões SAP
+        maxConcurrentSpools (int): quantidade máxima de ordens spool por ciclo
+    """
+
+    start = time.time()
+    referenceName = datetime.date.today().strftime("%Y_%m")
+    referenceInfo = __get_reference_info(referenceName)
+
+    utils.print_start_block(f'Starting global update for {referenceName} [{qtdSessions} sessions - max {maxConcurrentSpools} spools]')
+    resumed = manifest.start_cycle(referenceInfo.name, [updateFunction.__name__ for updateFunction in updateFunctions])
+    if resumed:
+        print(utils.CustomMessage.prYellow(f'Resuming interrupted update cycle {manifest.CURRENT_CYCLE_ID}'))
+    with tracing.span('cycle', reference=referenceName, sessions=qtdSessions, resumed=resumed):
+        for updateFunction in updateFunctions:
+            updateFunction(referenceInfo, qtdSessions, maxConcurrentSpools)
+    manifest.finish_cycle()
+    utils.print_end_block(f'Finished global update in {time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}')
+
+
+# ! ----------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    logQueue.start_logging()
+    try:
+        run_update_cycle([run_update_IW67_MEDL, run_update_IW67_MEDE])
+
+    finally:
+        logQueue.stop_logging()
@@ -0,0 +1,280 @@
+import os
+import glob
+import json
+import time
+import uuid
+import datetime
+import env
+from model import JobReceipt
+
+# ? Informações: módulo responsável pelo manifesto de execução (checkpoint) do ciclo de atualização: jobs submetidos, ordens spool exportadas e arquivos gravados de cada atualização, permitindo retomar um ciclo interrompido sem refazer as etapas concluídas
+
+# Diretório dos manifestos, dentro do diretório dos dados importados (env.DIR_EXPORTED_DATA)
+MANIFEST_DIRECTORY_NAME = 'manifest'
+
+# Arquivo do ciclo de atualização atual (identificador, referência, atualizações e status)
+CYCLE_FILE_NAME = 'cycle.json'
+
+# Etapas de cada atualização, na ordem de execução
+MANIFEST_STAGES = ['started', 'submitted', 'exported', 'written']
+
+MANIFEST_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Identificador do ciclo em execução (None = manifesto desativado, ver start_cycle)
+CURRENT_CYCLE_ID = None
+
+
+def _get_manifest_directory():
+
+    directory = os.path.join(env.DIR_EXPORTED_DATA, MANIFEST_DIRECTORY_NAME)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _read_json(filePath: str):
+
+    if not os.path.isfile(filePath):
+        return None
+
+    with open(filePath, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _write_json(filePath: str, data: dict):
+
+    temporaryFilePath = f'{filePath}.tmp'
+    with open(temporaryFilePath, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+    os.replace(temporaryFilePath, filePath)
+
+
+def _receipt_to_dict(receipt: JobReceipt):
+
+    values = dict(vars(receipt))
+    if receipt.dateWindow is not None:
+        values['dateWindow'] = [date.isoformat() for date in receipt.dateWindow]
+    return values
+
+
+def _receipt_from_dict(values: dict):
+
+    values = dict(values)
+    if values.get('dateWindow') is not None:
+        values['dateWindow'] = tuple(datetime.date.fromisoformat(date) for date in values['dateWindow'])
+    return JobReceipt(**values)
+
+
+def _slices_to_list(sessionSlices: list):
+
+    return [[[list(arrParam), None if dateWindow is None else [date.isoformat() for date in dateWindow]] for arrParam, dateWindow in slices] for slices in sessionSlices]
+
+
+def _slices_from_list(values: list):
+
+    return [[(arrParam, None if dateWindow is None else tuple(datetime.date.fromisoformat(date) for date in dateWindow)) for arrParam, dateWindow in slices] for slices in values]
+
+
+# ? ==========================================================================================
+
+def start_cycle(referenceName: str, updateNames: list):
+    """
+    Este método inicia o ciclo de atualização e ativa os manifestos de execução. Se o último ciclo da mesma referência e das mesmas atualizações não foi concluído, o ciclo é retomado: as atualizações concluídas são ignoradas e as interrompidas continuam da última etapa registrada
+    ATENÇÃO: sem ciclo iniciado os manifestos ficam desativados (cada atualização é executada integralmente). Um ciclo de outras atualizações (ex.: agendamentos distintos do serviço) não é retomado, é iniciado um novo ciclo
+
+    Args:
+        referenceName (str): nome do período de referência do ciclo [Exemplo: 2023_09]
+        updateNames (list): nomes das atualizações executadas no ciclo, em ordem [Exemplo: ['run_update_IW67_MEDL', 'run_update_IW67_MEDE']]
+
+    Returns:
+        bool: True se o ciclo anterior foi retomado
+    """
+
+    global CURRENT_CYCLE_ID
+
+    cycleFilePath = os.path.join(_get_manifest_directory(), CYCLE_FILE_NAME)
+    cycle = _read_json(cycleFilePath)
+    if cycle is not None and cycle['status'] != 'completed' and cycle['reference'] == referenceName and cycle.get('updates') == list(updateNames):
+        CURRENT_CYCLE_ID = cycle['cycleId']
+        return True
+
+    CURRENT_CYCLE_ID = time.strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:6]
+    _write_json(cycleFilePath, {'cycleId': CURRENT_CYCLE_ID, 'reference': referenceName, 'updates': list(updateNames), 'status': 'running', 'started': time.strftime(MANIFEST_DATETIME_FORMAT)})
+    return False
+
+
+def get_cycle_start():
+    """
+    Este método retorna o início do ciclo de atualização em execução (em um ciclo retomado, o início da execução interrompida)
+
+    Returns:
+        datetime.datetime: início do ciclo (None se não houver ciclo iniciado)
+    """
+
+    if CURRENT_CYCLE_ID is None:
+        return None
+
+    cycle = _read_json(os.path.join(_get_manifest_directory(), CYCLE_FILE_NAME))
+    if cycle is None or cycle['cycleId'] != CURRENT_CYCLE_ID:
+        return None
+
+    return datetime.datetime.strptime(cycle['started'], MANIFEST_DATETIME_FORMAT)
+
+
+def finish_cycle():
+    """
+    Este método registra a conclusão do ciclo de atualização (o próximo ciclo inicia do zero) e desativa os manifestos de execução
+    """
+
+    global CURRENT_CYCLE_ID
+
+    if CURRENT_CYCLE_ID is None:
+        return
+
+    cycleFilePath = os.path.join(_get_manifest_directory(), CYCLE_FILE_NAME)
+    cycle = _read_json(cycleFilePath) or {'cycleId': CURRENT_CYCLE_ID}
+    cycle['status'] = 'completed'
+    cycle['finished'] = time.strftime(MANIFEST_DATETIME_FORMAT)
+    _write_json(cycleFilePath, cycle)
+    CURRENT_CYCLE_ID = None
+
+
+class RunManifest:
+
+    """
+    Esta classe representa o manifesto de execução de uma atualização de dados no ciclo atual: etapa concluída, partes da consulta de cada sessão, jobs submetidos (JobReceipt), ordens spool exportadas e arquivos gravados
+    ATENÇÃO: os jobs são registrados pelas sessões (processos/threads filhos) a cada submissão, em um arquivo por sessão; as etapas são registradas pelo processo principal
+
+    A classe RunManifest faz o seguinte:
+        - Registra e lê a etapa concluída de cada atualização (MANIFEST_STAGES)
+        - Registra as partes da consulta de cada sessão (o título de cada job corresponde à posição da parte) e os jobs submetidos para retomar somente os jobs pendentes
+    """
+
+    def __init__(self, name: str, config: dict):
+        """
+        Este é o método construtor da classe RunManifest.
+
+        Args:
+            name (str): nome da atualização de dados [Exemplo: IW67_MEDL]
+            config (dict): configuração da atualização (parâmetros, sessões, período...). O manifesto só é retomado com a mesma configuração
+        """
+
+        self.name = name
+        self.config = config
+        self.cycleId = CURRENT_CYCLE_ID
+        self.enabled = self.cycleId is not None
+        self.directory = _get_manifest_directory() if self.enabled else None
+        self.stage = None
+        self.sessionSlices = None
+        self.receipts = []
+        self.spoolList = {}
+        self.outputs = []
+        self.resumed = False
+
+    def __get_file_path(self):
+
+        return os.path.join(self.directory, f'{self.name}.json')
+
+    def __get_session_file_paths(self):
+
+        return glob.glob(os.path.join(glob.escape(self.directory), f'{glob.escape(self.name)}_S*.jsonl'))
+
+    def load(self):
+        """
+        Este método realiza a leitura do manifesto registrado para a atualização no ciclo atual, com a mesma configuração
+
+        Returns:
+            bool: True se o manifesto foi retomado
+        """
+
+        if not self.enabled:
+            return False
+
+        data = _read_json(self.__get_file_path())
+        if data is None or data['cycleId'] != self.cycleId or data['config'] != self.config:
+            return False
+
+        self.stage = data['stage']
+        self.sessionSlices = None if data.get('sessionSlices') is None else _slices_from_list(data['sessionSlices'])
+        self.receipts = [_receipt_from_dict(values) for values in data['receipts']]
+        self.spoolList = data['spoolList']
+        self.outputs = data['outputs']
+        self.resumed = True
+        return True
+
+    def save(self):
+
+        if not self.enabled:
+            return
+
+        _write_json(self.__get_file_path(), {
+            'cycleId': self.cycleId,
+            'name': self.name,
+            'config': self.config,
+            'stage': self.stage,
+            'updated': time.strftime(MANIFEST_DATETIME_FORMAT),
+            'sessionSlices': None if self.sessionSlices is None else _slices_to_list(self.sessionSlices),
+            'receipts': [_receipt_to_dict(receipt) for receipt in self.receipts],
+            'spoolList': self.spoolList,
+            'outputs': self.outputs,
+        })
+
+    def start(self):
+        """
+        Este método inicia o manifesto da atualização (remove os jobs registrados em execuções anteriores)
+        """
+
+        if self.enabled:
+            for filePath in self.__get_session_file_paths():
+                os.remove(filePath)
+
+        self.set_stage('started')
+
+    def has_reached(self, stage: str):
+
+        return self.stage is not None and MANIFEST_STAGES.index(self.stage) >= MANIFEST_STAGES.index(stage)
+
+    def set_stage(self, stage: str, **values):
+        """
+        Este método registra a conclusão de uma etapa da atualização e os dados da etapa [Exemplo: set_stage('exported', spoolList={...})]
+
+        Args:
+            stage (str): etapa concluída (ver MANIFEST_STAGES)
+            **values: dados da etapa (sessionSlices, receipts, spoolList, outputs)
+        """
+
+        self.stage = stage
+        for key, value in values.items():
+            setattr(self, key, value)
+        self.save()
+
+    def record_receipt(self, receipt: JobReceipt):
+        """
+        Este método registra um job submetido pela sessão (chamado nos processos/threads filhos a cada submissão)
+
+        Args:
+            receipt (JobReceipt): comprovante de submissão do job
+        """
+
+        if not self.enabled or receipt is None:
+            return
+
+        with open(os.path.join(self.directory, f'{self.name}_S{receipt.sessionNumber}.jsonl'), 'a', encoding='utf-8') as file:
+            file.write(json.dumps(_receipt_to_dict(receipt), ensure_ascii=False) + '\n')
+
+    def get_recorded_receipts(self):
+        """
+        Este método retorna os jobs registrados pelas sessões na atualização atual (ver record_receipt)
+
+        Returns:
+            list: comprovantes (JobReceipt) dos jobs já submetidos
+        """
+
+        if not self.enabled:
+            return []
+
+        receipts = []
+        for filePath in self.__get_session_file_paths():
+            with open(filePath, encoding='utf-8') as file:
+                receipts.extend(_receipt_from_dict(json.loads(line)) for line in file if line.strip())
+
+        return receipts
@@ -1,286 +1,517 @@
-import sap
-import fileCrud
-import logging
-import time
-import env
-import utils
-import datetime
-
-# ? Informações: módulo responsável pela gestão das Classes em uso no script (contém as regras de negócio principais)
-
-
-class ReferenceInfo:
-
-    """
-    Esta classe representa a parametrização de perído de execução da atualização
-
-    A classe ReferenceInfo faz o seguinte:
-        - Estrutura os dados necessários para executar os relatórios de acordo com as datas necessárias
-        - Não possui métodos/funções próprias
-    """
-
-    def __init__(self, name: str, month: int, year: int, dateIni: any, dateEnd: any):
-        self.name = name
-        self.month = month
-        self.year = year
-        self.dateIni = dateIni
-        self.dateEnd = dateEnd
-
-
-class TaskConfig:
-
-    """
-    Esta classe representa a parametrização de tarefas a serem executadas em multithreading ou multiprocessing
-
-    A classe TaskConfig faz o seguinte:
-        - Estrutura os dados necessários para executar um método/função em multithread/multiprocess
-        - Não possui métodos/funções próprias
-    """
-
-    def __init__(self, callback: any, args: list):
-        """
-        Este é o método construtor da classe TaskConfig.
-
-        Args:
-            callback (any): referência para o método/função do objeto reference que será executado (ponteiro)
-            args (list): array com os argumentos necessários para executar o método/função (se não houver argumentos, informar array vazio [])
-        """
-
-        self.callback = callback
-        self.args = args
-
-
-class FilterConfig:
-
-    def __init__(self, columnName: str, type: str, args: list):
-
-        self.columnName = columnName
-        self.type = type
-        self.args = args
-
-    def isValid(self, value: str) -> bool:
-
-        filterFunctions = {
-            'equalsAny': lambda x: x in self.args,
-            'equalsAll': lambda x: all(arg == x for arg in self.args),
-            'containsAll': lambda x: all(arg in x for arg in self.args),
-            'containsAny': lambda x: any(arg in x for arg in self.args),
-        }
-
-        filterFunction = filterFunctions.get(self.type)
-        if filterFunction:
-            return filterFunction(value)
-        else:
-            print('Invalid filter type')
-            return False
-
-
-class FieldConfig:
-
-    """
-    Esta classe representa a parametrização de colunas que representam a estrutura dos dados de uma transação SAP, utilizados para importar/exportar corretamente os dados entre diversos contexto. Cada transação do SAP possui colunas específicas de acordo com o layout definido, os parâmetros dos nomes de coluna devem ser estruturados utilizando esta classe
-
-    A classe Field faz o seguinte:
-        - Estrutura os dados necessários para identificar as colunas de uma transação em diversos contextos
-        - Não possui métodos/funções próprias
-    """
-
-    def __init__(self, name: str, fileColumnNames: list, getValueCallback: any):
-        """
-        Este é o método construtor da classe Field.
-
-        Args:
-            name (str): nome da campo            
-            sapColumnName (str): nome da coluna no contexto de tabela SAP (GuiGridView)
-            fileColumnNames (list): array de nomes da coluna no contexto de arquivo .txt (exportado background)
-            getValueCallback (any): função para tratar o dado original e retornar formatado 
-        """
-
-        self.name = name
-        self.fileColumnNames = fileColumnNames
-        self.getValue = getValueCallback
-
-
-class SapImportConfig:
-
-    """
-    Esta classe representa a parametrização da transação SAP. Cada transação possui parâmetros específicos que devem ser estruturados utilizando esta classe.
-    ATENÇÃO: transações SAP que resultam em tabelas que não sejam instâncias de GuiGridView (ver documentação SAP) não são aplicáveis
-
-    A classe SapImportConfig faz o seguinte:
-        - Estrutura os dados necessários para executar uma transação no SAP
-        - Não possui métodos/funções próprias
-    """
-
-    def __init__(self, sapTransaction: str, sapVariant: str, fields: list):
-        """
-        Este é o método construtor da classe SapImportConfig.
-
-        Args:
-            sapTransaction (str): código da transação do SAP
-            sapVariant (str): nome da variante de execução do SAP         
-            fields (list): array contendo a parametrização das colunas das tabelas de dados da transação 
-        """
-
-        self.sapTransaction = sapTransaction
-        self.sapVariant = sapVariant
-        self.fields = fields
-
-
-class UpdateData(SapImportConfig):
-
-    """
-    Esta classe representa a parametrização completa para atualização dos dados a partir de transações SAP. Cada parametrização de consulta devem ser estruturada utilizando esta classe.
-
-    A classe UpdateData faz o seguinte:
-        - Estrutura os dados necessários para atualizar dados via transação SAP
-    """
-
-    def __init__(self, name: str, sapConfig: SapImportConfig, referenceInfo: ReferenceInfo):
-        """
-        Este é o método construtor da classe UpdateData.
-
-        Args:
-            name (str): nome que descreve a atualização de dados [Exemplo: IW67_MEDL]
-            sapConfig (SapImportConfig): objeto que contém os parâmetros da transação SAP            
-            referenceInfo (ReferenceInfo): objeto que representa os dados do período para execução
-        """
-
-        super().__init__(sapConfig.sapTransaction, sapConfig.sapVariant, sapConfig.fields)
-        self.name = name
-        self.referenceInfo = referenceInfo
-        self.data = []
-        self.printSapLog = False
-
-    def _initialize_sap_transaction(self):
-        # ! must be overridden by inherited class
-        """
-        Este método inicia a transação no SAP e parametriza os campos para realizar a consulta. É um método abstrato, cada instância da classe deve implementar sua lógica de consulta no SAP.
-
-        Args:
-            session (object): objeto de conexão com o SAP Script
-            arrParam (list): lista com os parâmetros para consulta (ordens, notas, materiais ...)
-        """
-
-        pass
-
-    def __consult_sap_data(self, sessionNumber: int, arrParam: list):
-        """     
-        Este método realiza a consulta de dados no SAP conforme os parâmetros informados, na tela SAP indicada
-        IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-        Args:
-            sessionNumber (int): número da sessão SAP (tela) para criação da conexão
-            arrParam (list): lista com os parâmetros para consulta (ordens, notas, materiais ...)          
-
-        Returns:
-            bool: True se executado com sucesso
-        """
-
-        while True:
-            try:
-                session = sap.get_session_by_number('ERP', sessionNumber)
-                if self.printSapLog:
-                    print(f'Querying data from {self.name} in {session.name} [{len(arrParam)}]')
-
-                start = time.time()
-                session.StartTransaction(self.sapTransaction)
-                sap.set_user_variant(session, self.sapVariant)
-                self._initialize_sap_transaction(session, arrParam)
-
-                if (sap.create_background_job(session, self.name)):
-                    infoText = f'{utils.CustomMessage.prGreen("Successfully")} created background job for {self.name} in {session.name} [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]'
-                else:
-                    raise Exception
-
-                return True
-
-            except Exception:
-                infoText = f'{utils.CustomMessage.prRed("Failed")} to query data from {self.name} in {session.name}'
-                logging.exception('Exception occurred')
-                continue
-
-            finally:
-                if self.printSapLog:
-                    print(infoText)
-
-    def import_file_data(self):
-        """      
-        Este método realiza a importação dos dados a partir de arquivos .txt resultantes da execução em background (spool). 
-        ATENÇÃO: arquivos .txt devem estar exportados no diretório [env.DIR_SPOOL_DATA] e no nome do arquivo deve conter (em qualquer posição) o valor da variável "name".   
-        IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-        Returns:
-            bool: True se executado com sucesso
-        """
-
-        while True:
-            try:
-                start = time.time()
-                print(f'Reading data from {self.name} exported files')
-
-                nowDatetime = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-                entries = utils.get_file_entries(env.DIR_SPOOL_DATA, 'txt', [self.name])
-                fileData = fileCrud.import_spool_file_data(entries, self.fields)
-
-                for data in fileData:
-                    data['REFERENCIA'] = self.referenceInfo.name
-                    data['DATA_HORA_CONSULTA'] = nowDatetime
-
-                self.data.extend(fileData)
-
-                infoText = f'{utils.CustomMessage.prGreen("Successfully")} data imported from {self.name} [{len(self.data)} rows] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]'
-                return True
-
-            except Exception:
-                infoText = f'{utils.CustomMessage.prRed("Failed")} to import data from {self.name} in exported file.'
-                logging.exception('Exception occurred')
-                continue
-
-            finally:
-                print(infoText)
-
-    def export_file_data(self):
-        """      
-        Este método realiza a exportação dos dados para um arquivo .json        
-        IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-        """
-
-        while True:
-            try:
-                start = time.time()
-                if not self.data:
-                    infoText = f'{utils.CustomMessage.prYellow("No data")} to export from {self.name}'
-                    return True
-
-                fileCrud.export_text_file_data(env.DIR_EXPORTED_DATA, self.name, self.data)
-                # fileCrud.export_json_file_data(env.DIR_EXPORTED_DATA, self.name, self.data)
-
-                infoText = f'{utils.CustomMessage.prGreen("Successfully")} exported data from {self.name} to file [{len(self.data)} rows] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]'
-                return True
-
-            except Exception:
-                infoText = (f'{utils.CustomMessage.prRed("Failed")} to export data from {self.name} to file [{len(self.data)} rows]')
-                logging.exception('Exception occurred')
-                continue
-
-            finally:
-                print(infoText)
-
-    def execute(self, arrParam: list, sessionNumber: int, maxConcurrentData: int):
-        """ 
-        Este método dá início a atualização completa dos dados, a partir de métodos específicos.
-        """
-
-        try:
-            delay = 0 if sessionNumber == 1 else sessionNumber
-            time.sleep(delay)  # Aguardar X segundos para minimizar concorrência no uso do clipboard
-            for arr in utils.split_array(arrParam, maxConcurrentData):
-                while not (self.__consult_sap_data(sessionNumber, arr)):
-                    continue
-
-            return True
-
-        except Exception:
-            logging.exception('Exception occurred')
-            return False
+import sap
+import fileCrud
+import logging
+import time
+import env
+import utils
+import datetime
+import retry
+import tracing
+from retry import RetryPolicy
+
+# ? Informações: módulo responsável pela gestão das Classes em uso no script (contém as regras de negócio principais)
+
+
+class ReferenceInfo:
+
+    """
+    Esta classe representa a parametrização de perído de execução da atualização
+
+    A classe ReferenceInfo faz o seguinte:
+        - Estrutura os dados necessários para executar os relatórios de acordo com as datas necessárias
+        - Não possui métodos/funções próprias
+    """
+
+    def __init__(self, name: str, month: int, year: int, dateIni: any, dateEnd: any):
+        self.name = name
+        self.month = month
+        self.year = year
+        self.dateIni = dateIni
+        self.dateEnd = dateEnd
+
+
+class TaskConfig:
+
+    """
+    Esta classe representa a parametrização de tarefas a serem executadas em multithreading ou multiprocessing
+
+    A classe TaskConfig faz o seguinte:
+        - Estrutura os dados necessários para executar um método/função em multithread/multiprocess
+        - Não possui métodos/funções próprias
+    """
+
+    def __init__(self, callback: any, args: list):
+        """
+        Este é o método construtor da classe TaskConfig.
+
+        Args:
+            callback (any): referência para o método/função do objeto reference que será executado (ponteiro)
+            args (list): array com os argumentos necessários para executar o método/função (se não houver argumentos, informar array vazio [])
+        """
+
+        self.callback = callback
+        self.args = args
+
+
+class JobReceipt:
+
+    """
+    Esta classe representa o comprovante de submissão de um job em background, retornado por cada sessão/processo ao processo principal
+
+    A classe JobReceipt faz o seguinte:
+        - Estrutura os dados necessários para identificar exatamente os jobs e ordens spool da execução atual [SMX/SP02]
+        - Não possui métodos/funções próprias
+    """
+
+    def __init__(self, sessionNumber: int, arrParam: list, jobTitle: str, submitTime: float, jobName: str | None = None, jobCount: str | None = None, statusText: str = '', dateWindow: tuple | None = None):
+        """
+        Este é o método construtor da classe JobReceipt.
+
+        Args:
+            sessionNumber (int): número da sessão SAP (tela) que submeteu o job
+            arrParam (list): parâmetros (chunk) consultados no job
+            jobTitle (str): título do job/ordem spool (campo PRTXT)
+            submitTime (float): momento da submissão (timestamp)
+            jobName (str | None): nome do job lido na barra de status do SAP Gui
+            jobCount (str | None): contador (identificador) do job lido na barra de status do SAP Gui
+            statusText (str): texto completo da barra de status após a submissão
+            dateWindow (tuple | None): período de seleção consultado no job (data inicial, data final). None = período completo da atualização
+        """
+
+        self.sessionNumber = sessionNumber
+        self.arrParam = arrParam
+        self.jobTitle = jobTitle
+        self.submitTime = submitTime
+        self.jobName = jobName
+        self.jobCount = jobCount
+        self.statusText = statusText
+        self.dateWindow = dateWindow
+
+
+class FilterConfig:
+
+    def __init__(self, columnName: str, type: str, args: list):
+
+        self.columnName = columnName
+        self.type = type
+        self.args = args
+
+    def isValid(self, value: str) -> bool:
+
+        filterFunctions = {
+            'equalsAny': lambda x: x in self.args,
+            'equalsAll': lambda x: all(arg == x for arg in self.args),
+            'containsAll': lambda x: all(arg in x for arg in self.args),
+            'containsAny': lambda x: any(arg in x for arg in self.args),
+        }
+
+        filterFunction = filterFunctions.get(self.type)
+        if filterFunction:
+            return filterFunction(value)
+        else:
+            print('Invalid filter type')
+            return False
+
+
+class FieldConfig:
+
+    """
+    Esta classe representa a parametrização de colunas que representam a estrutura dos dados de uma transação SAP, utilizados para importar/exportar corretamente os dados entre diversos contexto. Cada transação do SAP possui colunas específicas de acordo com o layout definido, os parâmetros dos nomes de coluna devem ser estruturados utilizando esta classe
+
+    A classe Field faz o seguinte:
+        - Estrutura os dados necessários para identificar as colunas de uma transação em diversos contextos
+        - Não possui métodos/funções próprias
+    """
+
+    def __init__(self, name: str, fileColumnNames: list, fieldType: str = 'string'):
+        """
+        Este é o método construtor da classe Field.
+
+        Args:
+            name (str): nome da campo            
+            fileColumnNames (list): array de nomes da coluna no contexto de arquivo .txt (exportado background)
+            fieldType (str): tipo lógico do campo, que define a leitura do dado original em tipo nativo uma única vez na importação (ver utils.FIELD_DECODERS) [Exemplo: 'integer', 'decimal', 'date', 'string']
+        """
+
+        if fieldType not in utils.FIELD_DECODERS:
+            raise ValueError(f'Invalid field type {fieldType} [{name}]')
+
+        self.name = name
+        self.fileColumnNames = fileColumnNames
+        self.fieldType = fieldType
+        self.decode = utils.FIELD_DECODERS[fieldType]
+
+
+class SapImportConfig:
+
+    """
+    Esta classe representa a parametrização da transação SAP. Cada transação possui parâmetros específicos que devem ser estruturados utilizando esta classe.
+    ATENÇÃO: transações SAP que resultam em tabelas que não sejam instâncias de GuiGridView (ver documentação SAP) não são aplicáveis
+
+    A classe SapImportConfig faz o seguinte:
+        - Estrutura os dados necessários para executar uma transação no SAP
+        - Não possui métodos/funções próprias
+    """
+
+    def __init__(self, sapTransaction: str, sapVariant: str, fields: list):
+        """
+        Este é o método construtor da classe SapImportConfig.
+
+        Args:
+            sapTransaction (str): código da transação do SAP
+            sapVariant (str): nome da variante de execução do SAP         
+            fields (list): array contendo a parametrização das colunas das tabelas de dados da transação 
+        """
+
+        self.sapTransaction = sapTransaction
+        self.sapVariant = sapVariant
+        self.fields = fields
+
+
+class UpdateData(SapImportConfig):
+
+    """
+    Esta classe representa a parametrização completa para atualização dos dados a partir de transações SAP. Cada parametrização de consulta devem ser estruturada utilizando esta classe.
+
+    A classe UpdateData faz o seguinte:
+        - Estrutura os dados necessários para atualizar dados via transação SAP
+    """
+
+    def __init__(self, name: str, sapConfig: SapImportConfig, referenceInfo: ReferenceInfo, retryPolicy: RetryPolicy = None):
+        """
+        Este é o método construtor da classe UpdateData.
+
+        Args:
+            name (str): nome que descreve a atualização de dados [Exemplo: IW67_MEDL]
+            sapConfig (SapImportConfig): objeto que contém os parâmetros da transação SAP            
+            referenceInfo (ReferenceInfo): objeto que representa os dados do período para execução
+            retryPolicy (RetryPolicy): política de novas tentativas (se não informada, utiliza retry.DEFAULT_POLICY)
+        """
+
+        super().__init__(sapConfig.sapTransaction, sapConfig.sapVariant, sapConfig.fields)
+        self.name = name
+        self.referenceInfo = referenceInfo
+        self.data = []
+        self.printSapLog = False
+        self.warmSelectionScreen = True
+        self.__warmSessions = {}
+        self.retryPolicy = retryPolicy or retry.DEFAULT_POLICY
+        self.traceContext = None
+        self.exportFileName = name
+        self.exportKeyFields = None
+        self.exportRemovesKeys = False
+        self.dateWindow = None
+        self.maxDateShards = 1
+        self.runManifest = None
+        self.submittedJobTitles = set()
+
+    def _initialize_sap_transaction(self):
+        # ! must be overridden by inherited class
+        """
+        Este método inicia a transação no SAP e parametriza os campos para realizar a consulta. É um método abstrato, cada instância da classe deve implementar sua lógica de consulta no SAP.
+
+        Args:
+            session (object): objeto de conexão com o SAP Script
+            arrParam (list): lista com os parâmetros para consulta (ordens, notas, materiais ...)
+        """
+
+        pass
+
+    def _set_sap_selection_values(self, session: object, arrParam: list):
+        """
+        Este método substitui somente os valores de seleção múltipla (parâmetros da consulta) na tela de seleção já parametrizada, sem reiniciar a transação (modo "tela de seleção aquecida"). Por default realiza a parametrização completa, cada instância da classe pode implementar a substituição parcial.
+
+        Args:
+            session (object): objeto de conexão com o SAP Script
+            arrParam (list): lista com os parâmetros para consulta (ordens, notas, materiais ...)
+        """
+
+        self._initialize_sap_transaction(session, arrParam)
+
+    def _get_full_date_window(self):
+        # ! may be overridden by inherited class
+        """
+        Este método retorna o período de seleção completo da atualização (campo de data da tela de seleção, ex.: ERDAT/ERLDAT), utilizado para dividir a consulta por período. Por default a atualização não possui período de seleção
+
+        Returns:
+            tuple: data inicial e data final (datetime.date) ou None se a atualização não possuir período de seleção
+        """
+
+        return None
+
+    def _get_date_window(self):
+        """
+        Este método retorna o período de seleção da consulta atual: o período do job (dateWindow) ou, se não informado, o período completo da atualização. Deve ser utilizado em _initialize_sap_transaction para preencher os campos de data
+
+        Returns:
+            tuple: data inicial e data final (datetime.date) ou None se a atualização não possuir período de seleção
+        """
+
+        return self.dateWindow or self._get_full_date_window()
+
+    def get_date_slices(self, count: int):
+        """
+        Este método divide o período de seleção completo da atualização (ver _get_full_date_window) em partes de mesma duração, para distribuir a consulta de cada parâmetro em vários jobs (parâmetro x período)
+        ATENÇÃO: períodos abertos (ex.: 31.12.9999) são divididos até a data atual, a última parte mantém a data final original
+
+        Args:
+            count (int): quantidade de partes (limitada à quantidade de dias do período)
+
+        Returns:
+            list: períodos de seleção (data inicial, data final) [Exemplo: [(date(2023, 9, 1), date(2023, 9, 15)), (date(2023, 9, 16), date(2023, 9, 30))]] ou [None] se não for possível dividir
+        """
+
+        window = self._get_full_date_window()
+        if window is None or count <= 1:
+            return [None]
+
+        startDate, endDate = window
+        days = (min(endDate, datetime.date.today()) - startDate).days + 1
+        count = min(count, days)
+        if count <= 1:
+            return [None]
+
+        bounds = [startDate + datetime.timedelta(days=days * index // count) for index in range(count + 1)]
+        dateSlices = [(bounds[index], bounds[index + 1] - datetime.timedelta(days=1)) for index in range(count)]
+        dateSlices[-1] = (dateSlices[-1][0], endDate)
+        return dateSlices
+
+    def split_query_slice(self, arrParam: list, dateWindow: tuple | None):
+        """
+        Este método divide a consulta de um job em duas partes: pela metade da lista de parâmetros ou, com um único parâmetro, pela metade do período de seleção (ver _get_full_date_window). Utilizado para reenviar a consulta de ordens spool que excederam o limite de linhas (sap.SPOOL_MAX_LINES)
+
+        Args:
+            arrParam (list): parâmetros consultados no job
+            dateWindow (tuple | None): período de seleção consultado no job (None = período completo da atualização)
+
+        Returns:
+            list: partes da consulta [Exemplo: [(['0380'], (date(2021, 1, 1), date(2022, 6, 30))), (['0380'], (date(2022, 7, 1), date(2023, 12, 31)))]] (vazia se não for possível dividir)
+        """
+
+        if len(arrParam) > 1:
+            middle = len(arrParam) // 2
+            return [(list(arrParam[:middle]), dateWindow), (list(arrParam[middle:]), dateWindow)]
+
+        window = dateWindow or self._get_full_date_window()
+        if window is None:
+            return []
+
+        startDate, endDate = window
+        lastDate = min(endDate, datetime.date.today())  # períodos abertos (ex.: 31.12.9999) são divididos até a data atual
+        if lastDate <= startDate:
+            return []
+
+        middleDate = startDate + (lastDate - startDate) / 2
+        return [(list(arrParam), (startDate, middleDate)), (list(arrParam), (middleDate + datetime.timedelta(days=1), endDate))]
+
+    def __consult_sap_data(self, sessionNumber: int, arrParam: list, jobTitle: str, dateWindow: tuple | None = None):
+        """     
+        Este método realiza a consulta de dados no SAP conforme os parâmetros informados, na tela SAP indicada, e lê na barra de status o job criado em background
+        ATENÇÃO: com warmSelectionScreen ativo, a transação e a variante são carregadas somente na primeira consulta da sessão (ou quando o período de seleção muda); nas seguintes somente os valores de seleção múltipla são substituídos (_set_sap_selection_values)
+        IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (self.retryPolicy)
+
+        Args:
+            sessionNumber (int): número da sessão SAP (tela) para criação da conexão
+            arrParam (list): lista com os parâmetros para consulta (ordens, notas, materiais ...)          
+            jobTitle (str): título do job/ordem spool (deve conter o valor da variável "name")
+            dateWindow (tuple | None): período de seleção do job (None = período completo da atualização)
+
+        Returns:
+            JobReceipt: comprovante de submissão do job
+        """
+
+        for attempt in self.retryPolicy.attempts(f'{self.name}.consult_sap_data'):
+            try:
+                session = sap.get_session_by_number('ERP', sessionNumber, self.retryPolicy)
+                if self.printSapLog:
+                    print(f'Querying data from {self.name} in {session.name} [{len(arrParam)}]')
+
+                start = time.time()
+                self.dateWindow = dateWindow
+                if self.warmSelectionScreen and self.__warmSessions.get(sessionNumber, False) == dateWindow and session.Info.Transaction == self.sapTransaction:
+                    self._set_sap_selection_values(session, arrParam)
+                else:
+                    session.StartTransaction(self.sapTransaction)
+                    sap.reset_print_template(session)
+                    sap.set_user_variant(session, self.sapVariant)
+                    self._initialize_sap_transaction(session, arrParam)
+                    self.__warmSessions[sessionNumber] = dateWindow
+
+                if (sap.create_background_job(session, jobTitle)):
+                    infoText = f'{utils.CustomMessage.prGreen("Successfully")} created background job for {jobTitle} in {session.name} [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]'
+                else:
+                    raise Exception
+
+                jobInfo = sap.get_status_bar_job_info(session)
+                attempt.succeeded()
+                return JobReceipt(sessionNumber, list(map(str, arrParam)), jobTitle.upper(), time.time(), jobInfo['jobName'], jobInfo['jobCount'], jobInfo['statusText'], dateWindow)
+
+            except retry.RetryError:
+                self.__warmSessions.pop(sessionNumber, None)
+                infoText = f'{utils.CustomMessage.prRed("Failed")} to query data from {self.name} in session {sessionNumber}'
+                raise
+
+            except Exception:
+                self.__warmSessions.pop(sessionNumber, None)
+                infoText = f'{utils.CustomMessage.prRed("Failed")} to query data from {self.name} in {session.name}'
+                logging.exception('Exception occurred')
+                continue
+
+            finally:
+                if self.printSapLog:
+                    print(infoText)
+
+    def import_file_data(self, archivePath: str | None = None):
+        """      
+        Este método realiza a importação dos dados a partir de arquivos .txt resultantes da execução em background (spool). 
+        ATENÇÃO: arquivos .txt devem estar exportados no diretório [env.DIR_SPOOL_DATA] e no nome do arquivo deve conter (em qualquer posição) o valor da variável "name".   
+        IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (self.retryPolicy)
+
+        Args:
+            archivePath (str | None): arquivo compactado de uma execução anterior (ver spoolArchive), lido sem extração. None = arquivos exportados em env.DIR_SPOOL_DATA
+
+        Returns:
+            bool: True se executado com sucesso
+        """
+
+        with tracing.span('import', update=self.name) as span:
+            for attempt in self.retryPolicy.attempts(f'{self.name}.import_file_data'):
+                try:
+                    start = time.time()
+                    print(f'Reading data from {self.name} exported files')
+
+                    nowDatetime = datetime.datetime.now().replace(microsecond=0)
+                    if archivePath is None:
+                        entries = utils.get_file_entries(env.DIR_SPOOL_DATA, 'txt', [self.name])
+                        fileData = fileCrud.import_spool_file_data(entries, self.fields)
+                    else:
+                        entries = [archivePath]
+                        fileData = fileCrud.import_spool_archive_data(archivePath, self.fields, [self.name])
+
+                    with tracing.span('stamp', update=self.name):
+                        for data in fileData:
+                            data['REFERENCIA'] = self.referenceInfo.name
+                            data['DATA_HORA_CONSULTA'] = nowDatetime
+
+                    self.data.extend(fileData)
+                    span.set('files', len(entries))
+                    span.set('rows', len(fileData))
+
+                    infoText = f'{utils.CustomMessage.prGreen("Successfully")} data imported from {self.name} [{len(self.data)} rows] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]'
+                    attempt.succeeded()
+                    return True
+
+                except Exception:
+                    infoText = f'{utils.CustomMessage.prRed("Failed")} to import data from {self.name} in exported file.'
+                    logging.exception('Exception occurred')
+                    continue
+
+                finally:
+                    print(infoText)
+
+    def export_file_data(self):
+        """      
+        Este método realiza a exportação dos dados para um arquivo .txt (exportFileName)
+        ATENÇÃO: com exportKeyFields informado os dados são mesclados por chave no arquivo já exportado (atualização incremental), ou removidos do arquivo com exportRemovesKeys (ver fileCrud.upsert_text_file_data)
+        IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (self.retryPolicy)
+        """
+
+        with tracing.span('write', update=self.name) as span:
+            for attempt in self.retryPolicy.attempts(f'{self.name}.export_file_data'):
+                try:
+                    start = time.time()
+                    if not self.data:
+                        infoText = f'{utils.CustomMessage.prYellow("No data")} to export from {self.name}'
+                        attempt.succeeded()
+                        return True
+
+                    if self.exportKeyFields is None:
+                        fileCrud.export_text_file_data(env.DIR_EXPORTED_DATA, self.exportFileName, self.data)
+                    elif not fileCrud.upsert_text_file_data(env.DIR_EXPORTED_DATA, self.exportFileName, self.data, self.exportKeyFields, self.exportRemovesKeys):
+                        raise Exception(f'Failed to merge data into {self.exportFileName}')
+                    # fileCrud.export_json_file_data(env.DIR_EXPORTED_DATA, self.name, self.data)
+                    span.set('rows', len(self.data))
+
+                    infoText = f'{utils.CustomMessage.prGreen("Successfully")} exported data from {self.name} to file [{len(self.data)} rows] [{time.strftime("%H:%M:%S", time.gmtime(time.time()-start))}]'
+                    attempt.succeeded()
+                    return True
+
+                except Exception:
+                    infoText = (f'{utils.CustomMessage.prRed("Failed")} to export data from {self.name} to file [{len(self.data)} rows]')
+                    logging.exception('Exception occurred')
+                    continue
+
+                finally:
+                    print(infoText)
+
+    def execute(self, arrParam: list, sessionNumber: int, maxConcurrentData: int, querySlices: list | None = None):
+        """ 
+        Este método dá início a atualização completa dos dados, a partir de métodos específicos. Cada parte (chunk) dos parâmetros é submetida como um job em background com título único [Exemplo: IW67_MEDL_S1_001]
+        ATENÇÃO: com querySlices informado, cada parte da consulta (parâmetros e período de seleção) é submetida como um job, sem divisão dos parâmetros (ver get_date_slices)
+        ATENÇÃO: jobs com título em submittedJobTitles (já submetidos em execução interrompida) não são submetidos novamente; cada job submetido é registrado no manifesto de execução (runManifest)
+        IMPORTANTE: lança exceção se uma parte não puder ser submetida (ex.: limite da política de novas tentativas); os jobs já submetidos permanecem registrados no manifesto para retomada
+
+        Args:
+            arrParam (list): lista com os parâmetros da sessão
+            sessionNumber (int): número da sessão SAP (tela)
+            maxConcurrentData (int): quantidade de parâmetros por job
+            querySlices (list | None): partes da consulta (parâmetros e período de seleção). None = partes de maxConcurrentData parâmetros no período completo
+
+        Returns:
+            list: comprovantes (JobReceipt) dos jobs submetidos
+        """
+
+        receipts = []
+        try:
+            delay = 0 if sessionNumber == 1 else sessionNumber
+            time.sleep(delay)  # Aguardar X segundos para minimizar concorrência no uso do clipboard
+            with tracing.span('submit_session', self.traceContext, session=sessionNumber, params=len(arrParam)) as span:
+                if querySlices is None:
+                    querySlices = [(arr, None) for arr in utils.split_array(arrParam, maxConcurrentData)]
+                for index, (arr, dateWindow) in enumerate(querySlices):
+                    jobTitle = f'{self.name}_S{sessionNumber}_{index + 1:03d}'
+                    if jobTitle.upper() in self.submittedJobTitles:
+                        continue
+                    receipt = self.__consult_sap_data(sessionNumber, arr, jobTitle, dateWindow)
+                    receipts.append(receipt)
+                    if self.runManifest is not None:
+                        self.runManifest.record_receipt(receipt)
+                span.set('jobs', len(receipts))
+
+            printTimings = sap.get_print_step_timings()
+            logging.info(f'Print parameter step timings [{self.name} - ses {sessionNumber}]: {printTimings}')
+            if self.printSapLog:
+                print(f'Print parameter step timings [{self.name} - ses {sessionNumber}]: {printTimings}')
+
+            return receipts
+
+        except Exception:
+            # falha na submissão (ex.: circuito aberto): os jobs pendentes da sessão não foram submetidos, a atualização não pode prosseguir com resultado parcial
+            raise Exception(f'Failed to submit jobs from {self.name} in session {sessionNumber} [{len(receipts)} submitted]')
+
+    def submit_query_slices(self, querySlices: list, sessionNumber: int, titlePrefix: str):
+        """
+        Este método submete na sessão informada um job em background para cada parte da consulta (parâmetros e período de seleção), com título único [Exemplo: IW67_MEDL_S1_001_001]. Utilizado no reenvio das consultas divididas (ver split_query_slice)
+        ATENÇÃO: assim como em execute, jobs com título em submittedJobTitles não são submetidos novamente e cada job submetido é registrado no manifesto de execução (runManifest)
+
+        Args:
+            querySlices (list): partes da consulta (parâmetros e período de seleção)
+            sessionNumber (int): número da sessão SAP (tela)
+            titlePrefix (str): prefixo do título dos jobs (deve conter o valor da variável "name")
+
+        Returns:
+            list: comprovantes (JobReceipt) dos jobs submetidos
+        """
+
+        receipts = []
+        for index, (arrParam, dateWindow) in enumerate(querySlices):
+            jobTitle = f'{titlePrefix}_{index + 1:03d}'
+            if jobTitle.upper() in self.submittedJobTitles:
+                continue
+            receipt = self.__consult_sap_data(sessionNumber, arrParam, jobTitle, dateWindow)
+            if receipt is not None:
+                receipts.append(receipt)
+                if self.runManifest is not None:
+                    self.runManifest.record_receipt(receipt)
+
+        return receipts
@@ -1,58 +1,267 @@
-import multiprocessing
-import threading
-import utils
-import logging
-
-# ? Informações: módulo principal responsável por executar tarefas simultâneas ou paralelas
-
-
-def run_multiprocess(arrTaskConfig: list):
-    """  
-    Este método realiza a criação e start de processos para execução simultânea de tarefas (multiprocessing)
-    ATENÇÃO: ações em multiprocessing permitem execução em várias telas do SAP simultaneamente, contudo é necessário que cada método receba um objeto Session diferente (ou um indicador de qual Session conectar - sessionNumber)
-
-    Args:
-        arrTaskConfig (list): lista de objetos ThreadConfig com métodos e argumentos para execução
-    """
-
-    try:
-        multiprocessing.freeze_support()
-
-        arrProcess = []
-        for tc in arrTaskConfig:
-            p = multiprocessing.Process(target=tc.callback, args=tc.args)
-            p.start()
-            arrProcess.append(p)
-            print(f'{utils.CustomMessage.prGreen("Successfully")} created process [PID {p.pid}]')
-
-        for p in arrProcess:
-            p.join()
-
-    except Exception:
-        logging.exception('Exception occurred')
-        raise Exception('Exception occurred')
-
-
-def run_multithread(arrTaskConfig: list):
-    """  
-    Este método realiza a criação e start de threads para execução paralela de tarefas (multithreading)
-    ATENÇÃO: ações em multitreading permitem execução em várias telas do SAP paralelamente, contudo é necessário que cada método receba um objeto Session diferente (ou um indicador de qual Session conectar - sessionNumber)
-
-    Args:
-        arrTaskConfig (list): lista de objetos ThreadConfig com métodos e argumentos para execução
-    """
-
-    try:
-        arrThreads = []
-        for tc in arrTaskConfig:
-            t = threading.Thread(target=tc.callback, args=tc.args)
-            t.start()
-            arrThreads.append(t)
-            print(f'{utils.CustomMessage.prGreen("Successfully")} created thread [TID {t.native_id}]')
-
-        for t in arrThreads:
-            t.join()
-
-    except Exception:
-        logging.exception('Exception occurred')
-        raise Exception('Exception occurred')
+import multiprocessing
+import threading
+import queue
+import utils
+import logging
+import logQueue
+import comProxy
+
+# ? Informações: módulo principal responsável por executar tarefas simultâneas ou paralelas
+
+# Processos de trabalho persistentes (modo serviço, ver start_worker_pool): a tarefa de cada posição é executada sempre no mesmo processo, reutilizado entre execuções
+WORKER_POOL = None
+
+
+def __run_task(callback: any, args: list, index: int, resultQueue: object, logRecordQueue: object):
+    """  
+    Este método executa uma tarefa em um processo filho e envia o retorno ao processo principal pela fila de resultados (sempre envia, mesmo em caso de falha), junto das chamadas COM contabilizadas na tarefa (ver comProxy.merge_com_call_stats). O log do processo filho é direcionado para a fila de registros do processo principal
+
+    Args:
+        callback (any): método/função a ser executado
+        args (list): argumentos do método/função
+        index (int): posição da tarefa na lista de tarefas
+        resultQueue (object): fila de resultados compartilhada com o processo principal (multiprocessing.Queue). None = retorno descartado
+        logRecordQueue (object): fila de registros de log do processo principal (ver logQueue.start_logging). None = log não configurado
+    """
+
+    if logRecordQueue is not None:
+        logQueue.configure_process_logging(logRecordQueue)
+
+    # processos de trabalho persistentes executam várias tarefas: somente as chamadas COM da tarefa atual são enviadas
+    comProxy.reset_com_call_stats()
+    result = None
+    try:
+        result = callback(*args)
+
+    except Exception:
+        logging.exception('Exception occurred')
+
+    finally:
+        if resultQueue is not None:
+            resultQueue.put((index, result, comProxy.get_com_call_stats()))
+
+
+def _run_worker(taskQueue: object, resultQueue: object, logRecordQueue: object, initializer: any):
+    """  
+    Este método executa as tarefas recebidas por um processo de trabalho persistente até o recebimento de None (encerramento)
+
+    Args:
+        taskQueue (object): fila de tarefas do processo (multiprocessing.Queue) com tuplas (callback, args, index)
+        resultQueue (object): fila de resultados compartilhada com o processo principal
+        logRecordQueue (object): fila de registros de log do processo principal
+        initializer (any): função executada uma única vez no início do processo (None = sem inicialização)
+    """
+
+    if logRecordQueue is not None:
+        logQueue.configure_process_logging(logRecordQueue)
+    if initializer is not None:
+        initializer()
+
+    while True:
+        task = taskQueue.get()
+        if task is None:
+            break
+        callback, args, index = task
+        __run_task(callback, args, index, resultQueue, None)
+
+
+class WorkerPool:
+
+    """
+    Esta classe representa os processos de trabalho persistentes do modo serviço. Cada processo mantém o estado do módulo entre execuções (sessão SAP conectada, caches de campos e parâmetros de impressão), eliminando a criação de processos e a nova conexão às sessões a cada ciclo
+
+    A classe WorkerPool faz o seguinte:
+        - Cria um processo por posição de tarefa (sessão SAP) e o recria se encerrado
+        - Executa as tarefas de uma execução e aguarda os resultados
+    """
+
+    def __init__(self, workerCount: int, initializer: any = None):
+        """
+        Este é o método construtor da classe WorkerPool.
+
+        Args:
+            workerCount (int): quantidade de processos (máximo de tarefas por execução)
+            initializer (any): função executada uma única vez no início de cada processo [Exemplo: sap.enable_session_cache]
+        """
+
+        self.workerCount = workerCount
+        self.initializer = initializer
+        self.resultQueue = multiprocessing.Queue()
+        self.taskQueues = [None] * workerCount
+        self.processes = [None] * workerCount
+
+    def __ensure_worker(self, index: int):
+
+        if self.processes[index] is not None and self.processes[index].is_alive():
+            return
+
+        self.taskQueues[index] = multiprocessing.Queue()
+        p = multiprocessing.Process(target=_run_worker, args=(self.taskQueues[index], self.resultQueue, logQueue.LOG_QUEUE, self.initializer), daemon=True)
+        p.start()
+        self.processes[index] = p
+        print(f'{utils.CustomMessage.prGreen("Successfully")} created worker process [PID {p.pid}]')
+
+    def run(self, arrTaskConfig: list):
+        """  
+        Este método executa as tarefas nos processos de trabalho (tarefa N no processo N) e aguarda os resultados
+
+        Args:
+            arrTaskConfig (list): lista de objetos TaskConfig com métodos e argumentos para execução
+
+        Returns:
+            list: retorno de cada tarefa, na ordem de arrTaskConfig (None se a tarefa não retornou)
+        """
+
+        for index, tc in enumerate(arrTaskConfig):
+            self.__ensure_worker(index)
+            self.taskQueues[index].put((tc.callback, tc.args, index))
+
+        results = [None] * len(arrTaskConfig)
+        pending = set(range(len(arrTaskConfig)))
+        while pending:
+            try:
+                index, result, comCallStats = self.resultQueue.get(timeout=1)
+                comProxy.merge_com_call_stats(comCallStats)
+                results[index] = result
+                pending.discard(index)
+            except queue.Empty:
+                for index in list(pending):
+                    if not self.processes[index].is_alive():
+                        logging.error(f'Worker process {index + 1} exited before returning its task result')
+                        pending.discard(index)
+
+        return results
+
+    def close(self):
+        """  
+        Este método encerra os processos de trabalho, após a conclusão das tarefas em execução
+        """
+
+        for index, p in enumerate(self.processes):
+            if p is not None and p.is_alive():
+                self.taskQueues[index].put(None)
+        for p in self.processes:
+            if p is not None:
+                p.join(timeout=30)
+
+
+def start_worker_pool(workerCount: int, initializer: any = None):
+    """  
+    Este método inicia os processos de trabalho persistentes (modo serviço). Enquanto ativos, run_multiprocess executa as tarefas nesses processos, sem criar novos
+    ATENÇÃO: chamar stop_worker_pool ao final da execução do serviço
+
+    Args:
+        workerCount (int): quantidade de processos (máximo de tarefas por execução)
+        initializer (any): função executada uma única vez no início de cada processo
+
+    Returns:
+        WorkerPool: processos de trabalho
+    """
+
+    global WORKER_POOL
+
+    if WORKER_POOL is None:
+        multiprocessing.freeze_support()
+        WORKER_POOL = WorkerPool(workerCount, initializer)
+    return WORKER_POOL
+
+
+def stop_worker_pool():
+    """  
+    Este método encerra os processos de trabalho persistentes (ver start_worker_pool)
+    """
+
+    global WORKER_POOL
+
+    if WORKER_POOL is not None:
+        WORKER_POOL.close()
+        WORKER_POOL = None
+
+
+def run_multiprocess(arrTaskConfig: list, collectResults: bool = False):
+    """  
+    Este método realiza a criação e start de processos para execução simultânea de tarefas (multiprocessing)
+    ATENÇÃO: ações em multiprocessing permitem execução em várias telas do SAP simultaneamente, contudo é necessário que cada método receba um objeto Session diferente (ou um indicador de qual Session conectar - sessionNumber)
+    ATENÇÃO: com os processos de trabalho persistentes ativos (ver start_worker_pool) as tarefas são executadas nesses processos (resultados sempre coletados)
+
+    Args:
+        arrTaskConfig (list): lista de objetos ThreadConfig com métodos e argumentos para execução
+        collectResults (bool): se True, o retorno de cada tarefa é enviado ao processo principal por uma fila de resultados
+
+    Returns:
+        list: retorno de cada tarefa, na ordem de arrTaskConfig (None se collectResults = False ou se a tarefa não retornou)
+    """
+
+    try:
+        if WORKER_POOL is not None and len(arrTaskConfig) <= WORKER_POOL.workerCount:
+            return WORKER_POOL.run(arrTaskConfig)
+
+        multiprocessing.freeze_support()
+        resultQueue = multiprocessing.Queue() if collectResults else None
+
+        arrProcess = []
+        for index, tc in enumerate(arrTaskConfig):
+            p = multiprocessing.Process(target=__run_task, args=(tc.callback, tc.args, index, resultQueue, logQueue.LOG_QUEUE))
+            p.start()
+            arrProcess.append(p)
+            print(f'{utils.CustomMessage.prGreen("Successfully")} created process [PID {p.pid}]')
+
+        results = [None] * len(arrTaskConfig)
+        received = 0
+        while resultQueue is not None and received < len(arrProcess):
+            # a fila deve ser consumida antes do join (processos filhos aguardam o envio dos dados da fila)
+            try:
+                index, result, comCallStats = resultQueue.get(timeout=1)
+                comProxy.merge_com_call_stats(comCallStats)
+                results[index] = result
+                received += 1
+            except queue.Empty:
+                if not any(p.is_alive() for p in arrProcess) and resultQueue.empty():
+                    break
+
+        for p in arrProcess:
+            p.join()
+
+        return results
+
+    except Exception:
+        logging.exception('Exception occurred')
+        raise Exception('Exception occurred')
+
+
+def run_multithread(arrTaskConfig: list):
+    """  
+    Este método realiza a criação e start de threads para execução paralela de tarefas (multithreading)
+    ATENÇÃO: ações em multitreading permitem execução em várias telas do SAP paralelamente, contudo é necessário que cada método receba um objeto Session diferente (ou um indicador de qual Session conectar - sessionNumber)
+
+    Args:
+        arrTaskConfig (list): lista de objetos ThreadConfig com métodos e argumentos para execução
+
+    Returns:
+        list: retorno de cada tarefa, na ordem de arrTaskConfig (None se a tarefa falhou)
+    """
+
+    try:
+        results = [None] * len(arrTaskConfig)
+
+        def runTask(index: int, tc: object):
+            try:
+                results[index] = tc.callback(*tc.args)
+            except Exception:
+                logging.exception('Exception occurred')
+
+        arrThreads = []
+        for index, tc in enumerate(arrTaskConfig):
+            t = threading.Thread(target=runTask, args=[index, tc])
+            t.start()
+            arrThreads.append(t)
+            print(f'{utils.CustomMessage.prGreen("Successfully")} created thread [TID {t.native_id}]')
+
+        for t in arrThreads:
+            t.join()
+
+        return results
+
+    except Exception:
+        logging.exception('Exception occurred')
+        raise Exception('Exception occurred')
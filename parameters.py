@@ -1,68 +1,146 @@
-from model import SapImportConfig, FieldConfig, UpdateData, ReferenceInfo
-import utils
-
-# ? ==========================================================================================
-
-IW67Config = SapImportConfig(
-    'IW67',
-    '/SAP_DATA_BRIDGE',
-    [
-        FieldConfig('NOTA', ['Nota'], utils.format_integer),
-        FieldConfig('MEDIDA', ['CóMd'], utils.format_integer),
-        FieldConfig('STATUS', ['StatSist'], utils.format_string),
-        FieldConfig('RESPONSAVEL', ['Exec.por'], utils.format_string),
-        FieldConfig('TEXTO', ['Texto das medidas', 'TextoMedid', 'Texto medidas'], utils.format_string),
-        FieldConfig('LOCALIZACAO', ['Localiz.'], utils.format_integer),
-        FieldConfig('USUARIO_CRIACAO', ['Criado/a'], utils.format_string),
-        FieldConfig('DATA_CRIACAO', ['Dt.criação'], utils.format_date),
-        FieldConfig('USUARIO_CONCLUSAO', ['por', 'Concl.por'], utils.format_string),
-        FieldConfig('DATA_CONCLUSAO', ['Concluído'], utils.format_date),
-        FieldConfig('DATA_PLANEJAMENTO_INICIO', ['Iníc.planj'], utils.format_date),
-        FieldConfig('DATA_PLANEJAMENTO_FIM', ['Fim plan.'], utils.format_date),
-        FieldConfig('INDICE', ['Medi'], utils.format_integer),
-        FieldConfig('EQUIPAMENTO', ['LocInstal.'], utils.format_string)
-    ]
-)
-
-
-# ? ==========================================================================================
-
-class IW67ByMeasurementMEDE(UpdateData):
-
-    def __init__(self, referenceInfo: ReferenceInfo):
-        super().__init__(f'IW67_MEDE_{referenceInfo.name}', IW67Config, referenceInfo)
-
-    def _initialize_sap_transaction(self, session: object, arrParam: list):
-
-        while True:
-            session.findById("wnd[0]/usr/chkDY_QMSM").selected = False
-            session.findById("wnd[0]/usr/btn%_MNCOD_%_APP_%-VALU_PUSH").press()
-            session.findById("wnd[1]/tbar[0]/btn[16]").press()
-            utils.copy_to_clipboard(arrParam)
-            session.findById("wnd[1]/tbar[0]/btn[24]").press()
-            session.findById("wnd[1]/tbar[0]/btn[8]").press()
-            session.findById("wnd[0]/usr/ctxtERLDAT-LOW").text = self.referenceInfo.dateIni.strftime("%d.%m.%Y")
-            session.findById("wnd[0]/usr/ctxtERLDAT-HIGH").text = self.referenceInfo.dateEnd.strftime("%d.%m.%Y")
-            if session.findById("wnd[0]/usr/ctxtMNCOD-LOW").text == str(arrParam[0]):
-                break
-
-
-class IW67ByMeasurementMEDL(UpdateData):
-
-    def __init__(self, referenceInfo: ReferenceInfo):
-        super().__init__('IW67_MEDL', IW67Config, referenceInfo)
-
-    def _initialize_sap_transaction(self, session: object, arrParam: list):
-
-        while True:
-            session.findById("wnd[0]/usr/chkDY_QMSM").selected = True
-            session.findById("wnd[0]/usr/btn%_MNCOD_%_APP_%-VALU_PUSH").press()
-            session.findById("wnd[1]/tbar[0]/btn[16]").press()
-            utils.copy_to_clipboard(arrParam)
-            session.findById("wnd[1]/tbar[0]/btn[24]").press()
-            session.findById("wnd[1]/tbar[0]/btn[8]").press()
-            session.findById("wnd[0]/usr/ctxtERDAT-LOW").text = '01.01.2021'
-            session.findById("wnd[0]/usr/ctxtERDAT-HIGH").text = '31.12.9999'
-            if session.findById("wnd[0]/usr/ctxtMNCOD-LOW").text == str(arrParam[0]):
-                break
-
+import datetime
+from model import SapImportConfig, FieldConfig, UpdateData, ReferenceInfo
+from retry import RetryPolicy
+import utils
+
+# ? ==========================================================================================
+
+IW67Config = SapImportConfig(
+    'IW67',
+    '/SAP_DATA_BRIDGE',
+    [
+        FieldConfig('NOTA', ['Nota'], 'integer'),
+        FieldConfig('MEDIDA', ['CóMd'], 'integer'),
+        FieldConfig('STATUS', ['StatSist'], 'string'),
+        FieldConfig('RESPONSAVEL', ['Exec.por'], 'string'),
+        FieldConfig('TEXTO', ['Texto das medidas', 'TextoMedid', 'Texto medidas'], 'string'),
+        FieldConfig('LOCALIZACAO', ['Localiz.'], 'integer'),
+        FieldConfig('USUARIO_CRIACAO', ['Criado/a'], 'string'),
+        FieldConfig('DATA_CRIACAO', ['Dt.criação'], 'date'),
+        FieldConfig('USUARIO_CONCLUSAO', ['por', 'Concl.por'], 'string'),
+        FieldConfig('DATA_CONCLUSAO', ['Concluído'], 'date'),
+        FieldConfig('DATA_PLANEJAMENTO_INICIO', ['Iníc.planj'], 'date'),
+        FieldConfig('DATA_PLANEJAMENTO_FIM', ['Fim plan.'], 'date'),
+        FieldConfig('INDICE', ['Medi'], 'integer'),
+        FieldConfig('EQUIPAMENTO', ['LocInstal.'], 'string')
+    ]
+)
+
+
+# Colunas que identificam uma medida (nota e número sequencial da medida na nota), utilizadas na mesclagem incremental
+IW67_KEY_FIELDS = ['NOTA', 'INDICE']
+
+# Data inicial de criação das medidas pendentes consultadas na atualização completa do IW67 MEDL
+MEDL_FULL_START_DATE = datetime.date(2021, 1, 1)
+
+# Quantidade máxima de partes do período de seleção por código de medida (consulta distribuída em jobs código x período, ver UpdateData.get_date_slices)
+MEDE_MAX_DATE_SHARDS = 4
+MEDL_MAX_DATE_SHARDS = 12
+
+# Data final dos períodos de seleção abertos
+OPEN_END_DATE = datetime.date(9999, 12, 31)
+
+# Dias reconsultados antes da marca d'água (watermark) na atualização incremental do IW67 MEDL (cobre registros gravados no SAP com atraso)
+MEDL_INCREMENTAL_OVERLAP_DAYS = 7
+
+
+# ? ==========================================================================================
+
+class IW67ByMeasurement(UpdateData):
+
+    def _set_sap_selection_values(self, session: object, arrParam: list):
+
+        for attempt in self.retryPolicy.attempts(f'{self.name}.set_sap_selection_values'):
+            session.findById("wnd[0]/usr/btn%_MNCOD_%_APP_%-VALU_PUSH").press()
+            session.findById("wnd[1]/tbar[0]/btn[16]").press()
+            utils.copy_to_clipboard(arrParam)
+            session.findById("wnd[1]/tbar[0]/btn[24]").press()
+            session.findById("wnd[1]/tbar[0]/btn[8]").press()
+            if session.findById("wnd[0]/usr/ctxtMNCOD-LOW").text == str(arrParam[0]):
+                attempt.succeeded()
+                break
+
+
+class IW67ByMeasurementMEDE(IW67ByMeasurement):
+
+    def __init__(self, referenceInfo: ReferenceInfo, retryPolicy: RetryPolicy = None):
+        super().__init__(f'IW67_MEDE_{referenceInfo.name}', IW67Config, referenceInfo, retryPolicy)
+        self.maxDateShards = MEDE_MAX_DATE_SHARDS
+
+    def _get_full_date_window(self):
+
+        return (self.referenceInfo.dateIni, self.referenceInfo.dateEnd)
+
+    def _initialize_sap_transaction(self, session: object, arrParam: list):
+
+        startDate, endDate = self._get_date_window()
+        session.findById("wnd[0]/usr/chkDY_QMSM").selected = False
+        session.findById("wnd[0]/usr/ctxtERLDAT-LOW").text = startDate.strftime("%d.%m.%Y")
+        session.findById("wnd[0]/usr/ctxtERLDAT-HIGH").text = endDate.strftime("%d.%m.%Y")
+        self._set_sap_selection_values(session, arrParam)
+
+
+class IW67ByMeasurementMEDL(IW67ByMeasurement):
+
+    def __init__(self, referenceInfo: ReferenceInfo, retryPolicy: RetryPolicy = None, watermark: datetime.date | None = None):
+        """
+        Este é o método construtor da classe IW67ByMeasurementMEDL (medidas pendentes).
+
+        Args:
+            referenceInfo (ReferenceInfo): objeto que representa os dados do período para execução
+            retryPolicy (RetryPolicy): política de novas tentativas
+            watermark (datetime.date | None): data da última execução com sucesso. Informada = atualização incremental (somente medidas criadas a partir da data, menos MEDL_INCREMENTAL_OVERLAP_DAYS, mescladas por chave no arquivo existente). None = atualização completa
+        """
+
+        super().__init__('IW67_MEDL', IW67Config, referenceInfo, retryPolicy)
+        self.watermark = watermark
+        self.maxDateShards = MEDL_MAX_DATE_SHARDS
+        if watermark is not None:
+            self.exportKeyFields = IW67_KEY_FIELDS
+
+    def _get_full_date_window(self):
+
+        startDate = MEDL_FULL_START_DATE if self.watermark is None else self.watermark - datetime.timedelta(days=MEDL_INCREMENTAL_OVERLAP_DAYS)
+        return (startDate, OPEN_END_DATE)
+
+    def _initialize_sap_transaction(self, session: object, arrParam: list):
+
+        startDate, endDate = self._get_date_window()
+        session.findById("wnd[0]/usr/chkDY_QMSM").selected = True
+        session.findById("wnd[0]/usr/ctxtERDAT-LOW").text = startDate.strftime("%d.%m.%Y")
+        session.findById("wnd[0]/usr/ctxtERDAT-HIGH").text = endDate.strftime("%d.%m.%Y")
+        self._set_sap_selection_values(session, arrParam)
+
+
+class IW67ByMeasurementMEDLClosed(IW67ByMeasurement):
+
+    def __init__(self, referenceInfo: ReferenceInfo, retryPolicy: RetryPolicy = None, watermark: datetime.date | None = None):
+        """
+        Este é o método construtor da classe IW67ByMeasurementMEDLClosed (medidas concluídas desde a última execução do IW67 MEDL). Utilizada na atualização incremental do IW67 MEDL: as medidas consultadas deixaram de estar pendentes e são removidas do arquivo IW67_MEDL
+        ATENÇÃO: os dados não são exportados em arquivo próprio (somente removidos do arquivo IW67_MEDL)
+
+        Args:
+            referenceInfo (ReferenceInfo): objeto que representa os dados do período para execução
+            retryPolicy (RetryPolicy): política de novas tentativas
+            watermark (datetime.date | None): data da última execução com sucesso do IW67 MEDL (obrigatória)
+        """
+
+        super().__init__('IW67_MEDL_CLOSED', IW67Config, referenceInfo, retryPolicy)
+        self.watermark = watermark
+        self.exportFileName = 'IW67_MEDL'
+        self.exportKeyFields = IW67_KEY_FIELDS
+        self.exportRemovesKeys = True
+
+    def _get_full_date_window(self):
+
+        return (self.watermark - datetime.timedelta(days=MEDL_INCREMENTAL_OVERLAP_DAYS), OPEN_END_DATE)
+
+    def _initialize_sap_transaction(self, session: object, arrParam: list):
+
+        startDate, endDate = self._get_date_window()
+        session.findById("wnd[0]/usr/chkDY_QMSM").selected = False
+        session.findById("wnd[0]/usr/ctxtERDAT-LOW").text = MEDL_FULL_START_DATE.strftime("%d.%m.%Y")
+        session.findById("wnd[0]/usr/ctxtERDAT-HIGH").text = OPEN_END_DATE.strftime("%d.%m.%Y")
+        session.findById("wnd[0]/usr/ctxtERLDAT-LOW").text = startDate.strftime("%d.%m.%Y")
+        session.findById("wnd[0]/usr/ctxtERLDAT-HIGH").text = endDate.strftime("%d.%m.%Y")
+        self._set_sap_selection_values(session, arrParam)
@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import argparse
+import logging
+import threading
+import http.server
+import urllib.parse
+import env
+import utils
+from model import FilterConfig
+
+# ? Informações: módulo responsável pelo serviço local de consulta (somente leitura) das tabelas mescladas [env.DIR_TABLE_DATA]: as tabelas são carregadas uma única vez em memória com índices nas colunas de filtro mais comuns e recarregadas quando uma nova mesclagem é gravada
+
+# Tabelas disponíveis para consulta e colunas indexadas de cada tabela
+QUERY_TABLES = {
+    'TB_ECC_MEDIDA': ['NOTA', 'STATUS', 'EQUIPAMENTO', 'REFERENCIA'],
+}
+
+# Intervalo mínimo (segundos) entre as verificações de alteração do arquivo da tabela (recarga automática)
+QUERY_RELOAD_CHECK_SECONDS = 2
+
+# Porta do endpoint de consulta (GET http://127.0.0.1:<porta>/query/<tabela>?COLUNA=valor)
+QUERY_SERVICE_PORT = 8766
+
+# Quantidade máxima de linhas retornadas por consulta no endpoint (parâmetro limit)
+QUERY_MAX_ROWS = 10000
+
+
+class TableIndex:
+
+    """
+    Esta classe representa uma tabela mesclada carregada em memória, com índices (valor -> posições das linhas) nas colunas informadas. É imutável após a carga: a recarga cria uma nova instância (ver QueryService)
+
+    A classe TableIndex faz o seguinte:
+        - Carrega o arquivo .txt da tabela (separador |) e indexa as colunas
+        - Consulta as linhas por igualdade nas colunas indexadas (índice mais seletivo) e por filtros adicionais (FilterConfig)
+    """
+
+    def __init__(self, name: str, filePath: str, indexColumns: list):
+        """
+        Este é o método construtor da classe TableIndex.
+
+        Args:
+            name (str): nome da tabela [Exemplo: TB_ECC_MEDIDA]
+            filePath (str): caminho do arquivo .txt da tabela
+            indexColumns (list): colunas indexadas [Exemplo: ['NOTA', 'STATUS']]
+        """
+
+        start = time.time()
+        self.name = name
+        self.filePath = filePath
+        self.fileState = get_file_state(filePath)
+        self.header = []
+        self.rows = []
+        with open(filePath, encoding='utf-8') as file:
+            for line in file:
+                splitedData = tuple(item.strip() for item in line.rstrip('\n').split('|'))
+                if not self.header:
+                    self.header = list(splitedData)
+                elif any(splitedData):
+                    self.rows.append(splitedData + ('',) * (len(self.header) - len(splitedData)))
+
+        self.columnPositions = {column: position for position, column in enumerate(self.header)}
+        self.indexes = {}
+        for column in indexColumns:
+            if column not in self.columnPositions:
+                continue
+            position = self.columnPositions[column]
+            index = {}
+            for rowId, row in enumerate(self.rows):
+                index.setdefault(row[position], []).append(rowId)
+            self.indexes[column] = index
+
+        self.loadSeconds = round(time.time() - start, 3)
+        self.loadedAt = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    def __get_row_dict(self, row: tuple, columns: list | None):
+
+        values = dict(zip(self.header, row))
+        return values if columns is None else {column: values.get(column, '') for column in columns}
+
+    def query(self, equals: dict | None = None, filters: list | None = None, columns: list | None = None, limit: int | None = None):
+        """
+        Este método consulta as linhas da tabela. As linhas são selecionadas pelo índice mais seletivo entre as condições de igualdade em colunas indexadas (sem leitura de todas as linhas); as demais condições são verificadas somente nas linhas selecionadas
+        ATENÇÃO: sem nenhuma condição em coluna indexada, todas as linhas são verificadas
+        IMPORTANTE: lança ValueError se alguma coluna das condições, filtros ou colunas retornadas não existir na tabela
+
+        Args:
+            equals (dict | None): condições de igualdade por coluna, com um valor ou lista de valores aceitos [Exemplo: {'NOTA': '123', 'STATUS': ['MEDL', 'MEDE']}]
+            filters (list | None): filtros adicionais (FilterConfig) [Exemplo: [FilterConfig('TEXTO', 'containsAny', ['Verificar'])]]
+            columns (list | None): colunas retornadas (None = todas)
+            limit (int | None): quantidade máxima de linhas (None = sem limite)
+
+        Returns:
+            list: array contendo dictionary com os dados
+        """
+
+        equals = {column: [values] if isinstance(values, str) else list(values) for column, values in (equals or {}).items()}
+        unknownColumns = [column for column in [*equals, *(filter.columnName for filter in filters or []), *(columns or [])] if column not in self.columnPositions]
+        if unknownColumns:
+            raise ValueError(f'Unknown columns for table {self.name}: {", ".join(dict.fromkeys(unknownColumns))}')
+
+        conditionPositions = {self.columnPositions[column]: set(values) for column, values in equals.items()}
+
+        # somente o índice mais seletivo é utilizado: as demais condições são verificadas nas linhas selecionadas
+        indexedColumns = [column for column in equals if column in self.indexes]
+        if indexedColumns:
+            column = min(indexedColumns, key=lambda column: sum(len(self.indexes[column].get(value, [])) for value in equals[column]))
+            rowIds = [rowId for value in equals[column] for rowId in self.indexes[column].get(value, [])]
+            candidateRows = (self.rows[rowId] for rowId in (sorted(rowIds) if len(equals[column]) > 1 else rowIds))
+            del conditionPositions[self.columnPositions[column]]
+        else:
+            candidateRows = iter(self.rows)
+
+        data = []
+        for row in candidateRows:
+            if any(row[position] not in values for position, values in conditionPositions.items()):
+                continue
+            if filters and not all(filter.isValid(row[self.columnPositions[filter.columnName]]) for filter in filters):
+                continue
+            data.append(self.__get_row_dict(row, columns))
+            if limit is not None and len(data) >= limit:
+                break
+
+        return data
+
+    def get_info(self):
+
+        return {'rows': len(self.rows), 'columns': self.header, 'indexes': {column: len(index) for column, index in self.indexes.items()}, 'loadedAt': self.loadedAt, 'loadSeconds': self.loadSeconds}
+
+
+def get_file_state(filePath: str):
+
+    stat = os.stat(filePath)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class QueryService:
+
+    """
+    Esta classe representa o acesso de consulta às tabelas mescladas (uso como biblioteca ou pelo endpoint local). As tabelas são carregadas na primeira consulta e recarregadas quando o arquivo é alterado (nova mesclagem); a tabela anterior continua respondendo até a nova carga ser concluída
+
+    A classe QueryService faz o seguinte:
+        - Mantém as tabelas carregadas (TableIndex) e verifica a alteração dos arquivos
+        - Executa as consultas nas tabelas
+    """
+
+    def __init__(self, tables: dict = QUERY_TABLES, directory: str | None = None):
+        """
+        Este é o método construtor da classe QueryService.
+
+        Args:
+            tables (dict): tabelas disponíveis e colunas indexadas [Exemplo: {'TB_ECC_MEDIDA': ['NOTA']}]
+            directory (str | None): diretório das tabelas (None = env.DIR_TABLE_DATA)
+        """
+
+        self.tables = tables
+        self.directory = directory
+        self.loadedTables = {}
+        self.lastChecks = {}
+        self.lock = threading.Lock()
+
+    def __get_file_path(self, tableName: str):
+
+        return os.path.join(self.directory or env.DIR_TABLE_DATA, f'{tableName}.txt')
+
+    def get_table(self, tableName: str):
+        """
+        Este método retorna a tabela carregada em memória, recarregando-a se o arquivo foi alterado desde a última carga (verificação a cada QUERY_RELOAD_CHECK_SECONDS). Se a recarga falhar, a tabela anterior continua sendo retornada
+
+        Args:
+            tableName (str): nome da tabela [Exemplo: TB_ECC_MEDIDA]
+
+        Returns:
+            TableIndex: tabela carregada
+        """
+
+        if tableName not in self.tables:
+            raise KeyError(f'Table {tableName} is not available for queries')
+
+        table = self.loadedTables.get(tableName)
+        now = time.time()
+        if table is not None and now - self.lastChecks.get(tableName, 0) < QUERY_RELOAD_CHECK_SECONDS:
+            return table
+
+        # durante a recarga (lock em uso) a tabela anterior continua respondendo
+        if not self.lock.acquire(blocking=table is None):
+            return table
+
+        try:
+            table = self.loadedTables.get(tableName)
+            self.lastChecks[tableName] = now
+            filePath = self.__get_file_path(tableName)
+            try:
+                if table is None or get_file_state(filePath) != table.fileState:
+                    if table is not None:
+                        logging.info(f'Reloading table {tableName} [{filePath}]')
+                    table = TableIndex(tableName, filePath, self.tables[tableName])
+                    self.loadedTables[tableName] = table
+                    print(f'{utils.CustomMessage.prGreen("Successfully")} loaded table {tableName} [{len(table.rows)} rows] [{table.loadSeconds} seconds]')
+
+            except Exception:
+                # falha na recarga (ex.: arquivo removido ou ilegível): a tabela anterior continua respondendo
+                if table is None:
+                    raise
+                logging.exception(f'Failed to reload table {tableName} [{filePath}], serving the previously loaded data')
+
+            return table
+
+        finally:
+            self.lock.release()
+
+    def query(self, tableName: str, equals: dict | None = None, filters: list | None = None, columns: list | None = None, limit: int | None = None):
+        """
+        Este método consulta as linhas de uma tabela (ver TableIndex.query)
+
+        Args:
+            tableName (str): nome da tabela [Exemplo: TB_ECC_MEDIDA]
+            equals (dict | None): condições de igualdade por coluna [Exemplo: {'NOTA': '123'}]
+            filters (list | None): filtros adicionais (FilterConfig)
+            columns (list | None): colunas retornadas (None = todas)
+            limit (int | None): quantidade máxima de linhas (None = sem limite)
+
+        Returns:
+            list: array contendo dictionary com os dados
+        """
+
+        return self.get_table(tableName).query(equals, filters, columns, limit)
+
+    def get_info(self):
+
+        return {tableName: table.get_info() for tableName, table in self.loadedTables.items()}
+
+
+def _get_request_query(queryString: str):
+
+    parameters = urllib.parse.parse_qs(queryString, keep_blank_values=True)
+    limit = min(int(parameters.pop('limit', [QUERY_MAX_ROWS])[0]), QUERY_MAX_ROWS)
+    columns = parameters.pop('columns', [None])[0]
+    contains = parameters.pop('contains', [])
+    filters = [FilterConfig(column, 'containsAll', [text]) for column, _, text in (item.partition(':') for item in contains)]
+    equals = {column: values for column, values in parameters.items()}
+    return equals, filters, columns.split(',') if columns else None, limit
+
+
+def start_query_server(queryService: QueryService, port: int = QUERY_SERVICE_PORT):
+    """
+    Este método inicia o endpoint local (somente 127.0.0.1) de consulta às tabelas, em uma thread
+    Rotas: GET /tables (tabelas carregadas) e GET /query/<tabela>?COLUNA=valor&COLUNA=valor2&contains=COLUNA:texto&columns=A,B&limit=N
+
+    Args:
+        queryService (QueryService): serviço de consulta
+        port (int): porta do endpoint
+
+    Returns:
+        object: servidor HTTP (http.server.ThreadingHTTPServer) - encerrar com shutdown()
+    """
+
+    class QueryRequestHandler(http.server.BaseHTTPRequestHandler):
+
+        def __send_json(self, status: int, data: object):
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            try:
+                if url.path.rstrip('/') == '/tables':
+                    self.__send_json(200, queryService.get_info())
+                elif url.path.startswith('/query/'):
+                    start = time.perf_counter()
+                    equals, filters, columns, limit = _get_request_query(url.query)
+                    rows = queryService.query(url.path[len('/query/'):].strip('/'), equals, filters, columns, limit)
+                    self.__send_json(200, {'rows': rows, 'count': len(rows), 'seconds': round(time.perf_counter() - start, 6)})
+                else:
+                    self.__send_json(404, {'error': 'Not found'})
+            except KeyError as e:
+                self.__send_json(404, {'error': str(e)})
+            except ValueError as e:
+                self.__send_json(400, {'error': str(e)})
+            except FileNotFoundError as e:
+                self.__send_json(503, {'error': f'Table file not available: {e.filename}'})
+            except Exception:
+                logging.exception('Exception occurred')
+                self.__send_json(500, {'error': 'Internal error'})
+
+        def log_message(self, format: str, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), QueryRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f'Query endpoint listening on http://127.0.0.1:{port}/query/<table>')
+    return server
+
+
+# ! ----------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Local read-only query service over the merged tables (in-memory indexes, hot reload)')
+    parser.add_argument('--port', type=int, default=QUERY_SERVICE_PORT, help='endpoint port on 127.0.0.1')
+    parser.add_argument('--directory', default=None, help='tables directory (default: env.DIR_TABLE_DATA)')
+    args = parser.parse_args()
+
+    service = QueryService(directory=args.directory)
+    for tableName in service.tables:
+        try:
+            service.get_table(tableName)
+        except FileNotFoundError:
+            print(f'{utils.CustomMessage.prYellow("Not available")} table {tableName}: file not found (loaded on the first query after the merge)')
+    server = start_query_server(service, args.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
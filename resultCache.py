@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import datetime
+import env
+
+# ? Informações: módulo responsável pelo cache dos resultados das atualizações de dados (arquivo exportado), por classe da atualização, parâmetros e período de seleção. Resultados de períodos fechados são imutáveis e servidos do disco, sem consulta ao SAP
+
+# Cache de resultados ativo (False = todas as atualizações são consultadas no SAP)
+RESULT_CACHE_ENABLED = True
+
+# Diretório do cache, dentro do diretório dos dados importados (env.DIR_EXPORTED_DATA)
+RESULT_CACHE_DIRECTORY_NAME = 'cache'
+
+# Dias após o fim do período de seleção para que seja considerado fechado (medidas concluídas com atraso no período)
+RESULT_CACHE_CLOSED_AFTER_DAYS = 5
+
+# Validade (segundos) dos resultados de períodos fechados (None = imutáveis, sem expiração)
+RESULT_CACHE_CLOSED_TTL_SECONDS = None
+
+# Validade (segundos) dos resultados de períodos abertos ou recentes (0 = sempre consultados no SAP)
+RESULT_CACHE_OPEN_TTL_SECONDS = 0
+
+
+def _get_cache_directory():
+
+    directory = os.path.join(env.DIR_EXPORTED_DATA, RESULT_CACHE_DIRECTORY_NAME)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _get_cache_description(updateData: object, arrParam: list):
+
+    dateWindow = updateData._get_full_date_window()
+    return {
+        'class': type(updateData).__name__,
+        'transaction': updateData.sapTransaction,
+        'variant': updateData.sapVariant,
+        'fields': [field.name for field in updateData.fields],
+        'params': sorted(map(str, arrParam)),
+        'dateWindow': [date.isoformat() for date in dateWindow],
+    }
+
+
+def get_cache_key(updateData: object, arrParam: list):
+    """
+    Este método retorna a chave do resultado de uma atualização de dados no cache: classe da atualização (transação, variante e layout), parâmetros e período de seleção completo
+
+    Args:
+        updateData (object): objeto da atualização de dados (ver UpdateData._get_full_date_window)
+        arrParam (list): lista com os parâmetros da consulta
+
+    Returns:
+        str: chave do resultado (None se a atualização não possui período de seleção)
+    """
+
+    if updateData._get_full_date_window() is None:
+        return None
+
+    description = json.dumps(_get_cache_description(updateData, arrParam), sort_keys=True)
+    return f'{type(updateData).__name__}_{hashlib.sha1(description.encode("utf-8")).hexdigest()[:16]}'
+
+
+def is_closed_period(dateWindow: tuple, today: datetime.date | None = None):
+    """
+    Este método verifica se o período de seleção está fechado (fim do período há mais de RESULT_CACHE_CLOSED_AFTER_DAYS dias), ou seja, se os dados consultados não se alteram mais
+
+    Args:
+        dateWindow (tuple): período de seleção (data inicial, data final)
+        today (datetime.date | None): data atual (None = hoje)
+
+    Returns:
+        bool: True se o período está fechado
+    """
+
+    today = today or datetime.date.today()
+    return dateWindow[1] < today - datetime.timedelta(days=RESULT_CACHE_CLOSED_AFTER_DAYS)  # fim em aberto (ex.: 31.12.9999) nunca é fechado
+
+
+def get_cached_result(updateData: object, arrParam: list):
+    """
+    Este método retorna o arquivo do resultado em cache de uma atualização de dados, se válido. Resultados gravados com o período fechado seguem RESULT_CACHE_CLOSED_TTL_SECONDS (imutáveis por padrão) e os demais RESULT_CACHE_OPEN_TTL_SECONDS
+
+    Args:
+        updateData (object): objeto da atualização de dados
+        arrParam (list): lista com os parâmetros da consulta
+
+    Returns:
+        str: caminho do arquivo .txt em cache (None se não houver resultado válido)
+    """
+
+    cacheKey = get_cache_key(updateData, arrParam) if RESULT_CACHE_ENABLED else None
+    if cacheKey is None:
+        return None
+
+    metadataPath = os.path.join(_get_cache_directory(), f'{cacheKey}.json')
+    filePath = os.path.join(_get_cache_directory(), f'{cacheKey}.txt')
+    if not os.path.isfile(metadataPath) or not os.path.isfile(filePath):
+        return None
+
+    with open(metadataPath, encoding='utf-8') as file:
+        metadata = json.load(file)
+
+    ttlSeconds = RESULT_CACHE_CLOSED_TTL_SECONDS if metadata['closed'] else RESULT_CACHE_OPEN_TTL_SECONDS
+    if ttlSeconds is not None and time.time() - metadata['created'] >= ttlSeconds:
+        return None
+
+    return filePath
+
+
+def store_result(updateData: object, arrParam: list, filePath: str):
+    """
+    Este método grava no cache o arquivo exportado de uma atualização de dados concluída. O período fechado no momento da gravação torna o resultado imutável (ver get_cached_result)
+
+    Args:
+        updateData (object): objeto da atualização de dados
+        arrParam (list): lista com os parâmetros da consulta
+        filePath (str): caminho do arquivo .txt exportado
+
+    Returns:
+        bool: True se o resultado foi gravado
+    """
+
+    cacheKey = get_cache_key(updateData, arrParam) if RESULT_CACHE_ENABLED else None
+    if cacheKey is None or not os.path.isfile(filePath):
+        return False
+
+    description = _get_cache_description(updateData, arrParam)
+    closed = is_closed_period(updateData._get_full_date_window())
+    if not closed and RESULT_CACHE_OPEN_TTL_SECONDS == 0:
+        return False
+
+    cacheFilePath = os.path.join(_get_cache_directory(), f'{cacheKey}.txt')
+    shutil.copyfile(filePath, f'{cacheFilePath}.tmp')
+    os.replace(f'{cacheFilePath}.tmp', cacheFilePath)
+
+    metadataPath = os.path.join(_get_cache_directory(), f'{cacheKey}.json')
+    with open(f'{metadataPath}.tmp', 'w', encoding='utf-8') as file:
+        json.dump({**description, 'name': updateData.name, 'closed': closed, 'created': time.time()}, file, indent=2, ensure_ascii=False)
+    os.replace(f'{metadataPath}.tmp', metadataPath)
+    return True
@@ -0,0 +1,209 @@
+import time
+import random
+import logging
+import tracing
+
+# ? Informações: módulo responsável pela política de novas tentativas (backoff exponencial com jitter, prazo por operação, limite de tentativas e circuit breaker)
+
+
+class RetryError(Exception):
+
+    """
+    Exceção lançada quando uma operação esgota o limite de tentativas ou o prazo definido na política de novas tentativas
+    """
+
+    pass
+
+
+class CircuitOpenError(RetryError):
+
+    """
+    Exceção lançada quando o circuit breaker de uma operação está aberto (falhas consecutivas acima do limite)
+    """
+
+    pass
+
+
+class CircuitBreaker:
+
+    """
+    Esta classe representa o circuit breaker das operações com o SAP Gui. Após um número de falhas consecutivas de uma mesma operação o circuito é aberto e novas tentativas são recusadas até o fim do tempo de espera (half-open: uma nova tentativa é liberada)
+
+    A classe CircuitBreaker faz o seguinte:
+        - Contabiliza falhas consecutivas por operação
+        - Recusa novas tentativas enquanto o circuito estiver aberto
+    """
+
+    def __init__(self, failureThreshold: int = 20, resetSeconds: float = 120):
+        """
+        Este é o método construtor da classe CircuitBreaker.
+
+        Args:
+            failureThreshold (int): quantidade de falhas consecutivas para abertura do circuito
+            resetSeconds (float): tempo (segundos) de circuito aberto até liberar uma nova tentativa
+        """
+
+        self.failureThreshold = failureThreshold
+        self.resetSeconds = resetSeconds
+        self.failures = {}
+        self.openedAt = {}
+
+    def is_open(self, operationName: str) -> bool:
+
+        openedAt = self.openedAt.get(operationName)
+        if openedAt is None:
+            return False
+
+        if time.time() - openedAt >= self.resetSeconds:
+            # half-open: libera uma tentativa, nova falha reabre o circuito
+            del self.openedAt[operationName]
+            self.failures[operationName] = self.failureThreshold - 1
+            return False
+
+        return True
+
+    def record_success(self, operationName: str):
+
+        self.failures.pop(operationName, None)
+        self.openedAt.pop(operationName, None)
+
+    def record_failure(self, operationName: str):
+
+        self.failures[operationName] = self.failures.get(operationName, 0) + 1
+        if self.failures[operationName] >= self.failureThreshold:
+            self.openedAt[operationName] = time.time()
+            logging.warning(f'Circuit opened for {operationName} [{self.failures[operationName]} consecutive failures]')
+
+
+class RetryAttempt:
+
+    """
+    Esta classe representa uma tentativa de uma operação gerada pela política de novas tentativas (ver RetryPolicy.attempts). O sucesso da tentativa deve ser informado explicitamente (succeeded) antes da saída do laço
+
+    A classe RetryAttempt faz o seguinte:
+        - Identifica o número da tentativa
+        - Registra o sucesso da operação no circuit breaker (fecha o circuito)
+    """
+
+    def __init__(self, number: int, operationName: str, circuitBreaker: CircuitBreaker | None = None):
+        """
+        Este é o método construtor da classe RetryAttempt.
+
+        Args:
+            number (int): número da tentativa (inicia em 1)
+            operationName (str): nome da operação (identificação no log e no circuit breaker)
+            circuitBreaker (CircuitBreaker | None): circuit breaker da política de novas tentativas (None = desativado)
+        """
+
+        self.number = number
+        self.operationName = operationName
+        self.circuitBreaker = circuitBreaker
+        self.success = False
+
+    def succeeded(self):
+        """
+        Este método registra o sucesso da tentativa (deve ser chamado antes do return/break do laço). Uma exceção lançada no laço ou a saída sem esta chamada não é considerada sucesso
+        """
+
+        self.success = True
+        if self.circuitBreaker is not None:
+            self.circuitBreaker.record_success(self.operationName)
+
+
+class RetryPolicy:
+
+    """
+    Esta classe representa a política de novas tentativas das operações com o SAP Gui e arquivos (substitui os laços infinitos sem espera)
+
+    A classe RetryPolicy faz o seguinte:
+        - Calcula o tempo de espera entre tentativas (backoff exponencial com jitter)
+        - Interrompe a operação ao atingir o limite de tentativas ou o prazo (deadline)
+        - Consulta o circuit breaker (opcional) antes de cada tentativa
+    """
+
+    def __init__(self, baseSeconds: float = 0.5, maxSeconds: float = 30, multiplier: float = 2, jitter: float = 0.5, maxAttempts: int | None = None, deadlineSeconds: float | None = None, circuitBreaker: CircuitBreaker | None = None):
+        """
+        Este é o método construtor da classe RetryPolicy.
+
+        Args:
+            baseSeconds (float): tempo de espera (segundos) após a primeira falha
+            maxSeconds (float): tempo máximo de espera (segundos) entre tentativas
+            multiplier (float): fator de crescimento do tempo de espera a cada falha
+            jitter (float): fração aleatória (0 a 1) subtraída do tempo de espera, evita tentativas simultâneas entre sessões
+            maxAttempts (int | None): quantidade máxima de tentativas (None = sem limite)
+            deadlineSeconds (float | None): prazo máximo (segundos) da operação (None = sem prazo)
+            circuitBreaker (CircuitBreaker | None): circuit breaker compartilhado entre operações (None = desativado)
+        """
+
+        self.baseSeconds = baseSeconds
+        self.maxSeconds = maxSeconds
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.maxAttempts = maxAttempts
+        self.deadlineSeconds = deadlineSeconds
+        self.circuitBreaker = circuitBreaker
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Este método calcula o tempo de espera após a tentativa informada
+
+        Args:
+            attempt (int): número da tentativa que falhou (inicia em 1)
+
+        Returns:
+            float: tempo de espera em segundos
+        """
+
+        delay = min(self.maxSeconds, self.baseSeconds * (self.multiplier ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1)
+
+    def attempts(self, operationName: str, onRetry: any = None):
+        """
+        Este método gera as tentativas de uma operação, para uso em laço (substituto do `while True`). O sucesso deve ser informado pela tentativa antes da saída do laço [Exemplo: attempt.succeeded(); return data]; a continuação do laço indica falha da tentativa anterior, aplicando o tempo de espera antes da próxima
+        ATENÇÃO: lança RetryError ao atingir o limite de tentativas/prazo e CircuitOpenError se o circuito da operação estiver aberto. Nos laços com operações aninhadas (que utilizam a mesma política) RetryError deve ser relançada, sem ser tratada como falha da tentativa
+
+        Args:
+            operationName (str): nome da operação (identificação no log e no circuit breaker) [Exemplo: background.get_spool_list]
+            onRetry (any): função opcional chamada antes de cada espera, com o número da tentativa e o tempo de espera
+
+        Returns:
+            generator: tentativa atual (RetryAttempt)
+        """
+
+        start = time.time()
+        attempt = 0
+        while True:
+            if self.circuitBreaker is not None and self.circuitBreaker.is_open(operationName):
+                raise CircuitOpenError(f'Circuit open for {operationName}')
+
+            attempt += 1
+            currentAttempt = RetryAttempt(attempt, operationName, self.circuitBreaker)
+            yield currentAttempt
+            if currentAttempt.success:
+                return
+
+            if self.circuitBreaker is not None:
+                self.circuitBreaker.record_failure(operationName)
+            tracing.add_to_current('retries')
+
+            if self.maxAttempts is not None and attempt >= self.maxAttempts:
+                logging.error(f'{operationName} failed after {attempt} attempts')
+                raise RetryError(f'{operationName} failed after {attempt} attempts')
+
+            delay = self.get_delay(attempt)
+            if self.deadlineSeconds is not None:
+                remaining = self.deadlineSeconds - (time.time() - start)
+                if remaining <= 0:
+                    logging.error(f'{operationName} exceeded deadline of {self.deadlineSeconds} seconds')
+                    raise RetryError(f'{operationName} exceeded deadline of {self.deadlineSeconds} seconds')
+                delay = min(delay, remaining)
+
+            if onRetry is not None:
+                onRetry(attempt, delay)
+            time.sleep(delay)
+
+
+# ? ==========================================================================================
+
+# Política padrão: sem limite de tentativas (executa até sucesso), porém com espera crescente entre as falhas
+DEFAULT_POLICY = RetryPolicy()
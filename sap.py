@@ -1,146 +1,443 @@
-import win32com.client
-import time
-import logging
-import utils
-
-# ? Informações: módulo responsável pelo tratamento da conexão e comunicação com SAP GUI Script
-
-
-def __get_session_by_number(systemName: str, sessionNumber: int):
-    """  
-    Este método realiza a conexão com o SAP Gui para uma determinada sessão/tela (ses[x])
-    ATENÇÃO: não hevará conexão se não identificada a sessão/tela informada. Não está parametrizada a tentativa de abertura de novas sessões/telas (deverá ocorrer manualmente)
-
-    Args:
-        systemName (str): nome do sistema SAP (por default ERP)
-        sessionNumber (int): número da sessão/tela para realizar conexão
-
-    Returns:
-        object: conexão com o SAP Gui
-    """
-
-    try:
-        sapApp = win32com.client.GetObject('SAPGUI').getScriptingEngine
-        for con in sapApp.Connections:
-            for ses in con.Sessions:
-                if ses.Info.SystemName == systemName.upper() and ses.Info.User and ses.Info.SessionNumber == sessionNumber:
-                    return ses
-
-    except Exception as e:
-        logging.exception('Exception occurred')
-        print(f"Error: {str(e)} [ses {sessionNumber}]")
-        return None
-
-    finally:
-        sapApp = None
-        con = None
-
-
-def get_session_by_number(systemName: str, sessionNumber: int):
-    """  
-    Este método realiza uma tentativa, a cada x segundos, de conexão com uma sessão/tela do SAP Gui
-    IMPORTANTE: será executado repetidamente até que haja sucesso (loop infinito - sem delimitação de número de tentativas)
-
-    Args:
-        systemName (str): nome do sistema SAP (por default ERP)
-        sessionNumber (int): número da sessão/tela para realizar conexão
-
-    Returns:
-        object: conexão com o SAP Gui
-    """
-
-    while True:
-        try:
-            ses = None
-            awaitSeconds = 10
-            while ses == None:
-                ses = __get_session_by_number(systemName, sessionNumber)
-                if ses == None:
-                    for sec in reversed(range(awaitSeconds)):
-                        print(
-                            f'{utils.CustomMessage.prRed("Failed")} to get SAP GUI session [{systemName} - {sessionNumber}]. Retrying in {utils.CustomMessage.prPurple(sec)} seconds', end="\r")
-                        time.sleep(1)
-
-            return ses
-
-        except Exception:
-            continue
-
-# ? ==========================================================================================
-
-
-def clear_all_input_text(session: object):
-    """ 
-    Este método realiza a limpeza de todos os dados preenchidos em uma transação do SAP Gui
-    ATENÇÃO: a chamada deste método somente deve ocorrer após a transação estar aberta no SAP
-
-    Args:
-        session (object): objeto de conexão com o SAP Gui
-    """
-
-    try:
-        for obj in session.findById("wnd[0]/usr").Children:
-            if (obj.Type == "GuiCTextField" or obj.type == "GuiTextField"):
-                try:
-                    obj.text = ''
-                except:
-                    pass
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return None
-
-
-def set_user_variant(session: object, variant: str):
-    """ 
-    Este método realiza a chamada de uma variante de layout para uma transação do SAP Gui
-    ATENÇÃO: deve-se informar o nome da variante e não o RE do criador
-
-    Args:
-        session (object): objeto de conexão com o SAP Gui
-        variant (str): nome da variant de layout
-    """
-
-    try:
-        clear_all_input_text(session)
-        session.findById("wnd[0]/tbar[1]/btn[17]").press()
-        session.findById("wnd[1]/usr/txtENAME-LOW").text = ''
-        session.findById("wnd[1]/usr/txtV-LOW").text = variant
-        session.findById("wnd[1]/tbar[0]/btn[8]").press()
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return None
-
-
-def create_background_job(session: object, jobName: str):
-    """ 
-    Este método realiza a parametrização de execução em background de uma transação [F9]. O título do job será informado para facilitar a identificação dos dados na transação SP02
-
-    Args:
-        session (object): objeto de conexão com o SAP Gui
-        jobName (str): nome do job (título)
-
-    Returns:
-        bool: True se executado com sucesso
-    """
-
-    try:
-        session.findById("wnd[0]/mbar/menu[0]/menu[2]").Select()
-        session.findById("wnd[1]/usr/ctxtPRI_PARAMS-PDEST").text = ''  # clean local output (LOCAL) to allow set max rows
-        session.findById("wnd[1]/tbar[0]/btn[6]").press()  # 'características'
-        session.findById("wnd[2]/usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500/cntlCUSTOM/shellcont/shell").DoubleClickItem('PAART', 'Column1')
-        session.findById("wnd[2]/usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500/ssubSUBSCREEN:SAPLSPRI:0600/txtPRI_PARAMS-LINCT").text = '60000'  # max rows allowed for SAP
-        session.findById("wnd[2]/usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500/cntlCUSTOM/shellcont/shell").ExpandNode('SPOOLREQUEST')
-        session.findById("wnd[2]/usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500/cntlCUSTOM/shellcont/shell").DoubleClickItem('PRTXT', 'Column1')
-        session.findById("wnd[2]/usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500/ssubSUBSCREEN:SAPLSPRI:0600/txtPRI_PARAMS-PRTXT").Text = jobName.upper()
-
-        session.findById("wnd[2]/tbar[0]/btn[13]").press()
-        session.findById("wnd[1]/tbar[0]/btn[13]").press()
-        session.findById("wnd[1]/usr/btnSOFORT_PUSH").press()
-        session.findById("wnd[1]/tbar[0]/btn[11]").press()
-        return True
-
-    except Exception:
-        logging.exception('Exception occurred')
-        return False
+import re
+import time
+import threading
+import logging
+import utils
+import retry
+import comProxy
+from retry import RetryPolicy
+
+try:
+    import win32com.client
+    import pythoncom
+except ImportError:
+    # sem pywin32 somente a engine de scripting alternativa está disponível (ver SCRIPTING_ENGINE)
+    win32com = None
+    pythoncom = None
+
+# ? Informações: módulo responsável pelo tratamento da conexão e comunicação com SAP GUI Script
+
+# Cache dos ids (relativos à sessão) dos campos de entrada preenchidos ao abrir cada transação [Exemplo: {'IW67': ['wnd[0]/usr/ctxtQMART-LOW']}]
+POPULATED_INPUT_CACHE = {}
+
+# Engine de scripting alternativa ao SAP GUI (objeto com Connections/Sessions) [Exemplo: simulator.SapGuiSimulator().get_scripting_engine()]. None = SAP GUI via COM
+SCRIPTING_ENGINE = None
+
+# Instrumentação das chamadas COM (opcional): a sessão retornada por get_session_by_number e os objetos obtidos a partir dela são contabilizados por local de chamada (ver comProxy)
+INSTRUMENT_COM_CALLS = False
+
+# Máximo de linhas por ordem spool (PRI_PARAMS-LINCT) informado nos parâmetros de impressão em background
+SPOOL_MAX_LINES = 60000
+
+# Ids das sessões com os parâmetros de impressão constantes já informados (modelo de impressão - ver create_background_job)
+PRINT_TEMPLATE_SESSIONS = set()
+
+# Reutilização das sessões já conectadas (modo serviço, ver service.py): a sessão é mantida por sistema, número e thread enquanto válida, sem nova busca nas conexões do SAP Gui
+CACHE_SESSIONS = False
+SESSION_CACHE = {}
+
+# Quantidade e tempo total (segundos) de cada etapa da parametrização de impressão em background [Exemplo: {'set_title': [4, 0.8]}]
+PRINT_STEP_TIMINGS = {}
+
+
+def __get_session_by_number(systemName: str, sessionNumber: int):
+    """  
+    Este método realiza a conexão com o SAP Gui para uma determinada sessão/tela (ses[x])
+    ATENÇÃO: não hevará conexão se não identificada a sessão/tela informada. Não está parametrizada a tentativa de abertura de novas sessões/telas (deverá ocorrer manualmente)
+
+    Args:
+        systemName (str): nome do sistema SAP (por default ERP)
+        sessionNumber (int): número da sessão/tela para realizar conexão
+
+    Returns:
+        object: conexão com o SAP Gui
+    """
+
+    try:
+        if SCRIPTING_ENGINE is not None:
+            sapApp = SCRIPTING_ENGINE
+        else:
+            pythoncom.CoInitialize()  # necessário para conexão a partir de threads (sem efeito se já inicializado)
+            sapApp = win32com.client.GetObject('SAPGUI').getScriptingEngine
+        for con in sapApp.Connections:
+            for ses in con.Sessions:
+                if ses.Info.SystemName == systemName.upper() and ses.Info.User and ses.Info.SessionNumber == sessionNumber:
+                    return ses
+
+    except Exception as e:
+        logging.exception('Exception occurred')
+        print(f"Error: {str(e)} [ses {sessionNumber}]")
+        return None
+
+    finally:
+        sapApp = None
+        con = None
+
+
+def __get_cached_session(systemName: str, sessionNumber: int):
+
+    key = (systemName.upper(), sessionNumber, threading.get_ident())
+    ses = SESSION_CACHE.get(key)
+    if ses is None:
+        return None
+
+    try:
+        if ses.Info.SessionNumber == sessionNumber and ses.Info.User:
+            return ses
+    except Exception:
+        pass
+
+    SESSION_CACHE.pop(key, None)
+    return None
+
+
+def enable_session_cache():
+    """  
+    Este método ativa a reutilização das sessões já conectadas no processo atual (ver CACHE_SESSIONS). Utilizado no processo do serviço e nos processos de trabalho persistentes (ver multitask.start_worker_pool)
+    """
+
+    global CACHE_SESSIONS
+
+    CACHE_SESSIONS = True
+
+
+def get_session_by_number(systemName: str, sessionNumber: int, retryPolicy: RetryPolicy = retry.DEFAULT_POLICY):
+    """  
+    Este método realiza tentativas de conexão com uma sessão/tela do SAP Gui, aguardando entre as tentativas conforme a política de novas tentativas. Com INSTRUMENT_COM_CALLS ativo a sessão é retornada com proxy de instrumentação (comProxy.ComCallProxy)
+    IMPORTANTE: será executado repetidamente até que haja sucesso ou até o limite da política de novas tentativas (retryPolicy)
+
+    Args:
+        systemName (str): nome do sistema SAP (por default ERP)
+        sessionNumber (int): número da sessão/tela para realizar conexão
+        retryPolicy (RetryPolicy): política de novas tentativas (backoff, prazo, limite de tentativas e circuit breaker)
+
+    Returns:
+        object: conexão com o SAP Gui
+    """
+
+    def onRetry(attempt: int, delay: float):
+        print(f'{utils.CustomMessage.prRed("Failed")} to get SAP GUI session [{systemName} - {sessionNumber}]. Retrying in {utils.CustomMessage.prPurple(f"{delay:.1f}")} seconds [attempt {attempt}]', end="\r")
+
+    ses = __get_cached_session(systemName, sessionNumber) if CACHE_SESSIONS else None
+    if ses != None:
+        return comProxy.ComCallProxy(ses) if INSTRUMENT_COM_CALLS else ses
+
+    for attempt in retryPolicy.attempts(f'sap.get_session_by_number[{sessionNumber}]', onRetry):
+        try:
+            ses = __get_session_by_number(systemName, sessionNumber)
+            if ses != None:
+                if CACHE_SESSIONS:
+                    SESSION_CACHE[(systemName.upper(), sessionNumber, threading.get_ident())] = ses
+                attempt.succeeded()
+                return comProxy.ComCallProxy(ses) if INSTRUMENT_COM_CALLS else ses
+
+        except Exception:
+            continue
+
+# ? ==========================================================================================
+
+
+def clear_all_input_text(session: object):
+    """ 
+    Este método realiza a limpeza de todos os dados preenchidos em uma transação do SAP Gui
+    ATENÇÃO: a chamada deste método somente deve ocorrer após a transação estar aberta no SAP
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+    """
+
+    try:
+        for obj in session.findById("wnd[0]/usr").Children:
+            if (obj.Type == "GuiCTextField" or obj.type == "GuiTextField"):
+                try:
+                    obj.text = ''
+                except:
+                    pass
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def clear_populated_input_text(session: object):
+    """ 
+    Este método realiza a limpeza dos dados preenchidos em uma transação do SAP Gui. Na primeira chamada para a transação todos os itens da tela são enumerados e os ids dos campos preenchidos ficam em cache (POPULATED_INPUT_CACHE); nas chamadas seguintes somente estes campos são limpos, sem nova enumeração
+    ATENÇÃO: a chamada deste método somente deve ocorrer após a transação estar aberta no SAP
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+    """
+
+    try:
+        transaction = session.Info.Transaction
+        fieldIds = POPULATED_INPUT_CACHE.get(transaction)
+        if fieldIds is None:
+            fieldIds = []
+            for obj in session.findById("wnd[0]/usr").Children:
+                if (obj.Type == "GuiCTextField" or obj.Type == "GuiTextField") and obj.text != '':
+                    fieldIds.append(obj.id[obj.id.index('wnd['):])
+            POPULATED_INPUT_CACHE[transaction] = fieldIds
+
+        for fieldId in fieldIds:
+            try:
+                session.findById(fieldId).text = ''
+            except:
+                pass
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def set_user_variant(session: object, variant: str):
+    """ 
+    Este método realiza a chamada de uma variante de layout para uma transação do SAP Gui
+    ATENÇÃO: deve-se informar o nome da variante e não o RE do criador
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+        variant (str): nome da variant de layout
+    """
+
+    try:
+        clear_populated_input_text(session)
+        session.findById("wnd[0]/tbar[1]/btn[17]").press()
+        session.findById("wnd[1]/usr/txtENAME-LOW").text = ''
+        session.findById("wnd[1]/usr/txtV-LOW").text = variant
+        session.findById("wnd[1]/tbar[0]/btn[8]").press()
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def __run_print_step(stepName: str, callback: any):
+    """ 
+    Este método executa uma etapa da parametrização de impressão em background, acumulando a quantidade e o tempo de execução da etapa (PRINT_STEP_TIMINGS)
+
+    Args:
+        stepName (str): nome da etapa
+        callback (any): função que executa a etapa no SAP Gui
+    """
+
+    start = time.perf_counter()
+    result = callback()
+    timing = PRINT_STEP_TIMINGS.setdefault(stepName, [0, 0.0])
+    timing[0] += 1
+    timing[1] += time.perf_counter() - start
+    return result
+
+
+def get_print_step_timings():
+    """ 
+    Este método retorna as estatísticas de tempo de cada etapa da parametrização de impressão em background (create_background_job), ordenadas pelo tempo total
+
+    Returns:
+        object: contendo etapa, quantidade de execuções, tempo total e médio (segundos) [Exemplo: {'set_title': {'count': 4, 'total': 0.8, 'average': 0.2}}]
+    """
+
+    timings = sorted(PRINT_STEP_TIMINGS.items(), key=lambda item: item[1][1], reverse=True)
+    return {stepName: {'count': count, 'total': round(total, 4), 'average': round(total / count, 4)} for stepName, (count, total) in timings}
+
+
+def reset_print_template(session: object):
+    """ 
+    Este método descarta o modelo de parâmetros de impressão da sessão (os parâmetros constantes serão informados novamente no próximo job). Deve ser chamado ao reiniciar a transação na sessão
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+    """
+
+    try:
+        PRINT_TEMPLATE_SESSIONS.discard(session.Id)
+
+    except Exception:
+        PRINT_TEMPLATE_SESSIONS.clear()
+
+
+def create_background_job(session: object, jobName: str):
+    """ 
+    Este método realiza a parametrização de execução em background de uma transação [F9]. O título do job será informado para facilitar a identificação dos dados na transação SP02
+    ATENÇÃO: os parâmetros de impressão constantes (saída local, formato e máximo de linhas) são informados somente no primeiro job da sessão (PRINT_TEMPLATE_SESSIONS); nos jobs seguintes somente o título (PRTXT) é atualizado. O tempo de cada etapa é acumulado em PRINT_STEP_TIMINGS (ver get_print_step_timings)
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+        jobName (str): nome do job (título)
+
+    Returns:
+        bool: True se executado com sucesso
+    """
+
+    try:
+        sessionId = session.Id
+        propertiesId = "wnd[2]/usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500"
+
+        __run_print_step('open_print_parameters', lambda: session.findById("wnd[0]/mbar/menu[0]/menu[2]").Select())
+        titleField = session.findById("wnd[1]/usr/txtPRI_PARAMS-PRTXT", False) if sessionId in PRINT_TEMPLATE_SESSIONS else None
+        if titleField != None:
+            # modelo da sessão aplicado: título disponível diretamente nos parâmetros de impressão
+            __run_print_step('set_title', lambda: setattr(titleField, 'Text', jobName.upper()))
+        else:
+            isTemplateApplied = sessionId in PRINT_TEMPLATE_SESSIONS
+            if not isTemplateApplied:
+                __run_print_step('clear_output_device', lambda: setattr(session.findById("wnd[1]/usr/ctxtPRI_PARAMS-PDEST"), 'text', ''))  # clean local output (LOCAL) to allow set max rows
+            __run_print_step('open_properties', lambda: session.findById("wnd[1]/tbar[0]/btn[6]").press())  # 'características'
+            shell = session.findById(f"{propertiesId}/cntlCUSTOM/shellcont/shell")
+            if not isTemplateApplied:
+                __run_print_step('select_format', lambda: shell.DoubleClickItem('PAART', 'Column1'))
+                __run_print_step('set_max_lines', lambda: setattr(session.findById(f"{propertiesId}/ssubSUBSCREEN:SAPLSPRI:0600/txtPRI_PARAMS-LINCT"), 'text', str(SPOOL_MAX_LINES)))  # max rows allowed for SAP
+            __run_print_step('expand_spool_request', lambda: shell.ExpandNode('SPOOLREQUEST'))
+            __run_print_step('select_title', lambda: shell.DoubleClickItem('PRTXT', 'Column1'))
+            __run_print_step('set_title', lambda: setattr(session.findById(f"{propertiesId}/ssubSUBSCREEN:SAPLSPRI:0600/txtPRI_PARAMS-PRTXT"), 'Text', jobName.upper()))
+            __run_print_step('confirm_properties', lambda: session.findById("wnd[2]/tbar[0]/btn[13]").press())
+
+        __run_print_step('confirm_print_parameters', lambda: session.findById("wnd[1]/tbar[0]/btn[13]").press())
+        __run_print_step('schedule_immediately', lambda: session.findById("wnd[1]/usr/btnSOFORT_PUSH").press())
+        __run_print_step('save_job', lambda: session.findById("wnd[1]/tbar[0]/btn[11]").press())
+        PRINT_TEMPLATE_SESSIONS.add(sessionId)
+        return True
+
+    except Exception:
+        logging.exception('Exception occurred')
+        reset_print_template(session)
+        return False
+
+
+def get_status_bar_job_info(session: object):
+    """ 
+    Este método realiza a leitura da barra de status do SAP Gui após a criação de um job em background, identificando o nome e o contador (identificador) do job
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+
+    Returns:
+        object: contendo texto da barra de status, nome e contador do job (None se não identificados) [Exemplo: {'statusText': '...', 'jobName': 'RIQMEL20', 'jobCount': '12345678'}]
+    """
+
+    try:
+        statusText = session.findById("wnd[0]/sbar").Text.strip()
+        # nome do job em maiúsculas logo após "job" [Exemplo: Job RIQMEL20 liberado (contador 12345678)]; textos sem o nome (ex.: "Background job was scheduled") não são identificados
+        nameMatch = re.search(r'\b(?i:job)\s+([A-Z0-9_/-]+)\b', statusText)
+        countMatch = re.search(r'\b(\d{8})\b', statusText)
+        return {
+            'statusText': statusText,
+            'jobName': nameMatch.group(1) if nameMatch else None,
+            'jobCount': countMatch.group(1) if countMatch else None,
+        }
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return {'statusText': '', 'jobName': None, 'jobCount': None}
+
+
+# ? ==========================================================================================
+
+
+def get_list_screen_grid(session: object, containerId: str = "wnd[0]/usr"):
+    """
+    Este método realiza a leitura de uma tela de lista do SAP Gui (SP02, SMX...) em uma única enumeração dos itens do container, convertendo o id de cada label (lbl[coluna,linha]) em uma grade linha/coluna. Substitui as consultas FindById por linha/coluna, cada uma com uma chamada COM ao SAP Gui
+    ATENÇÃO: somente os itens visíveis na tela são retornados (para a lista completa ver get_list_screen_pages)
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+        containerId (str): id do container da lista (por default wnd[0]/usr)
+
+    Returns:
+        object: contendo linha, coluna e texto de cada label [Exemplo: {3: {2: '56699555', 14: 'IW67_MEDL'}}]
+    """
+
+    labelRegex = r'lbl\[(\d+),(\d+)\]'
+    grid = {}
+    for item in session.findById(containerId).Children:
+        match = re.search(labelRegex, item.id)
+        if match is None:
+            continue
+        column, row = int(match.group(1)), int(match.group(2))
+        grid.setdefault(row, {})[column] = item.text.strip()
+
+    return grid
+
+
+def iterate_list_screen_pages(session: object, containerId: str = "wnd[0]/usr"):
+    """
+    Este método percorre todas as páginas de uma tela de lista do SAP Gui (SP02, SMX...) com os botões de primeira página, próxima página e última página, retornando a cada página a posição da barra de rolagem (VerticalScrollbar.Position) e a grade dos itens visíveis. Permite tanto a leitura quanto a seleção de linhas (checkbox) página a página
+    ATENÇÃO: sem barra de rolagem disponível somente a página visível é retornada (posição 0)
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+        containerId (str): id do container da lista (por default wnd[0]/usr)
+
+    Returns:
+        generator: tupla com a posição da primeira linha visível e a grade da página (ver get_list_screen_grid)
+    """
+
+    try:
+        session.findById("wnd[0]/tbar[0]/btn[83]").press()  # last page
+        lastPosition = session.findById(containerId).VerticalScrollbar.Position
+        session.findById("wnd[0]/tbar[0]/btn[80]").press()  # first page
+        position = session.findById(containerId).VerticalScrollbar.Position
+
+    except Exception:
+        yield 0, get_list_screen_grid(session, containerId)
+        return
+
+    while True:
+        yield position, get_list_screen_grid(session, containerId)
+
+        if position >= lastPosition:
+            break
+
+        session.findById("wnd[0]/tbar[0]/btn[82]").press()  # next page
+        nextPosition = session.findById(containerId).VerticalScrollbar.Position
+        if nextPosition <= position:
+            break
+        position = nextPosition
+
+
+def get_list_screen_pages(session: object, firstDataRow: int = 3, containerId: str = "wnd[0]/usr"):
+    """
+    Este método realiza a leitura completa de uma tela de lista do SAP Gui (SP02, SMX...), percorrendo todas as páginas (ver iterate_list_screen_pages). As linhas de dados de cada página são posicionadas pela barra de rolagem, eliminando as linhas repetidas entre páginas
+    ATENÇÃO: as linhas de cabeçalho (anteriores a firstDataRow) são fixas e retornadas a partir da primeira página
+
+    Args:
+        session (object): objeto de conexão com o SAP Gui
+        firstDataRow (int): primeira linha de dados da lista (linhas anteriores correspondem ao cabeçalho)
+        containerId (str): id do container da lista (por default wnd[0]/usr)
+
+    Returns:
+        object: contendo linha, coluna e texto de cada label (linhas de dados numeradas de forma contínua entre páginas) [Exemplo: {3: {2: '56699555', 14: 'IW67_MEDL'}}]
+    """
+
+    grid = {}
+    for position, pageGrid in iterate_list_screen_pages(session, containerId):
+        for row, columns in pageGrid.items():
+            if row < firstDataRow:
+                grid.setdefault(row, columns)
+            else:
+                grid[row + position] = columns
+
+    return grid
+
+
+def get_list_column_index(grid: dict, columnTitle: list):
+    """
+    Este método realiza a identificação do índice da coluna de cada título a partir da grade de uma tela de lista (ver get_list_screen_grid), sem novas chamadas ao SAP Gui
+
+    Args:
+        grid (dict): grade linha/coluna da tela de lista
+        columnTitle (list): lista de títulos para consulta
+
+    Returns:
+        object: contendo título e índice da coluna (index) [Exemplo: {Status: 4}]
+    """
+
+    columnIndex = {}
+    for row in sorted(grid):
+        for column, text in grid[row].items():
+            for title in columnTitle:
+                if title not in columnIndex and text.upper() == title.upper():
+                    columnIndex[title] = column
+        if len(columnIndex) == len(columnTitle):
+            break
+
+    return columnIndex
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import argparse
+import logging
+import datetime
+import threading
+import http.server
+import env
+import sap
+import main
+import utils
+import tracing
+import logQueue
+import multitask
+
+# ? Informações: módulo responsável pelo modo serviço: processo residente que executa as atualizações agendadas mantendo o Python, as sessões SAP conectadas e os processos de trabalho (multitask.WorkerPool) entre as execuções, com estado de saúde e estatísticas da última execução
+
+# Agendamento das atualizações: nome, métodos executados no ciclo (ver main.run_update_cycle) e intervalo (segundos) entre os inícios das execuções
+SERVICE_SCHEDULE = {
+    'IW67_MEDL': ([main.run_update_IW67_MEDL], 60 * 60),
+    'IW67_MEDE': ([main.run_update_IW67_MEDE], 6 * 60 * 60),
+}
+
+# Executa todas as atualizações ao iniciar o serviço (False = primeira execução após o intervalo)
+SERVICE_RUN_ON_START = True
+
+# Intervalo (segundos) de verificação das atualizações pendentes
+SERVICE_POLL_SECONDS = 5
+
+# Arquivo .json do estado do serviço, no diretório dos dados importados (env.DIR_EXPORTED_DATA)
+SERVICE_STATUS_FILE_NAME = 'service_status.json'
+
+# Porta do endpoint de saúde (GET http://127.0.0.1:<porta>/health). None = somente o arquivo de estado
+SERVICE_HEALTH_PORT = 8765
+
+SERVICE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class UpdateService:
+
+    """
+    Esta classe representa o serviço residente de atualização. As atualizações são executadas uma de cada vez, na thread principal: uma atualização pendente durante outra execução aguarda o fim da execução atual e os agendamentos perdidos nesse intervalo são agrupados em uma única execução (sem acúmulo)
+
+    A classe UpdateService faz o seguinte:
+        - Executa as atualizações conforme SERVICE_SCHEDULE
+        - Mantém o estado do serviço e as estatísticas de cada atualização (arquivo .json e endpoint de saúde)
+    """
+
+    def __init__(self, schedule: dict = SERVICE_SCHEDULE, runOnStart: bool = SERVICE_RUN_ON_START):
+        """
+        Este é o método construtor da classe UpdateService.
+
+        Args:
+            schedule (dict): agendamento das atualizações [Exemplo: {'IW67_MEDL': ([main.run_update_IW67_MEDL], 3600)}]
+            runOnStart (bool): se True, executa todas as atualizações ao iniciar o serviço
+        """
+
+        now = time.time()
+        self.schedule = schedule
+        self.nextRuns = {name: now if runOnStart else now + intervalSeconds for name, (_, intervalSeconds) in schedule.items()}
+        self.lock = threading.Lock()
+        self.stopEvent = threading.Event()
+        self.httpServer = None
+        self.status = {
+            'status': 'starting',
+            'pid': os.getpid(),
+            'startedAt': time.strftime(SERVICE_DATETIME_FORMAT),
+            'currentUpdate': None,
+            'updates': {name: {'runs': 0, 'failures': 0, 'coalescedRuns': 0, 'lastStart': None, 'lastEnd': None, 'lastSeconds': None, 'lastResult': None, 'lastError': None, 'nextRun': None} for name in schedule},
+        }
+
+    def get_status(self):
+        """
+        Este método retorna o estado do serviço e as estatísticas de cada atualização
+
+        Returns:
+            object: estado do serviço [Exemplo: {'status': 'idle', 'currentUpdate': None, 'updates': {'IW67_MEDL': {'runs': 3, 'lastResult': 'success', ...}}}]
+        """
+
+        with self.lock:
+            for name, nextRun in self.nextRuns.items():
+                self.status['updates'][name]['nextRun'] = time.strftime(SERVICE_DATETIME_FORMAT, time.localtime(nextRun))
+            self.status['checkedAt'] = time.strftime(SERVICE_DATETIME_FORMAT)
+            return json.loads(json.dumps(self.status))
+
+    def __save_status(self):
+
+        filePath = os.path.join(env.DIR_EXPORTED_DATA, SERVICE_STATUS_FILE_NAME)
+        with open(f'{filePath}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self.get_status(), file, indent=2)
+        os.replace(f'{filePath}.tmp', filePath)
+
+    def __start_health_server(self, port: int):
+
+        service = self
+
+        class HealthRequestHandler(http.server.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/health'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(service.get_status(), indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args):
+                pass
+
+        self.httpServer = http.server.ThreadingHTTPServer(('127.0.0.1', port), HealthRequestHandler)
+        threading.Thread(target=self.httpServer.serve_forever, daemon=True).start()
+        print(f'Health endpoint listening on http://127.0.0.1:{port}/health')
+
+    def __run_update(self, name: str):
+
+        updateFunctions, intervalSeconds = self.schedule[name]
+        start = time.time()
+        with self.lock:
+            stats = self.status['updates'][name]
+            self.status['status'] = 'running'
+            self.status['currentUpdate'] = name
+            stats['lastStart'] = time.strftime(SERVICE_DATETIME_FORMAT, time.localtime(start))
+        self.__save_status()
+
+        result, error = 'success', None
+        try:
+            with tracing.span('service_run', update=name):
+                main.run_update_cycle(updateFunctions)
+        except Exception as e:
+            result, error = 'failed', str(e)
+            logging.exception(f'Scheduled update {name} failed')
+
+        end = time.time()
+        with self.lock:
+            # agendamentos perdidos durante a execução são agrupados na próxima execução
+            scheduledSlots = int((end - self.nextRuns[name]) // intervalSeconds) + 1
+            self.nextRuns[name] += scheduledSlots * intervalSeconds
+            stats['runs'] += 1
+            stats['failures'] += result == 'failed'
+            stats['coalescedRuns'] += scheduledSlots - 1
+            stats['lastEnd'] = time.strftime(SERVICE_DATETIME_FORMAT, time.localtime(end))
+            stats['lastSeconds'] = round(end - start, 1)
+            stats['lastResult'] = result
+            stats['lastError'] = error
+            self.status['status'] = 'idle'
+            self.status['currentUpdate'] = None
+        self.__save_status()
+        logQueue.flush_logging()
+
+    def run(self, healthPort: int | None = SERVICE_HEALTH_PORT):
+        """
+        Este método executa o serviço até a interrupção (Ctrl+C) ou stop. Os processos de trabalho persistentes são iniciados para as sessões SAP (main.PARALLEL_MODE = 'process') e as sessões conectadas são reutilizadas entre as execuções
+        ATENÇÃO: o log deve estar iniciado (ver logQueue.start_logging) antes da execução
+
+        Args:
+            healthPort (int | None): porta do endpoint de saúde (None = somente o arquivo de estado)
+        """
+
+        sap.enable_session_cache()
+        if main.PARALLEL_MODE == 'process':
+            multitask.start_worker_pool(main.QTD_SESSIONS, sap.enable_session_cache)
+        if healthPort is not None:
+            self.__start_health_server(healthPort)
+
+        utils.print_start_block(f'Starting update service [{", ".join(self.schedule)}]')
+        self.status['status'] = 'idle'
+        self.__save_status()
+        try:
+            while not self.stopEvent.is_set():
+                now = time.time()
+                dueNames = sorted((name for name, nextRun in self.nextRuns.items() if nextRun <= now), key=lambda name: self.nextRuns[name])
+                for name in dueNames:
+                    if self.stopEvent.is_set():
+                        break
+                    self.__run_update(name)
+                self.stopEvent.wait(SERVICE_POLL_SECONDS)
+
+        except KeyboardInterrupt:
+            print(utils.CustomMessage.prYellow('Update service interrupted'))
+
+        finally:
+            self.status['status'] = 'stopped'
+            self.__save_status()
+            if self.httpServer is not None:
+                self.httpServer.shutdown()
+            multitask.stop_worker_pool()
+            utils.print_end_block(f'Stopped update service at {datetime.datetime.now().strftime(SERVICE_DATETIME_FORMAT)}')
+
+    def stop(self):
+        """
+        Este método solicita o encerramento do serviço ao fim da atualização em execução
+        """
+
+        self.stopEvent.set()
+
+
+# ! ----------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Resident update service: scheduled IW67 updates with warm SAP sessions and worker processes')
+    parser.add_argument('--port', type=int, default=SERVICE_HEALTH_PORT, help='health endpoint port on 127.0.0.1 (0 = disabled)')
+    parser.add_argument('--no-run-on-start', action='store_true', help='wait one interval before the first run of each update')
+    parser.add_argument('--status', action='store_true', help='print the last saved service status and exit')
+    args = parser.parse_args()
+
+    if args.status:
+        with open(os.path.join(env.DIR_EXPORTED_DATA, SERVICE_STATUS_FILE_NAME), encoding='utf-8') as file:
+            print(json.dumps(json.load(file), indent=2))
+
+    else:
+        logQueue.start_logging()
+        try:
+            UpdateService(runOnStart=not args.no_run_on_start).run(args.port or None)
+
+        finally:
+            logQueue.stop_logging()
@@ -0,0 +1,927 @@
+import os
+import re
+import time
+import random
+import datetime
+import threading
+import pyperclip
+import env
+
+# ? Informações: módulo responsável pela simulação (em processo) do SAP GUI Scripting, utilizada no benchmark offline das rotinas de sap, background e UpdateData (ver benchmark.py)
+
+# Colunas (título e largura) do relatório IW67 exportado em arquivo .txt [SP02]
+IW67_SPOOL_COLUMNS = [
+    ('Nota', 12),
+    ('CóMd', 4),
+    ('StatSist', 20),
+    ('Exec.por', 12),
+    ('Texto das medidas', 40),
+    ('Localiz.', 8),
+    ('Criado/a', 12),
+    ('Dt.criação', 10),
+    ('Concl.por', 12),
+    ('Concluído', 10),
+    ('Iníc.planj', 10),
+    ('Fim plan.', 10),
+    ('Medi', 4),
+    ('LocInstal.', 30),
+]
+
+IW67_MEASUREMENT_TEXTS = ['Inspecionar equipamento', 'Substituir componente', 'Verificar isolamento', 'Realizar limpeza', 'Ajustar proteção', 'Medir temperatura']
+
+# Layout das telas de lista simuladas: coluna (lbl[coluna,linha]) de cada título no cabeçalho
+SMX_LIST_COLUMNS = {1: 'Nome do job', 24: 'ID do job', 35: 'Status', 47: 'Data início', 59: 'Hora início'}
+SP02_LIST_COLUMNS = {3: 'Nº spool', 14: 'Tipo', 22: 'Data', 33: 'Título', 70: 'Páginas'}
+
+# Linha do cabeçalho e primeira linha de dados das telas de lista simuladas [SP02/SMX]
+LIST_HEADER_ROW = 1
+LIST_FIRST_DATA_ROW = 3
+
+# Campos da tela de seleção IW67 (id relativo a wnd[0]/usr e tipo) e valores preenchidos ao abrir a transação
+IW67_SELECTION_FIELDS = [
+    ('ctxtQMART-LOW', 'GuiCTextField'),
+    ('ctxtIWERK-LOW', 'GuiCTextField'),
+    ('ctxtERDAT-LOW', 'GuiCTextField'),
+    ('ctxtERDAT-HIGH', 'GuiCTextField'),
+    ('ctxtERLDAT-LOW', 'GuiCTextField'),
+    ('ctxtERLDAT-HIGH', 'GuiCTextField'),
+    ('ctxtMNCOD-LOW', 'GuiCTextField'),
+    ('ctxtMNCOD-HIGH', 'GuiCTextField'),
+    ('txtQMNUM-LOW', 'GuiTextField'),
+    ('ctxtVARIANT', 'GuiCTextField'),
+]
+
+# Parâmetros de impressão padrão do usuário (aplicados a cada abertura de transação)
+DEFAULT_PRINT_PARAMS = {'PDEST': 'LOCL', 'PAART': 'X_65_132', 'LINCT': '65', 'PRTXT': ''}
+
+PRINT_PROPERTIES_ID = 'usr/tabsTABSTRIP/tabpTAB2/ssubSUBSCREEN:SAPLSPRI:0500'
+
+
+class SimulatorError(Exception):
+
+    """
+    Exceção lançada pelos objetos simulados nas mesmas situações em que o SAP GUI Scripting lança com_error (controle não encontrado, campo não modificável...)
+    """
+
+    pass
+
+
+def __format_spool_line(values: list):
+
+    return '|' + '|'.join(str(value)[:width].ljust(width) for value, (_, width) in zip(values, IW67_SPOOL_COLUMNS)) + '|'
+
+
+def __get_spool_page_header(page: int, width: int, columnNames: list):
+
+    return [
+        f'{datetime.date.today().strftime("%d.%m.%Y")}  Lista de medidas'.ljust(width - 10) + f'{page:>10}',
+        '',
+        '-' * width,
+        __format_spool_line(columnNames),
+        '-' * width,
+    ]
+
+
+def generate_iw67_spool_lines(params: list, rowsPerParam: int, status: str = 'MEDL', linesPerPage: int = 65, seed: int = 0, columnAliases: dict | None = None, markerRate: float = 0.0,
+                              emptyRowRate: float = 0.0):
+    """
+    Este método gera as linhas de uma ordem spool sintética do relatório IW67 (mesmo layout do arquivo .txt exportado pela SP02), com o cabeçalho repetido a cada página (linesPerPage = PRI_PARAMS-LINCT)
+
+    Args:
+        params (list): códigos de medida consultados (MNCOD) [Exemplo: ['0380', '0030']]
+        rowsPerParam (int): quantidade de linhas de dados por código de medida
+        status (str): status de sistema das medidas (MEDL = pendentes, MEDE = concluídas)
+        linesPerPage (int): quantidade de linhas por página da ordem spool
+        seed (int): semente dos valores aleatórios (mesma semente = mesmo conteúdo)
+        columnAliases (dict | None): títulos alternativos das colunas no cabeçalho [Exemplo: {'Texto das medidas': 'TextoMedid'}]
+        markerRate (float): proporção de linhas com marcador "X" avulso (fora do layout da tabela) inseridas entre as linhas de dados
+        emptyRowRate (float): proporção de linhas de dados vazias (somente separadores) inseridas entre as linhas de dados
+
+    Returns:
+        list: linhas da ordem spool (sem quebra de linha)
+    """
+
+    rng = random.Random(seed)
+    width = len(__format_spool_line([''] * len(IW67_SPOOL_COLUMNS)))
+    columnNames = [(columnAliases or {}).get(name, name) for name, _ in IW67_SPOOL_COLUMNS]
+    pageHeader = __get_spool_page_header(1, width, columnNames)
+    rowsPerPage = max(1, linesPerPage - len(pageHeader) - 1)
+
+    lines = []
+    page = 0
+    pageRows = rowsPerPage
+    for param in params:
+        for index in range(rowsPerParam):
+            if pageRows >= rowsPerPage:
+                if page > 0:
+                    lines.append('-' * width)
+                page += 1
+                pageRows = 0
+                lines.extend(__get_spool_page_header(page, width, columnNames))
+
+            created = datetime.date(2021, 1, 1) + datetime.timedelta(days=rng.randint(0, 1000))
+            planned = created + datetime.timedelta(days=rng.randint(0, 30))
+            finished = status == 'MEDE'
+            lines.append(__format_spool_line([
+                str(rng.randint(200000000, 299999999)),
+                param,
+                status,
+                f'U{rng.randint(1000, 9999)}',
+                rng.choice(IW67_MEASUREMENT_TEXTS),
+                str(rng.randint(1, 9999)),
+                f'U{rng.randint(1000, 9999)}',
+                created.strftime('%d.%m.%Y'),
+                f'U{rng.randint(1000, 9999)}' if finished else '',
+                (planned + datetime.timedelta(days=rng.randint(0, 10))).strftime('%d.%m.%Y') if finished else '',
+                planned.strftime('%d.%m.%Y'),
+                (planned + datetime.timedelta(days=7)).strftime('%d.%m.%Y'),
+                str(index + 1),
+                f'BR-{rng.randint(100, 999)}-EQ-{rng.randint(1000, 9999)}',
+            ]))
+            pageRows += 1
+
+            if markerRate and rng.random() < markerRate:
+                lines.append('X')
+            if emptyRowRate and rng.random() < emptyRowRate:
+                lines.append(__format_spool_line([''] * len(IW67_SPOOL_COLUMNS)))
+
+    if page > 0:
+        lines.append('-' * width)
+
+    return lines
+
+
+# ? ==========================================================================================
+
+
+class _GuiComponent:
+
+    """
+    Esta classe representa um objeto simulado do SAP GUI Scripting. Os membros públicos (propriedades e métodos COM) são resolvidos sem diferenciar maiúsculas e minúsculas (como no COM) e cada acesso é contabilizado como uma chamada COM, aplicando a latência configurada no simulador
+    ATENÇÃO: membros iniciados por "_" são internos ao simulador (não contabilizados)
+    """
+
+    def __init__(self, simulator: object, session: object = None, relativeId: str = ''):
+        object.__setattr__(self, '_simulator', simulator)
+        object.__setattr__(self, '_session', session)
+        object.__setattr__(self, '_relativeId', relativeId)
+
+    def __getattribute__(self, name: str):
+        if name.startswith('_'):
+            return object.__getattribute__(self, name)
+        object.__getattribute__(self, '_simulator')._record_call(name)
+        return object.__getattribute__(self, name.lower())
+
+    def __setattr__(self, name: str, value: any):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+            return
+        object.__getattribute__(self, '_simulator')._record_call(name)
+        if not hasattr(type(self), name.lower()):
+            raise AttributeError(name)
+        object.__setattr__(self, name.lower(), value)
+
+    @property
+    def id(self):
+        return f'{self._session._id}/{self._relativeId}' if self._session is not None else self._relativeId
+
+    @property
+    def type(self):
+        return type(self).__name__.lstrip('_')
+
+
+class GuiButton(_GuiComponent):
+
+    def __init__(self, simulator: object, session: object, relativeId: str, action: any):
+        super().__init__(simulator, session, relativeId)
+        self._action = action
+
+    def press(self):
+        self._simulator._round_trip()
+        self._action()
+
+
+class GuiMenu(GuiButton):
+
+    def select(self):
+        self._simulator._round_trip()
+        self._action()
+
+
+class GuiTextField(_GuiComponent):
+
+    def __init__(self, simulator: object, session: object, relativeId: str, store: dict, key: str, fieldType: str = 'GuiTextField', changeable: any = None):
+        super().__init__(simulator, session, relativeId)
+        self._store = store
+        self._key = key
+        self._fieldType = fieldType
+        self._changeable = changeable
+
+    @property
+    def type(self):
+        return self._fieldType
+
+    @property
+    def text(self):
+        return self._store.get(self._key, '')
+
+    @text.setter
+    def text(self, value: str):
+        if self._changeable is not None and not self._changeable():
+            raise SimulatorError(f'Field not changeable: {self._relativeId}')
+        self._store[self._key] = str(value)
+
+
+class GuiCheckBox(_GuiComponent):
+
+    def __init__(self, simulator: object, session: object, relativeId: str, getter: any, setter: any):
+        super().__init__(simulator, session, relativeId)
+        self._getter = getter
+        self._setter = setter
+
+    @property
+    def selected(self):
+        return self._getter()
+
+    @selected.setter
+    def selected(self, value: bool):
+        self._setter(bool(value))
+
+
+class GuiLabel(_GuiComponent):
+
+    def __init__(self, simulator: object, session: object, relativeId: str, text: str):
+        super().__init__(simulator, session, relativeId)
+        self._text = text
+
+    @property
+    def text(self):
+        return self._text
+
+
+class GuiStatusbar(_GuiComponent):
+
+    @property
+    def text(self):
+        return self._session._statusText
+
+
+class GuiScrollbar(_GuiComponent):
+
+    @property
+    def position(self):
+        return self._session._listPosition
+
+    @position.setter
+    def position(self, value: int):
+        self._session._set_list_position(int(value))
+
+    @property
+    def maximum(self):
+        return self._session._get_last_list_position()
+
+
+class GuiShell(_GuiComponent):
+
+    def doubleclickitem(self, key: str, column: str):
+        self._simulator._round_trip()
+        self._session._propertyNode = key
+
+    def expandnode(self, key: str):
+        self._simulator._round_trip()
+
+
+class GuiUserArea(_GuiComponent):
+
+    @property
+    def children(self):
+        return self._session._get_user_area_children()
+
+    @property
+    def verticalscrollbar(self):
+        return GuiScrollbar(self._simulator, self._session, f'{self._relativeId}/verticalScrollbar')
+
+
+class GuiSessionInfo(_GuiComponent):
+
+    @property
+    def systemname(self):
+        return self._simulator.systemName
+
+    @property
+    def user(self):
+        return self._simulator.user
+
+    @property
+    def sessionnumber(self):
+        return self._session._sessionNumber
+
+    @property
+    def transaction(self):
+        return self._session._transaction
+
+
+class GuiSession(_GuiComponent):
+
+    """
+    Esta classe representa uma sessão (tela) simulada do SAP GUI, com as transações IW67 (tela de seleção e execução em background), SMX (lista de jobs) e SP02 (lista de ordens spool)
+
+    A classe GuiSession faz o seguinte:
+        - Resolve os ids (findById) conforme a transação e as janelas (popups) abertas
+        - Mantém o estado da tela: campos, seleção múltipla, parâmetros de impressão, página e seleção das listas
+    """
+
+    def __init__(self, simulator: object, sessionNumber: int):
+        super().__init__(simulator)
+        self._sessionNumber = sessionNumber
+        self._id = f'/app/con[0]/ses[{sessionNumber - 1}]'
+        self._transaction = 'SESSION_MANAGER'
+        self._statusText = ''
+        self._popups = []
+        self._reset_screen()
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return f'ses[{self._sessionNumber - 1}]'
+
+    @property
+    def info(self):
+        return GuiSessionInfo(self._simulator, self)
+
+    def starttransaction(self, transaction: str):
+        self._simulator._round_trip(self._simulator.transactionSeconds)
+        self._transaction = transaction.upper()
+        self._popups = []
+        self._statusText = ''
+        self._reset_screen()
+
+    def findbyid(self, id: str, raiseError: bool = True):
+        relativeId = id[id.index('wnd['):] if 'wnd[' in id else id
+        component = self._resolve(relativeId)
+        if component is None and raiseError:
+            raise SimulatorError(f'The control could not be found by id: {id}')
+        return component
+
+    # ? ===================
+
+    def _reset_screen(self):
+
+        self._fields = {}
+        self._checks = {'chkDY_QMSM': False}
+        self._multiSelect = []
+        self._pendingMultiSelect = []
+        self._popupFields = {}
+        self._printParams = dict(DEFAULT_PRINT_PARAMS)
+        self._pendingPrintParams = {}
+        self._propertyNode = None
+        self._startImmediately = False
+        self._listItems = []
+        self._listPosition = 0
+        self._listSelection = set()
+
+        if self._transaction == 'IW67':
+            today = datetime.date.today()
+            self._fields['ctxtERDAT-LOW'] = today.replace(day=1).strftime('%d.%m.%Y')
+            self._fields['ctxtERDAT-HIGH'] = today.strftime('%d.%m.%Y')
+        elif self._transaction in ('SMX', 'SP02'):
+            self._refresh_list()
+
+    def _refresh_list(self):
+
+        self._simulator._round_trip()
+        if self._transaction == 'SMX':
+            self._listItems = self._simulator._get_job_list_items()
+        elif self._transaction == 'SP02':
+            self._listItems = self._simulator._get_spool_list_items()
+        self._listSelection &= {item['key'] for item in self._listItems}
+        self._set_list_position(self._listPosition)
+
+    def _get_last_list_position(self):
+
+        return max(0, len(self._listItems) - self._simulator.visibleRows)
+
+    def _set_list_position(self, position: int):
+
+        self._listPosition = max(0, min(position, self._get_last_list_position()))
+
+    def _set_list_page(self, page: str):
+
+        self._simulator._round_trip()
+        positions = {
+            'first': 0,
+            'previous': self._listPosition - self._simulator.visibleRows,
+            'next': self._listPosition + self._simulator.visibleRows,
+            'last': self._get_last_list_position(),
+        }
+        self._set_list_position(positions[page])
+
+    def _get_visible_list_items(self):
+
+        return self._listItems[self._listPosition:self._listPosition + self._simulator.visibleRows]
+
+    def _get_list_item(self, row: int):
+
+        index = self._listPosition + row - LIST_FIRST_DATA_ROW
+        if row < LIST_FIRST_DATA_ROW or row - LIST_FIRST_DATA_ROW >= self._simulator.visibleRows or index >= len(self._listItems):
+            return None
+        return self._listItems[index]
+
+    def _get_list_labels(self):
+
+        if not self._listItems:
+            return {(2, LIST_FIRST_DATA_ROW): 'Lista não contém dados'}
+
+        columns = SMX_LIST_COLUMNS if self._transaction == 'SMX' else SP02_LIST_COLUMNS
+        labels = {(column, LIST_HEADER_ROW): title for column, title in columns.items()}
+        for offset, item in enumerate(self._get_visible_list_items()):
+            for column, text in item['columns'].items():
+                labels[(column, LIST_FIRST_DATA_ROW + offset)] = text
+
+        return labels
+
+    def _get_user_area_children(self):
+
+        children = []
+        if self._transaction == 'IW67':
+            for name, fieldType in IW67_SELECTION_FIELDS:
+                children.append(GuiTextField(self._simulator, self, f'wnd[0]/usr/{name}', self._fields, name, fieldType))
+            children.append(self._get_check_box('wnd[0]/usr/chkDY_QMSM', self._checks, 'chkDY_QMSM'))
+            children.append(GuiButton(self._simulator, self, 'wnd[0]/usr/btn%_MNCOD_%_APP_%-VALU_PUSH', self._open_multi_select))
+
+        elif self._transaction in ('SMX', 'SP02'):
+            for (column, row), text in self._get_list_labels().items():
+                if self._transaction == 'SP02' and column == min(SP02_LIST_COLUMNS) and row >= LIST_FIRST_DATA_ROW and self._listItems:
+                    children.append(self._get_list_check_box(row))
+                children.append(GuiLabel(self._simulator, self, f'wnd[0]/usr/lbl[{column},{row}]', text))
+
+        return children
+
+    def _get_check_box(self, relativeId: str, store: dict, key: str):
+
+        return GuiCheckBox(self._simulator, self, relativeId, lambda: store.get(key, False), lambda value: store.__setitem__(key, value))
+
+    def _get_list_check_box(self, row: int):
+
+        def setSelected(value: bool):
+            item = self._get_list_item(row)
+            if item is None:
+                return
+            if value:
+                self._listSelection.add(item['key'])
+            else:
+                self._listSelection.discard(item['key'])
+
+        def isSelected():
+            item = self._get_list_item(row)
+            return item is not None and item['key'] in self._listSelection
+
+        return GuiCheckBox(self._simulator, self, f'wnd[0]/usr/chk[1,{row}]', isSelected, setSelected)
+
+    # ? ===================
+
+    def _resolve(self, relativeId: str):
+
+        window, _, path = relativeId.partition('/')
+        if window == 'wnd[0]':
+            return self._resolve_main_window(relativeId, path)
+
+        match = re.fullmatch(r'wnd\[(\d+)\]', window)
+        if match is None or int(match.group(1)) > len(self._popups):
+            return None
+        return self._resolve_popup(relativeId, self._popups[int(match.group(1)) - 1], path)
+
+    def _resolve_main_window(self, relativeId: str, path: str):
+
+        if path == 'sbar':
+            return GuiStatusbar(self._simulator, self, relativeId)
+        if path == 'usr':
+            return GuiUserArea(self._simulator, self, relativeId)
+
+        actions = {}
+        if self._transaction in ('SMX', 'SP02'):
+            actions['tbar[0]/btn[80]'] = lambda: self._set_list_page('first')
+            actions['tbar[0]/btn[81]'] = lambda: self._set_list_page('previous')
+            actions['tbar[0]/btn[82]'] = lambda: self._set_list_page('next')
+            actions['tbar[0]/btn[83]'] = lambda: self._set_list_page('last')
+            actions['tbar[1]/btn[14]'] = self._open_delete_confirmation
+
+        if self._transaction == 'IW67':
+            actions['tbar[1]/btn[17]'] = lambda: self._open_popup('variant')
+            actions['usr/btn%_MNCOD_%_APP_%-VALU_PUSH'] = self._open_multi_select
+            actions['mbar/menu[0]/menu[2]'] = self._open_print_parameters
+        elif self._transaction == 'SMX':
+            actions['tbar[1]/btn[8]'] = self._refresh_list
+            actions['mbar/menu[1]/menu[11]'] = self._select_all_list_items
+        elif self._transaction == 'SP02':
+            actions['tbar[1]/btn[45]'] = self._refresh_list
+            actions['tbar[1]/btn[48]'] = self._select_all_list_items
+            actions['mbar/menu[0]/menu[2]/menu[1]'] = self._export_selected_spools
+
+        if path in actions:
+            componentType = GuiMenu if path.startswith('mbar') else GuiButton
+            return componentType(self._simulator, self, relativeId, actions[path])
+
+        name = path[len('usr/'):] if path.startswith('usr/') else None
+        if name is None:
+            return None
+
+        if self._transaction == 'IW67':
+            fieldTypes = dict(IW67_SELECTION_FIELDS)
+            if name in fieldTypes:
+                return GuiTextField(self._simulator, self, relativeId, self._fields, name, fieldTypes[name])
+            if name in self._checks:
+                return self._get_check_box(relativeId, self._checks, name)
+
+        elif self._transaction in ('SMX', 'SP02'):
+            match = re.fullmatch(r'(lbl|chk)\[(\d+),(\d+)\]', name)
+            if match is None:
+                return None
+            column, row = int(match.group(2)), int(match.group(3))
+            if match.group(1) == 'chk':
+                return self._get_list_check_box(row) if self._transaction == 'SP02' and self._get_list_item(row) is not None else None
+            text = self._get_list_labels().get((column, row))
+            return GuiLabel(self._simulator, self, relativeId, text) if text is not None else None
+
+        return None
+
+    def _resolve_popup(self, relativeId: str, popup: str, path: str):
+
+        buttons = {}
+        fields = {}
+        if popup == 'variant':
+            fields = {'usr/txtENAME-LOW': ('ENAME', None), 'usr/txtV-LOW': ('VARIANT', None)}
+            buttons['tbar[0]/btn[8]'] = self._apply_variant
+
+        elif popup == 'multi_select':
+            buttons['tbar[0]/btn[16]'] = self._pendingMultiSelect.clear
+            buttons['tbar[0]/btn[24]'] = self._paste_multi_select
+            buttons['tbar[0]/btn[8]'] = self._confirm_multi_select
+
+        elif popup == 'print':
+            fields = {'usr/ctxtPRI_PARAMS-PDEST': ('PDEST', None)}
+            buttons['tbar[0]/btn[6]'] = lambda: self._open_popup('print_properties')
+            buttons['tbar[0]/btn[13]'] = self._confirm_print_parameters
+
+        elif popup == 'print_properties':
+            if path == f'{PRINT_PROPERTIES_ID}/cntlCUSTOM/shellcont/shell':
+                return GuiShell(self._simulator, self, relativeId)
+            subscreen = f'{PRINT_PROPERTIES_ID}/ssubSUBSCREEN:SAPLSPRI:0600'
+            if self._propertyNode == 'PAART':
+                fields[f'{subscreen}/txtPRI_PARAMS-LINCT'] = ('LINCT', lambda: self._pendingPrintParams.get('PDEST', '') == '')
+            elif self._propertyNode == 'PRTXT':
+                fields[f'{subscreen}/txtPRI_PARAMS-PRTXT'] = ('PRTXT', None)
+            buttons['tbar[0]/btn[13]'] = self._close_popup
+
+        elif popup == 'start_time':
+            buttons['usr/btnSOFORT_PUSH'] = lambda: setattr(self, '_startImmediately', True)
+            buttons['tbar[0]/btn[11]'] = self._save_job
+
+        elif popup == 'delete_confirmation':
+            buttons['usr/btnSPOP-OPTION1'] = self._delete_selected_list_items
+
+        if path in buttons:
+            return GuiButton(self._simulator, self, relativeId, buttons[path])
+        if path in fields:
+            key, changeable = fields[path]
+            store = self._pendingPrintParams if popup.startswith('print') else self._popupFields
+            fieldType = 'GuiCTextField' if path.split('/')[-1].startswith('ctxt') else 'GuiTextField'
+            return GuiTextField(self._simulator, self, relativeId, store, key, fieldType, changeable)
+
+        return None
+
+    # ? ===================
+
+    def _open_popup(self, popup: str):
+
+        self._popups.append(popup)
+
+    def _close_popup(self):
+
+        self._popups.pop()
+
+    def _apply_variant(self):
+
+        self._fields['ctxtVARIANT'] = self._popupFields.get('VARIANT', '')
+        self._popupFields = {}
+        self._close_popup()
+
+    def _open_multi_select(self):
+
+        self._pendingMultiSelect = list(self._multiSelect)
+        self._open_popup('multi_select')
+
+    def _paste_multi_select(self):
+
+        values = [value.strip() for value in pyperclip.paste().splitlines() if value.strip()]
+        self._pendingMultiSelect.extend(values)
+
+    def _confirm_multi_select(self):
+
+        self._multiSelect = list(self._pendingMultiSelect)
+        self._fields['ctxtMNCOD-LOW'] = self._multiSelect[0] if self._multiSelect else ''
+        self._close_popup()
+
+    def _open_print_parameters(self):
+
+        self._pendingPrintParams = dict(self._printParams)
+        self._propertyNode = None
+        self._open_popup('print')
+
+    def _confirm_print_parameters(self):
+
+        self._printParams = dict(self._pendingPrintParams)
+        self._startImmediately = False
+        self._popups[-1] = 'start_time'
+
+    def _save_job(self):
+
+        if not self._startImmediately:
+            self._statusText = 'Especificar a data de início do job'
+            return
+
+        params = list(self._multiSelect) or [value for value in [self._fields.get('ctxtMNCOD-LOW', '')] if value]
+        status = 'MEDL' if self._checks.get('chkDY_QMSM') else 'MEDE'
+        job = self._simulator._create_job(self._printParams, params, status)
+        self._close_popup()
+        self._statusText = f'Job {job["name"]} liberado (contador {job["count"]})'
+
+    def _select_all_list_items(self):
+
+        self._listSelection = {item['key'] for item in self._listItems}
+
+    def _open_delete_confirmation(self):
+
+        if not self._listSelection:
+            self._statusText = 'Selecionar ao menos uma linha'
+            return
+        self._open_popup('delete_confirmation')
+
+    def _delete_selected_list_items(self):
+
+        if self._transaction == 'SMX':
+            deleted = self._simulator._delete_jobs(self._listSelection)
+            self._statusText = f'{deleted} jobs eliminados'
+        else:
+            deleted = self._simulator._delete_spools(self._listSelection)
+            self._statusText = f'{deleted} ordens spool eliminadas'
+        self._listSelection = set()
+        self._close_popup()
+        self._refresh_list()
+
+    def _export_selected_spools(self):
+
+        if not self._listSelection:
+            self._statusText = 'Selecionar ao menos uma ordem spool'
+            return
+        exported = self._simulator._export_spools(self._listSelection)
+        self._listSelection = set()
+        self._statusText = f'{exported} ordens spool exportadas'
+
+
+class GuiConnection(_GuiComponent):
+
+    @property
+    def sessions(self):
+        return list(self._simulator._sessions)
+
+    @property
+    def children(self):
+        return self.sessions
+
+
+class GuiApplication(_GuiComponent):
+
+    @property
+    def connections(self):
+        return [GuiConnection(self._simulator, None, '/app/con[0]')]
+
+    @property
+    def children(self):
+        return self.connections
+
+
+# ? ==========================================================================================
+
+
+class SapGuiSimulator:
+
+    """
+    Esta classe representa o simulador (em processo) do SAP GUI Scripting, utilizado no lugar do SAP GUI via COM (ver sap.SCRIPTING_ENGINE) para medir e comparar o desempenho das rotinas sem conexão com o SAP
+    ATENÇÃO: as sessões devem ser executadas em threads do mesmo processo (ver main.PARALLEL_MODE). A seleção múltipla utiliza a área de transferência real (pyperclip), como no SAP GUI
+
+    A classe SapGuiSimulator faz o seguinte:
+        - Simula as transações IW67 (execução em background), SMX (jobs) e SP02 (ordens spool e exportação em .txt)
+        - Aplica latência configurável a cada chamada COM e a cada ida ao servidor (botões, menus, transações)
+        - Simula a duração dos jobs e gera as ordens spool sintéticas do relatório IW67 (ver generate_iw67_spool_lines)
+        - Contabiliza as chamadas COM por membro (ver get_call_counts)
+    """
+
+    def __init__(self, sessionCount: int = 6, systemName: str = 'ERP', user: str | None = None, callLatencySeconds: float = 0.001, roundTripSeconds: float = 0.02, transactionSeconds: float = 0.2, jobStartSeconds: float = 1, jobSeconds: float = 5, jobSecondsPerParam: float = 1, rowsPerParam: int = 500, visibleRows: int = 30, spoolDirectory: str | None = None, seed: int = 0):
+        """
+        Este é o método construtor da classe SapGuiSimulator.
+
+        Args:
+            sessionCount (int): quantidade de sessões (telas) abertas
+            systemName (str): nome do sistema SAP (por default ERP)
+            user (str | None): usuário conectado (None = env.USERNAME)
+            callLatencySeconds (float): latência (segundos) de cada chamada COM (propriedade ou método)
+            roundTripSeconds (float): latência (segundos) adicional de cada ida ao servidor (botões, menus, atualização de listas)
+            transactionSeconds (float): latência (segundos) adicional da abertura de uma transação (StartTransaction)
+            jobStartSeconds (float): tempo (segundos) de um job liberado até iniciar a execução
+            jobSeconds (float): tempo (segundos) de execução de um job, sem considerar os parâmetros
+            jobSecondsPerParam (float): tempo (segundos) de execução adicional por parâmetro (código de medida) do job
+            rowsPerParam (int): quantidade de linhas da ordem spool por parâmetro (código de medida) do job
+            visibleRows (int): quantidade de linhas de dados visíveis por página das listas [SP02/SMX]
+            spoolDirectory (str | None): diretório de exportação das ordens spool (None = env.DIR_SPOOL_DATA no momento da exportação)
+            seed (int): semente do conteúdo das ordens spool
+        """
+
+        self.systemName = systemName.upper()
+        self.user = user or env.USERNAME
+        self.callLatencySeconds = callLatencySeconds
+        self.roundTripSeconds = roundTripSeconds
+        self.transactionSeconds = transactionSeconds
+        self.jobStartSeconds = jobStartSeconds
+        self.jobSeconds = jobSeconds
+        self.jobSecondsPerParam = jobSecondsPerParam
+        self.rowsPerParam = rowsPerParam
+        self.visibleRows = visibleRows
+        self.spoolDirectory = spoolDirectory
+        self.seed = seed
+
+        self._lock = threading.RLock()
+        self._callCounts = {}
+        self._callNames = {}
+        self._latencySeconds = 0.0
+        self._jobs = []
+        self._spools = {}
+        self._nextJobCount = 10000000
+        self._nextSpoolNumber = 50000000
+        self._sessions = [GuiSession(self, number + 1) for number in range(sessionCount)]
+
+    def get_scripting_engine(self):
+        """
+        Este método retorna o objeto equivalente ao GetObject('SAPGUI').getScriptingEngine (ver sap.SCRIPTING_ENGINE)
+
+        Returns:
+            object: aplicação simulada do SAP GUI (GuiApplication)
+        """
+
+        return GuiApplication(self)
+
+    def get_call_counts(self):
+        """
+        Este método retorna a quantidade de chamadas COM por membro (propriedade ou método), ordenada pela quantidade
+
+        Returns:
+            object: contendo membro e quantidade de chamadas [Exemplo: {'findById': 1520, 'text': 930}]
+        """
+
+        with self._lock:
+            counts = sorted(self._callCounts.items(), key=lambda item: item[1], reverse=True)
+            return {self._callNames[name]: count for name, count in counts}
+
+    def get_statistics(self):
+        """
+        Este método retorna os totais da simulação: chamadas COM, latência simulada, jobs e ordens spool criados
+
+        Returns:
+            object: contendo os totais [Exemplo: {'comCalls': 5230, 'latencySeconds': 12.4, 'jobs': 6, 'spools': 6, 'exportedRows': 3000}]
+        """
+
+        with self._lock:
+            return {
+                'comCalls': sum(self._callCounts.values()),
+                'latencySeconds': round(self._latencySeconds, 3),
+                'jobs': len(self._jobs),
+                'spools': len(self._spools),
+                'exportedRows': sum(spool['exportedRows'] for spool in self._spools.values()),
+            }
+
+    # ? ===================
+
+    def _record_call(self, name: str):
+
+        with self._lock:
+            key = name.lower()
+            self._callNames.setdefault(key, name)
+            self._callCounts[key] = self._callCounts.get(key, 0) + 1
+            self._latencySeconds += self.callLatencySeconds
+        if self.callLatencySeconds > 0:
+            time.sleep(self.callLatencySeconds)
+
+    def _round_trip(self, seconds: float | None = None):
+
+        seconds = self.roundTripSeconds if seconds is None else seconds
+        with self._lock:
+            self._latencySeconds += seconds
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _create_job(self, printParams: dict, params: list, status: str):
+
+        with self._lock:
+            now = time.time()
+            startAt = now + self.jobStartSeconds
+            job = {
+                'name': 'RIQMEL20',
+                'count': str(self._nextJobCount),
+                'title': printParams.get('PRTXT') or f'RIQMEL20 {self.user}'.upper(),
+                'params': list(params),
+                'status': status,
+                'linesPerPage': int(printParams.get('LINCT') or DEFAULT_PRINT_PARAMS['LINCT']),
+                'createdAt': now,
+                'startAt': startAt,
+                'endAt': startAt + self.jobSeconds + self.jobSecondsPerParam * len(params),
+                'spoolNumber': None,
+            }
+            self._nextJobCount += 1
+            self._jobs.append(job)
+            return job
+
+    def _update_jobs(self):
+
+        now = time.time()
+        for job in self._jobs:
+            if job['spoolNumber'] is None and now >= job['endAt']:
+                job['spoolNumber'] = str(self._nextSpoolNumber)
+                self._spools[job['spoolNumber']] = {'number': job['spoolNumber'], 'job': job, 'createdAt': job['endAt'], 'exportedRows': 0}
+                self._nextSpoolNumber += 1
+
+    def _get_job_status_text(self, job: dict, now: float):
+
+        if now < job['startAt']:
+            return 'Liberado'
+        if now < job['endAt']:
+            return 'Ativo'
+        return 'Concl.'
+
+    def _get_job_list_items(self):
+
+        with self._lock:
+            self._update_jobs()
+            now = time.time()
+            items = []
+            for job in self._jobs:
+                started = datetime.datetime.fromtimestamp(job['startAt'])
+                items.append({'key': job['count'], 'columns': {
+                    1: job['name'],
+                    24: job['count'],
+                    35: self._get_job_status_text(job, now),
+                    47: started.strftime('%d.%m.%Y'),
+                    59: started.strftime('%H:%M:%S'),
+                }})
+            return items
+
+    def _get_spool_list_items(self):
+
+        with self._lock:
+            self._update_jobs()
+            items = []
+            for number, spool in sorted(self._spools.items()):
+                job = spool['job']
+                pages = -(-(self.rowsPerParam * len(job['params'])) // max(1, job['linesPerPage']))
+                items.append({'key': number, 'columns': {
+                    3: number,
+                    14: 'LIST1S',
+                    22: datetime.date.fromtimestamp(spool['createdAt']).strftime('%d.%m.%Y'),
+                    33: job['title'],
+                    70: str(pages),
+                }})
+            return items
+
+    def _delete_jobs(self, jobCounts: set):
+
+        with self._lock:
+            self._update_jobs()
+            now = time.time()
+            deletable = [job for job in self._jobs if job['count'] in jobCounts and self._get_job_status_text(job, now) != 'Ativo']
+            self._jobs = [job for job in self._jobs if job not in deletable]
+            return len(deletable)
+
+    def _delete_spools(self, spoolNumbers: set):
+
+        with self._lock:
+            deleted = [number for number in spoolNumbers if self._spools.pop(number, None) is not None]
+            return len(deleted)
+
+    def _export_spools(self, spoolNumbers: set):
+
+        with self._lock:
+            spools = [self._spools[number] for number in sorted(spoolNumbers) if number in self._spools]
+
+        directory = self.spoolDirectory or env.DIR_SPOOL_DATA
+        for spool in spools:
+            job = spool['job']
+            lines = generate_iw67_spool_lines(job['params'], self.rowsPerParam, job['status'], job['linesPerPage'], self.seed + int(job['count']))
+            self._round_trip()
+            with open(os.path.join(directory, f'spool_{spool["number"]}.txt'), 'w') as file:
+                file.write('\n'.join(lines) + '\n')
+            with self._lock:
+                spool['exportedRows'] = self.rowsPerParam * len(job['params'])
+
+        return len(spools)
@@ -0,0 +1,138 @@
+import os
+import time
+import locale
+import logging
+import tarfile
+import env
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ? Informações: módulo responsável pelo arquivo compactado das ordens spool exportadas de cada execução (um arquivo .tar compactado por execução), permitindo reprocessar uma execução anterior sem nova consulta ao SAP
+
+# Arquivo das ordens spool ativo (False = arquivos exportados são descartados na próxima exportação, ver background.export_files)
+SPOOL_ARCHIVE_ENABLED = False
+
+# Diretório dos arquivos compactados, dentro do diretório dos dados importados (env.DIR_EXPORTED_DATA)
+SPOOL_ARCHIVE_DIRECTORY_NAME = 'spool_archive'
+
+# Compactação dos arquivos: 'zstd' (pacote zstandard, se instalado) ou 'gzip'
+SPOOL_ARCHIVE_COMPRESSION = 'zstd'
+
+# Quantidade de execuções mantidas por atualização de dados (None = sem limite)
+SPOOL_ARCHIVE_MAX_RUNS = 30
+
+# Codificação dos arquivos spool exportados pelo SAP Gui (a mesma utilizada na leitura dos arquivos, ver fileCrud.import_spool_file_data)
+SPOOL_FILE_ENCODING = locale.getpreferredencoding(False)
+
+SPOOL_ARCHIVE_EXTENSIONS = {'zstd': '.tar.zst', 'gzip': '.tar.gz'}
+
+
+def _get_archive_directory():
+
+    directory = os.path.join(env.DIR_EXPORTED_DATA, SPOOL_ARCHIVE_DIRECTORY_NAME)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _get_compression():
+
+    if SPOOL_ARCHIVE_COMPRESSION == 'zstd' and zstandard is None:
+        return 'gzip'
+    return SPOOL_ARCHIVE_COMPRESSION
+
+
+def __remove_old_archives(name: str):
+
+    if SPOOL_ARCHIVE_MAX_RUNS is None:
+        return
+
+    archivePaths = sorted(get_archive_paths(name), reverse=True)
+    for archivePath in archivePaths[SPOOL_ARCHIVE_MAX_RUNS:]:
+        os.remove(archivePath)
+
+
+def get_archive_paths(name: str):
+    """
+    Este método retorna os arquivos compactados das execuções de uma atualização de dados, do mais antigo ao mais recente
+
+    Args:
+        name (str): nome da atualização de dados [Exemplo: IW67_MEDL]
+
+    Returns:
+        list: caminhos dos arquivos compactados
+    """
+
+    directory = _get_archive_directory()
+    archiveNames = [entry.name for entry in os.scandir(directory) if entry.is_file() and entry.name.startswith(f'{name}_') and entry.name.endswith(tuple(SPOOL_ARCHIVE_EXTENSIONS.values()))]
+    return [os.path.join(directory, archiveName) for archiveName in sorted(archiveNames) if archiveName[len(name) + 1:len(name) + 2].isdigit()]
+
+
+def archive_spool_files(name: str, entries: list):
+    """
+    Este método grava as ordens spool exportadas de uma execução em um arquivo .tar compactado (zstd ou gzip) [Exemplo: IW67_MEDL_20231001_083000.tar.zst]. Mantém somente as SPOOL_ARCHIVE_MAX_RUNS execuções mais recentes
+
+    Args:
+        name (str): nome da atualização de dados [Exemplo: IW67_MEDL]
+        entries (list): lista de entradas dos arquivos spool exportados
+
+    Returns:
+        str: caminho do arquivo compactado (None se desativado ou sem arquivos)
+    """
+
+    if not SPOOL_ARCHIVE_ENABLED or not entries:
+        return None
+
+    try:
+        compression = _get_compression()
+        archivePath = os.path.join(_get_archive_directory(), f'{name}_{time.strftime("%Y%m%d_%H%M%S")}{SPOOL_ARCHIVE_EXTENSIONS[compression]}')
+        temporaryPath = f'{archivePath}.tmp'
+        with open(temporaryPath, 'wb') as file:
+            if compression == 'zstd':
+                with zstandard.ZstdCompressor().stream_writer(file, closefd=False) as writer, tarfile.open(fileobj=writer, mode='w|') as archive:
+                    for entry in entries:
+                        archive.add(entry.path, arcname=entry.name)
+            else:
+                with tarfile.open(fileobj=file, mode='w|gz') as archive:
+                    for entry in entries:
+                        archive.add(entry.path, arcname=entry.name)
+        os.replace(temporaryPath, archivePath)
+
+        __remove_old_archives(name)
+        print(f'Archived {len(entries)} spool files to {os.path.basename(archivePath)}')
+        return archivePath
+
+    except Exception:
+        logging.exception('Exception occurred')
+        return None
+
+
+def iter_archive_files(archivePath: str, partialTexts: list | None = None):
+    """
+    Este método percorre os arquivos spool de um arquivo compactado em leitura sequencial (descompactação em fluxo, sem extração em disco)
+
+    Args:
+        archivePath (str): caminho do arquivo compactado
+        partialTexts (list | None): textos contidos no nome dos arquivos (None = todos os arquivos)
+
+    Returns:
+        generator: tuplas (nome do arquivo, linhas do arquivo). As linhas devem ser lidas antes do próximo arquivo
+    """
+
+    with open(archivePath, 'rb') as file:
+        if archivePath.endswith(SPOOL_ARCHIVE_EXTENSIONS['zstd']):
+            if zstandard is None:
+                raise ImportError(f'zstandard package is required to read {archivePath}')
+            stream = zstandard.ZstdDecompressor().stream_reader(file)
+            mode = 'r|'
+        else:
+            stream = file
+            mode = 'r|gz'
+
+        with tarfile.open(fileobj=stream, mode=mode) as archive:
+            for member in archive:
+                if not member.isfile() or (partialTexts is not None and not any(partialText.lower() in member.name.lower() for partialText in partialTexts)):
+                    continue
+                yield member.name, (line.decode(SPOOL_FILE_ENCODING).rstrip('\r\n') + '\n' for line in archive.extractfile(member))
@@ -0,0 +1,488 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+import tracemalloc
+import env
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ? Informações: módulo responsável pelo rastreamento (spans aninhados) das etapas de cada execução, gravadas em arquivo .jsonl, e pelo relatório de linha do tempo e comparação entre execuções
+
+# Rastreamento ativo (spans gravados em TRACE_FILE_NAME), somente se solicitado pela variável de ambiente SAP_TRACE=1 (herdada pelos processos filhos)
+TRACE_ENABLED = os.environ.get('SAP_TRACE', '0') == '1'
+
+# Arquivo .jsonl dos spans (uma linha por span finalizado, de todos os processos), gravado no diretório de dados importados (env.DIR_EXPORTED_DATA)
+TRACE_FILE_NAME = 'trace.jsonl'
+
+# Tamanho máximo (bytes) do arquivo de spans antes da rotação e quantidade de arquivos anteriores mantidos [trace.jsonl.1, trace.jsonl.2...]
+TRACE_MAX_BYTES = 20 * 1024 * 1024
+TRACE_BACKUP_COUNT = 3
+
+# Medição de memória por span (opcional): alocação atual, variação e pico (tracemalloc) e memória do processo (RSS, requer psutil)
+# ATENÇÃO: o tracemalloc aumenta o tempo de execução das etapas com muitas alocações, utilizar somente para dimensionamento/diagnóstico
+TRACE_MEMORY = False
+
+# Spans com registro dos principais locais de alocação (snapshot no início e no fim do span) e quantidade de locais registrados
+MEMORY_SNAPSHOT_SPANS = ('import', 'stamp', 'write', 'merge')
+MEMORY_TOP_SITES = 5
+
+# Atributos de memória dos spans (exibidos somente no resumo de memória, ver print_memory)
+MEMORY_ATTRIBUTES = ('memoryCurrent', 'memoryDelta', 'memoryPeak', 'memoryPeakDelta', 'rss', 'memoryTopSites')
+
+TRACE_FILE_LOCK = threading.Lock()
+
+# Pilha de spans abertos por thread (o span do topo é o pai dos novos spans)
+SPAN_STACK = threading.local()
+
+
+def _get_span_stack():
+
+    if not hasattr(SPAN_STACK, 'spans'):
+        SPAN_STACK.spans = []
+    return SPAN_STACK.spans
+
+
+def _update_memory_peaks(stack: list):
+
+    # o pico do tracemalloc é único por processo: é acumulado nos spans abertos e reiniciado a cada início/fim de span
+    _, peak = tracemalloc.get_traced_memory()
+    for openSpan in stack:
+        if openSpan.memoryPeak is not None:
+            openSpan.memoryPeak = max(openSpan.memoryPeak, peak)
+    tracemalloc.reset_peak()
+
+
+def _get_top_allocation_sites(snapshot: object, startSnapshot: object, limit: int):
+
+    ignoredFiles = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    statistics = snapshot.filter_traces(ignoredFiles).compare_to(startSnapshot.filter_traces(ignoredFiles), 'lineno')
+    statistics = sorted(statistics, key=lambda stat: stat.size_diff, reverse=True)[:limit]
+    return [f'{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno} {stat.size_diff:+d} B [{stat.count_diff:+d} blocks]' for stat in statistics if stat.size_diff > 0]
+
+
+def get_process_rss():
+    """
+    Este método retorna a memória residente (RSS) do processo atual
+
+    Returns:
+        int: memória residente em bytes (None se psutil não estiver instalado)
+    """
+
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def get_trace_file_path():
+    """
+    Este método retorna o caminho do arquivo .jsonl dos spans (TRACE_FILE_NAME no diretório de dados importados)
+
+    Returns:
+        str: caminho do arquivo de spans
+    """
+
+    return os.path.join(env.DIR_EXPORTED_DATA, TRACE_FILE_NAME)
+
+
+def _rotate_trace_file(filePath: str):
+
+    # rotação por tamanho (mesmo esquema do log): trace.jsonl -> trace.jsonl.1 -> ... -> trace.jsonl.{TRACE_BACKUP_COUNT}
+    if not os.path.exists(filePath) or os.path.getsize(filePath) < TRACE_MAX_BYTES:
+        return
+    for index in range(TRACE_BACKUP_COUNT - 1, 0, -1):
+        if os.path.exists(f'{filePath}.{index}'):
+            os.replace(f'{filePath}.{index}', f'{filePath}.{index + 1}')
+    if TRACE_BACKUP_COUNT > 0:
+        os.replace(filePath, f'{filePath}.1')
+    else:
+        os.remove(filePath)
+
+
+def _write_span(record: dict):
+
+    filePath = get_trace_file_path()
+    with TRACE_FILE_LOCK:
+        try:
+            _rotate_trace_file(filePath)
+        except OSError:
+            pass  # arquivo em rotação por outro processo
+        with open(filePath, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class Span:
+
+    """
+    Esta classe representa uma etapa rastreada da execução (span), com início, duração e atributos (quantidade de linhas, tentativas...). Deve ser utilizada como gerenciador de contexto (with), os spans abertos dentro do bloco são registrados como filhos
+    ATENÇÃO: o span é gravado ao final do bloco (se TRACE_ENABLED, ver get_trace_file_path). Em processos/threads filhos o span pai deve ser informado (ver get_context)
+    IMPORTANTE: com TRACE_MEMORY ativo, o pico de memória é do processo (em execução com threads inclui as alocações das demais threads no período)
+
+    A classe Span faz o seguinte:
+        - Mede a duração da etapa e registra o status (ok/error)
+        - Acumula atributos da etapa (set/add)
+        - Mede a memória da etapa (opcional, ver TRACE_MEMORY)
+    """
+
+    def __init__(self, name: str, parentContext: dict | None = None, **attributes):
+        """
+        Este é o método construtor da classe Span.
+
+        Args:
+            name (str): nome da etapa [Exemplo: await_jobs]
+            parentContext (dict | None): contexto do span pai em outro processo/thread (ver get_context). None = span aberto na thread atual ou nova execução
+            **attributes: atributos iniciais do span [Exemplo: session=1]
+        """
+
+        self.name = name
+        self.spanId = uuid.uuid4().hex[:16]
+        self.parentContext = parentContext
+        self.attributes = dict(attributes)
+        self.runId = None
+        self.parentId = None
+        self.start = None
+        self.memoryStart = None
+        self.memoryPeak = None
+        self.memorySnapshot = None
+
+    def set(self, key: str, value: any):
+
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: int = 1):
+
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def __enter__(self):
+
+        stack = _get_span_stack()
+        if self.parentContext is not None:
+            self.runId, self.parentId = self.parentContext['runId'], self.parentContext['spanId']
+        elif stack:
+            self.runId, self.parentId = stack[-1].runId, stack[-1].spanId
+        else:
+            self.runId = time.strftime('%Y%m%d_%H%M%S_') + uuid.uuid4().hex[:6]
+
+        if TRACE_MEMORY:
+            self.__start_memory_tracking(stack)
+
+        self.start = time.time()
+        stack.append(self)
+        return self
+
+    def __start_memory_tracking(self, stack: list):
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        _update_memory_peaks(stack)
+        self.memoryStart, _ = tracemalloc.get_traced_memory()
+        self.memoryPeak = self.memoryStart
+        if self.name in MEMORY_SNAPSHOT_SPANS:
+            self.memorySnapshot = tracemalloc.take_snapshot()
+
+    def __stop_memory_tracking(self, stack: list):
+
+        if self.memoryStart is None or not tracemalloc.is_tracing():
+            return
+
+        _update_memory_peaks(stack)
+        memoryCurrent, _ = tracemalloc.get_traced_memory()
+        self.attributes['memoryCurrent'] = memoryCurrent
+        self.attributes['memoryDelta'] = memoryCurrent - self.memoryStart
+        self.attributes['memoryPeak'] = self.memoryPeak
+        self.attributes['memoryPeakDelta'] = self.memoryPeak - self.memoryStart
+        self.attributes['rss'] = get_process_rss()
+        if self.memorySnapshot is not None:
+            self.attributes['memoryTopSites'] = _get_top_allocation_sites(tracemalloc.take_snapshot(), self.memorySnapshot, MEMORY_TOP_SITES)
+            self.memorySnapshot = None
+
+    def __exit__(self, excType: any, excValue: any, traceback: any):
+
+        end = time.time()
+        stack = _get_span_stack()
+        if TRACE_MEMORY:
+            self.__stop_memory_tracking(stack)
+        if self in stack:
+            stack.remove(self)
+
+        if TRACE_ENABLED:
+            try:
+                _write_span({
+                    'runId': self.runId,
+                    'spanId': self.spanId,
+                    'parentId': self.parentId,
+                    'name': self.name,
+                    'start': round(self.start, 4),
+                    'end': round(end, 4),
+                    'duration': round(end - self.start, 4),
+                    'status': 'ok' if excType is None else 'error',
+                    'pid': os.getpid(),
+                    'thread': threading.current_thread().name,
+                    'attributes': self.attributes,
+                })
+            except Exception:
+                pass
+
+        return False
+
+
+def span(name: str, parentContext: dict | None = None, **attributes):
+    """
+    Este método cria um span (etapa rastreada) para uso com with [Exemplo: with tracing.span('import') as s: s.set('rows', 10)]
+
+    Args:
+        name (str): nome da etapa
+        parentContext (dict | None): contexto do span pai em outro processo/thread (ver get_context)
+        **attributes: atributos iniciais do span
+
+    Returns:
+        Span: span da etapa
+    """
+
+    return Span(name, parentContext, **attributes)
+
+
+def get_context():
+    """
+    Este método retorna o contexto do span aberto na thread atual, para ser informado aos spans criados em processos/threads filhos (parentContext)
+
+    Returns:
+        object: contendo identificador da execução e do span [Exemplo: {'runId': '20231001_101500_a1b2c3', 'spanId': '...'}] (None se não houver span aberto)
+    """
+
+    stack = _get_span_stack()
+    if not stack:
+        return None
+    return {'runId': stack[-1].runId, 'spanId': stack[-1].spanId}
+
+
+def add_to_current(key: str, amount: int = 1):
+    """
+    Este método acumula um atributo no span aberto na thread atual (sem efeito se não houver span aberto) [Exemplo: tentativas com falha da política de novas tentativas]
+
+    Args:
+        key (str): nome do atributo [Exemplo: retries]
+        amount (int): valor acumulado
+    """
+
+    stack = _get_span_stack()
+    if stack:
+        stack[-1].add(key, amount)
+
+
+# ? ==========================================================================================
+
+def load_spans(filePath: str = None):
+    """
+    Este método realiza a leitura dos spans gravados, agrupados por execução (na ordem de início)
+
+    Args:
+        filePath (str): arquivo .jsonl dos spans (por default get_trace_file_path)
+
+    Returns:
+        object: contendo o identificador da execução e seus spans ordenados pelo início [Exemplo: {'20231001_101500_a1b2c3': [{...}]}]
+    """
+
+    runs = {}
+    with open(filePath or get_trace_file_path(), encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                runs.setdefault(record['runId'], []).append(record)
+
+    for spans in runs.values():
+        spans.sort(key=lambda record: record['start'])
+
+    return dict(sorted(runs.items(), key=lambda item: item[1][0]['start']))
+
+
+def get_span_paths(spans: list):
+    """
+    Este método calcula o caminho (nomes dos spans pais e do span) de cada span de uma execução [Exemplo: cycle/IW67_MEDL/await_jobs]
+
+    Args:
+        spans (list): spans de uma execução
+
+    Returns:
+        object: contendo o identificador do span e seu caminho
+    """
+
+    byId = {record['spanId']: record for record in spans}
+    paths = {}
+    for record in spans:
+        names = [record['name']]
+        parent = byId.get(record['parentId'])
+        while parent is not None:
+            names.append(parent['name'])
+            parent = byId.get(parent['parentId'])
+        paths[record['spanId']] = '/'.join(reversed(names))
+
+    return paths
+
+
+def get_path_durations(spans: list):
+    """
+    Este método soma a duração (segundos) e a quantidade dos spans de uma execução por caminho (ver get_span_paths). Spans de mesmo caminho (ex.: submissão por sessão) são agrupados
+
+    Args:
+        spans (list): spans de uma execução
+
+    Returns:
+        object: contendo caminho, quantidade, duração total e maior pico de memória (se medido) [Exemplo: {'cycle/IW67_MEDL/import': {'count': 1, 'duration': 2.5, 'rows': 1200}}]
+    """
+
+    paths = get_span_paths(spans)
+    durations = {}
+    for record in spans:
+        summary = durations.setdefault(paths[record['spanId']], {'count': 0, 'duration': 0.0})
+        summary['count'] += 1
+        summary['duration'] += record['duration']
+        for key in ('rows', 'retries'):
+            if isinstance(record['attributes'].get(key), (int, float)):
+                summary[key] = summary.get(key, 0) + record['attributes'][key]
+        for key in ('memoryPeak', 'rss'):
+            if isinstance(record['attributes'].get(key), int):
+                summary[key] = max(summary.get(key, 0), record['attributes'][key])
+
+    return durations
+
+
+def print_timeline(runId: str, spans: list, width: int = 40):
+    """
+    Este método realiza a escrita no terminal da linha do tempo de uma execução: cada span (indentado conforme o aninhamento) com início relativo, duração, barra proporcional e atributos
+
+    Args:
+        runId (str): identificador da execução
+        spans (list): spans da execução
+        width (int): largura (caracteres) da barra da linha do tempo
+    """
+
+    runStart = min(record['start'] for record in spans)
+    runEnd = max(record['end'] for record in spans)
+    runSeconds = max(runEnd - runStart, 0.001)
+    byId = {record['spanId']: record for record in spans}
+
+    def getDepth(record: dict):
+        depth = 0
+        while record['parentId'] in byId:
+            record = byId[record['parentId']]
+            depth += 1
+        return depth
+
+    print(f'Run {runId} [{runSeconds:.3f} seconds] [{len(spans)} spans]')
+    for record in spans:
+        offset = int((record['start'] - runStart) / runSeconds * width)
+        length = max(1, int(record['duration'] / runSeconds * width))
+        bar = (' ' * offset + '█' * length).ljust(width)[:width]
+        attributes = ' '.join(f'{key}={value}' for key, value in record['attributes'].items() if key not in MEMORY_ATTRIBUTES)
+        status = '' if record['status'] == 'ok' else ' [error]'
+        label = f'{"  " * getDepth(record)}{record["name"]}'
+        print(f'  {label.ljust(36)} {record["start"] - runStart:>9.3f}s {record["duration"]:>9.3f}s |{bar}| {attributes}{status}')
+
+
+def print_memory(runId: str, spans: list):
+    """
+    Este método realiza a escrita no terminal do resumo de memória de uma execução (spans medidos com TRACE_MEMORY): alocação atual e pico em relação ao início de cada span, pico absoluto, memória do processo (RSS) e principais locais de alocação
+
+    Args:
+        runId (str): identificador da execução
+        spans (list): spans da execução
+    """
+
+    paths = get_span_paths(spans)
+    measured = [record for record in spans if 'memoryPeak' in record['attributes']]
+    if not measured:
+        print(f'Run {runId} has no memory measurements (tracing.TRACE_MEMORY)')
+        return
+
+    megabyte = 2 ** 20
+    print(f'Run {runId} memory [MB]')
+    print(f'  {"span".ljust(50)} {"delta":>9} {"peak +":>9} {"peak":>9} {"rss":>9}')
+    for record in measured:
+        attributes = record['attributes']
+        rss = f'{attributes["rss"] / megabyte:>9.1f}' if attributes.get('rss') is not None else f'{"-":>9}'
+        print(f'  {paths[record["spanId"]].ljust(50)} {attributes["memoryDelta"] / megabyte:>+9.1f} {attributes["memoryPeakDelta"] / megabyte:>+9.1f} {attributes["memoryPeak"] / megabyte:>9.1f} {rss}')
+        for site in attributes.get('memoryTopSites', []):
+            print(f'      {site}')
+
+
+def print_comparison(baseRunId: str, baseSpans: list, runId: str, spans: list, limit: int = 20):
+    """
+    Este método realiza a escrita no terminal da comparação entre duas execuções: duração de cada caminho de span (ver get_path_durations) em ambas, ordenada pela maior diferença (regressões primeiro)
+
+    Args:
+        baseRunId (str): identificador da execução de referência
+        baseSpans (list): spans da execução de referência
+        runId (str): identificador da execução comparada
+        spans (list): spans da execução comparada
+        limit (int): quantidade máxima de caminhos exibidos
+    """
+
+    baseDurations = get_path_durations(baseSpans)
+    durations = get_path_durations(spans)
+    paths = set(baseDurations) | set(durations)
+
+    rows = []
+    for path in paths:
+        baseSeconds = baseDurations.get(path, {}).get('duration', 0.0)
+        seconds = durations.get(path, {}).get('duration', 0.0)
+        rows.append((seconds - baseSeconds, path, baseSeconds, seconds))
+    rows.sort(reverse=True)
+
+    print(f'Comparison {baseRunId} -> {runId}')
+    print(f'  {"span".ljust(50)} {"base":>10} {"run":>10} {"delta":>10} {"delta %":>8}')
+    for delta, path, baseSeconds, seconds in rows[:limit]:
+        deltaPercent = f'{delta / baseSeconds:+.1%}' if baseSeconds else 'new'
+        print(f'  {path.ljust(50)} {baseSeconds:>9.3f}s {seconds:>9.3f}s {delta:>+9.3f}s {deltaPercent:>8}')
+
+
+# ! ----------------------------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Timeline report of traced runs (trace.jsonl)')
+    parser.add_argument('--file', default=None, help='trace file (.jsonl, default: trace.jsonl in the exported data directory)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('runs', help='list traced runs')
+    timelineParser = subparsers.add_parser('timeline', help='per-run timeline (default: last run)')
+    timelineParser.add_argument('runId', nargs='?', default=None)
+    memoryParser = subparsers.add_parser('memory', help='per-span memory of a run (default: last run)')
+    memoryParser.add_argument('runId', nargs='?', default=None)
+    compareParser = subparsers.add_parser('compare', help='compare two runs (default: last two runs)')
+    compareParser.add_argument('baseRunId', nargs='?', default=None)
+    compareParser.add_argument('runId', nargs='?', default=None)
+    args = parser.parse_args()
+
+    runs = load_spans(args.file)
+    if not runs:
+        print('No traced runs')
+        sys.exit(1)
+    runIds = list(runs)
+
+    if args.command == 'runs':
+        for runId, spans in runs.items():
+            roots = [record for record in spans if record['parentId'] not in {item['spanId'] for item in spans}]
+            print(f'{runId}  {time.strftime("%d-%m-%Y %H:%M:%S", time.localtime(spans[0]["start"]))}  {max(r["end"] for r in spans) - spans[0]["start"]:>10.3f}s  {", ".join(r["name"] for r in roots)}')
+
+    elif args.command == 'timeline':
+        runId = args.runId or runIds[-1]
+        print_timeline(runId, runs[runId])
+
+    elif args.command == 'memory':
+        runId = args.runId or runIds[-1]
+        print_memory(runId, runs[runId])
+
+    elif args.command == 'compare':
+        if len(runIds) < 2 and (args.baseRunId is None or args.runId is None):
+            print('At least two traced runs are required')
+            sys.exit(1)
+        baseRunId = args.baseRunId or runIds[-2]
+        runId = args.runId or runIds[-1]
+        print_comparison(baseRunId, runs[baseRunId], runId, runs[runId])
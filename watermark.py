@@ -0,0 +1,68 @@
+import os
+import json
+import datetime
+import env
+
+# ? Informações: módulo responsável pela gravação da marca d'água (watermark) das atualizações incrementais: início da última execução com sucesso e da última atualização completa de cada atualização de dados
+
+# Arquivo .json das marcas d'água, no diretório dos dados importados (env.DIR_EXPORTED_DATA)
+WATERMARK_FILE_NAME = 'watermark.json'
+
+WATERMARK_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def __get_watermark_file_path():
+
+    return os.path.join(env.DIR_EXPORTED_DATA, WATERMARK_FILE_NAME)
+
+
+def __load_watermarks():
+
+    filePath = __get_watermark_file_path()
+    if not os.path.isfile(filePath):
+        return {}
+
+    with open(filePath, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def get_watermark(name: str):
+    """
+    Este método retorna a marca d'água de uma atualização de dados
+
+    Args:
+        name (str): nome da atualização de dados [Exemplo: IW67_MEDL]
+
+    Returns:
+        object: contendo o início da última execução com sucesso e da última atualização completa [Exemplo: {'lastRun': datetime, 'lastFullRefresh': datetime}] (None se não houver execução registrada)
+    """
+
+    state = __load_watermarks().get(name)
+    if state is None:
+        return None
+
+    return {key: datetime.datetime.strptime(value, WATERMARK_DATETIME_FORMAT) if value else None for key, value in state.items()}
+
+
+def set_watermark(name: str, runStart: datetime.datetime, fullRefresh: bool):
+    """
+    Este método grava a marca d'água de uma atualização de dados concluída com sucesso
+    ATENÇÃO: deve ser informado o início da execução (e não o fim), para que os registros gravados no SAP durante a execução sejam consultados na próxima
+
+    Args:
+        name (str): nome da atualização de dados [Exemplo: IW67_MEDL]
+        runStart (datetime.datetime): início da execução
+        fullRefresh (bool): se True, a execução foi uma atualização completa
+    """
+
+    watermarks = __load_watermarks()
+    state = watermarks.get(name, {'lastRun': None, 'lastFullRefresh': None})
+    state['lastRun'] = runStart.strftime(WATERMARK_DATETIME_FORMAT)
+    if fullRefresh:
+        state['lastFullRefresh'] = state['lastRun']
+    watermarks[name] = state
+
+    temporaryFilePath = f'{__get_watermark_file_path()}.tmp'
+    with open(temporaryFilePath, 'w', encoding='utf-8') as file:
+        json.dump(watermarks, file, indent=2)
+    os.replace(temporaryFilePath, __get_watermark_file_path())